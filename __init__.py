@@ -4,11 +4,13 @@ Drainfield Placer - Automatic Drainfield Configuration and Placement
 
 from .config_loader import ConfigLoader
 from .selector import DrainFieldSelector
-from .geometry import parse_user_boundary, validate_boundary
+from .geometry import parse_user_boundary, validate_boundary, BoundaryContext
 from .placer import (
     place_drainfield,
     place_split_drainfield,
-    create_placement_summary
+    explode_inserts,
+    create_placement_summary,
+    OUTPUT_MODES
 )
 
 __version__ = '1.0.0'
@@ -17,7 +19,10 @@ __all__ = [
     'DrainFieldSelector',
     'parse_user_boundary',
     'validate_boundary',
+    'BoundaryContext',
     'place_drainfield',
     'place_split_drainfield',
-    'create_placement_summary'
+    'explode_inserts',
+    'create_placement_summary',
+    'OUTPUT_MODES'
 ]
@@ -0,0 +1,149 @@
+"""
+Batch Design Module
+Design parameters for whole portfolios of buildings in one vectorized pass
+
+Computes the same values run_full_design derives one building at a time
+(sewage flow, septic and dosing tank sizes, ATU size, and drainfield and
+unobstructed area requirements per configuration type) for arrays of
+buildings. Every column matches the scalar methods element for element.
+Columns are int64 like the scalar results, except that an ATU or
+requirement column with a building the scalar method returns None for
+stays float64, with NaN for those buildings (numpy has no integer NaN).
+
+Usage:
+    from batch_design import design_parameters
+    columns = design_parameters(bedrooms, square_footage, num_homes)
+
+    python batch_design.py portfolio.csv output.csv
+"""
+
+import csv
+import argparse
+
+import numpy as np
+
+from sewage_flow import SewageFlowCalculator
+from tank_sizing import TankSizer
+from drainfield_requirements import DrainFieldRequirements, CONFIG_NAMES
+from data_store import DATA_DIR
+
+
+def design_parameters(bedrooms, square_footage, num_homes=1, config_types=None,
+                      flow_calculator=None, tank_sizer=None, drainfield_requirements=None,
+                      data_dir=DATA_DIR):
+    """
+    Vectorized design parameters
+
+    Args:
+        bedrooms: Array-like of bedroom counts
+        square_footage: Array-like of building square footages
+        num_homes: Dwelling units (scalar or array-like)
+        config_types: Configuration types to give requirements for
+                      (default: all eight, 'trench' through 'split_bed_atu')
+        flow_calculator: Loaded SewageFlowCalculator (default: load from data_dir)
+        tank_sizer: Loaded TankSizer (default: load from data_dir)
+        drainfield_requirements: Loaded DrainFieldRequirements (default: load from data_dir)
+        data_dir: Directory containing CSV data files
+
+    Returns:
+        Dictionary of column name -> array: flow_gpd, septic_tank,
+        dosing_tank, atu_size, and drainfield_size_<type> and
+        unobstructed_area_<type> for each configuration type (int64, or
+        float64 with NaN where any value is missing)
+
+    Raises:
+        ValueError: If any bedroom count is not in the sewage flow table,
+                    or any square footage is negative or not finite
+    """
+    if flow_calculator is None:
+        flow_calculator = SewageFlowCalculator(data_dir)
+    if tank_sizer is None:
+        tank_sizer = TankSizer(data_dir)
+    if drainfield_requirements is None:
+        drainfield_requirements = DrainFieldRequirements(data_dir)
+    if config_types is None:
+        config_types = list(CONFIG_NAMES)
+
+    bedrooms, square_footage, num_homes = np.broadcast_arrays(
+        np.asarray(bedrooms), np.asarray(square_footage), np.asarray(num_homes))
+
+    flow_gpd = flow_calculator.calculate_flow_batch(bedrooms, square_footage)
+
+    # Same calls run_full_design makes for each building
+    columns = {
+        'flow_gpd': flow_gpd,
+        'septic_tank': tank_sizer.get_septic_tank_size_batch(flow_gpd, num_homes),
+        'dosing_tank': tank_sizer.get_pump_tank_size_batch(flow_gpd, is_residential=True),
+        'atu_size': _as_int(tank_sizer.calculate_atu_size_batch(bedrooms, square_footage,
+                                                                 flow_gpd)),
+    }
+
+    for config_type in config_types:
+        drainfield_size, unobstructed_area = \
+            drainfield_requirements.get_requirements_batch(flow_gpd, config_type)
+        columns[f'drainfield_size_{config_type}'] = _as_int(drainfield_size)
+        columns[f'unobstructed_area_{config_type}'] = _as_int(unobstructed_area)
+
+    return columns
+
+
+def _as_int(values):
+    """int64 copy of a float column with no NaN; the column itself otherwise"""
+    if np.isnan(values).any():
+        return values
+    return values.astype(np.int64)
+
+
+def design_frame(frame, config_types=None, **components):
+    """
+    Design parameters for a DataFrame of buildings
+
+    Args:
+        frame: pandas DataFrame with 'bedrooms' and 'square_footage' columns
+               (and optionally 'num_homes')
+        config_types: Configuration types to give requirements for
+        **components: flow_calculator, tank_sizer, drainfield_requirements
+                      or data_dir, as for design_parameters
+
+    Returns:
+        Copy of frame with the derived columns appended
+    """
+    num_homes = frame['num_homes'].to_numpy() if 'num_homes' in frame else 1
+    columns = design_parameters(frame['bedrooms'].to_numpy(),
+                                frame['square_footage'].to_numpy(),
+                                num_homes, config_types, **components)
+    return frame.assign(**columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute design parameters for a portfolio CSV")
+    parser.add_argument('input', help="CSV with bedrooms, square_footage and optional num_homes")
+    parser.add_argument('output', help="CSV to write with the derived columns appended")
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        raise SystemExit(f"No rows in {args.input}")
+
+    bedrooms = np.array([int(r['bedrooms']) for r in rows])
+    square_footage = np.array([float(r['square_footage']) for r in rows])
+    num_homes = np.array([int(r.get('num_homes') or 1) for r in rows])
+
+    columns = design_parameters(bedrooms, square_footage, num_homes, data_dir=args.data_dir)
+
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(rows[0]) + list(columns))
+        for i, row in enumerate(rows):
+            # Every column holds whole numbers; NaN marks a missing value
+            derived = ['' if np.isnan(value) else int(value)
+                       for value in (columns[name][i] for name in columns)]
+            writer.writerow(list(row.values()) + derived)
+
+    print(f"✓ Wrote {len(rows)} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
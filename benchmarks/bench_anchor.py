@@ -0,0 +1,121 @@
+"""
+Anchor Strategy Benchmark
+Compares centroid vs pole-of-inaccessibility anchors on concave lots
+
+Usage:
+    python benchmarks/bench_anchor.py [--lots N] [--seed S]
+"""
+
+import sys
+import math
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shapely.geometry import Polygon
+from shapely.affinity import rotate, scale
+
+from config_loader import ConfigLoader
+from selector import DrainFieldSelector
+
+
+FLOWS = [200, 300, 450, 600]
+
+
+def concave_corpus(count, seed=0):
+    """
+    Build a reproducible corpus of concave lot boundaries
+
+    Mixes L, U, T and C shapes with random star-shaped lots, each randomly
+    scaled and rotated.
+
+    Args:
+        count: Number of lots
+        seed: Random seed
+
+    Returns:
+        List of (name, Polygon) tuples
+    """
+    rng = random.Random(seed)
+    templates = {
+        'L': [(0, 0), (60, 0), (60, 20), (20, 20), (20, 70), (0, 70)],
+        'U': [(0, 0), (70, 0), (70, 60), (50, 60), (50, 20), (20, 20), (20, 60), (0, 60)],
+        'T': [(30, 0), (50, 0), (50, 50), (80, 50), (80, 70), (0, 70), (0, 50), (30, 50)],
+        'C': [(0, 0), (60, 0), (60, 18), (22, 18), (22, 52), (60, 52), (60, 70), (0, 70)],
+    }
+
+    lots = []
+    for i in range(count):
+        kind = rng.choice(list(templates) + ['star'])
+        if kind == 'star':
+            vertices = rng.randint(7, 14)
+            radii = [rng.uniform(18, 45) for _ in range(vertices)]
+            points = [
+                (r * math.cos(2 * math.pi * k / vertices), r * math.sin(2 * math.pi * k / vertices))
+                for k, r in enumerate(radii)
+            ]
+            polygon = Polygon(points)
+        else:
+            polygon = Polygon(templates[kind])
+
+        factor = rng.uniform(0.8, 1.3)
+        polygon = scale(polygon, factor, factor * rng.uniform(0.85, 1.15))
+        polygon = rotate(polygon, rng.uniform(0, 360))
+        if polygon.is_valid:
+            lots.append((f'{kind}{i}', polygon))
+
+    return lots
+
+
+def run(selector, lots):
+    """Run the single-boundary hierarchy over every lot and flow"""
+    fits = 0
+    designs = 0
+    searches = 0
+    start = time.perf_counter()
+
+    for name, polygon in lots:
+        for flow in FLOWS:
+            result = selector.apply_hierarchy(polygon, flow)
+            designs += 1
+            if result['success']:
+                fits += 1
+            searches += result.get('search_stats', {}).get('rotation_searches', 0)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'fit_rate': fits / designs if designs else 0.0,
+        'ms_per_design': 1000.0 * elapsed / designs if designs else 0.0,
+        'rotation_searches': searches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lots', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json-dir', default=str(Path(__file__).resolve().parent.parent / 'json'))
+    args = parser.parse_args()
+
+    loader = ConfigLoader(args.json_dir)
+    loader.load_all_configs()
+    lots = concave_corpus(args.lots, args.seed)
+
+    print()
+    print(f"{len(lots)} concave lots x {len(FLOWS)} flows")
+    print(f"{'anchor':<10}{'translation':<13}{'fit rate':>10}{'ms/design':>12}{'searches':>10}")
+    for allow_translation in (False, True):
+        for anchor in ('centroid', 'pole'):
+            selector = DrainFieldSelector(loader, anchor=anchor,
+                                          allow_translation=allow_translation)
+            stats = run(selector, lots)
+            print(f"{anchor:<10}{str(allow_translation):<13}"
+                  f"{stats['fit_rate']:>10.1%}{stats['ms_per_design']:>12.1f}"
+                  f"{stats['rotation_searches']:>10}")
+
+
+if __name__ == '__main__':
+    main()
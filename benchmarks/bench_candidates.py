@@ -0,0 +1,88 @@
+"""
+Candidate Preparation Micro-benchmark
+Per-call cost of filtering, sorting and building shoulders for a product/type
+
+Compares the original dict scan + sort + extract_shoulder_polygon path
+against the load-time CandidateIndex (bisect view + prebuilt shoulders).
+
+Usage:
+    python benchmarks/bench_candidates.py [--repeat N]
+"""
+
+import sys
+import json
+import timeit
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_loader import ConfigLoader, CandidateIndex, fit_record
+from geometry import extract_shoulder_polygon
+
+
+REQUIRED_SQFT = [250, 563, 1125, 2250]
+
+
+def legacy_call(loader, configs, required_sqft):
+    """Original per-call path: full scan, full sort, fresh shoulder polygons"""
+    candidates = loader.filter_by_size(configs, required_sqft)
+    for pattern_key, config_data in loader.sort_candidates(candidates):
+        extract_shoulder_polygon(config_data)
+
+
+def indexed_call(loader, index, required_sqft):
+    """Indexed per-call path: bisect view, prebuilt shoulder polygons"""
+    candidates = loader.filter_by_size(index, required_sqft)
+    for pattern_key, config_data in loader.sort_candidates(candidates):
+        extract_shoulder_polygon(config_data)
+
+
+def legacy_configs(loader, json_dir, key):
+    """
+    Full configurations of a table as the original loader held them
+
+    Read from the table's JSON file, or built by the loader's
+    ConfigGenerator for tables generated from the materials CSV.
+    """
+    path = Path(json_dir) / f"{key}.json"
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+
+    product, config_type = key.rsplit('_', 1)
+    return loader.generator.configs(product, config_type)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json-dir', default=str(Path(__file__).resolve().parent.parent / 'json'))
+    args = parser.parse_args()
+
+    loader = ConfigLoader(args.json_dir)
+    loader.load_all_configs()
+
+    print()
+    print(f"{'table':<14}{'sqft':>6}{'candidates':>12}{'legacy us':>12}{'indexed us':>12}{'speedup':>9}")
+    for key in loader.configs:
+        configs = legacy_configs(loader, args.json_dir, key)
+
+        index = loader.candidate_indexes[key]
+        build = timeit.timeit(
+            lambda: CandidateIndex({k: fit_record(c) for k, c in configs.items()}), number=5
+        ) / 5
+        print(f"{key:<14}{'build':>6}{len(index):>12}{'':>12}{build * 1e6:>12.1f}   (once at load)")
+
+        for required_sqft in REQUIRED_SQFT:
+            count = len(loader.filter_by_size(index, required_sqft))
+            legacy = timeit.timeit(lambda: legacy_call(loader, configs, required_sqft),
+                                   number=args.repeat) / args.repeat
+            indexed = timeit.timeit(lambda: indexed_call(loader, index, required_sqft),
+                                    number=args.repeat) / args.repeat
+            print(f"{key:<14}{required_sqft:>6}{count:>12}{legacy * 1e6:>12.1f}"
+                  f"{indexed * 1e6:>12.1f}{legacy / indexed:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Fit Cache Benchmark
+Checks cache hits on moved and rotated lots against fresh searches
+
+Every lot is designed once through an in-memory FitCache, then copies of it
+moved and rotated to random positions are designed through the cache (which
+should hit) and with a fresh DrainFieldSelector.apply_hierarchy call. Any
+copy whose cached result differs from the fresh one is reported, and the
+script exits non-zero.
+
+Usage:
+    python benchmarks/bench_fit_cache.py [--lots N] [--copies K] [--seed S]
+                                         [--anchor pole] [--simplify-tolerance T]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shapely.geometry import box
+from shapely.affinity import rotate, translate
+
+from bench_anchor import concave_corpus
+from geometry import ANCHOR_STRATEGIES
+from config_loader import ConfigLoader
+from selector import DrainFieldSelector
+from fit_cache import FitCache, same_selection
+
+
+FLOWS = [200, 300, 450, 600, 900]
+
+
+def moved_copy(polygons, rng):
+    """Rotate and translate boundaries together to a random position"""
+    angle = rng.uniform(0, 360)
+    dx, dy = rng.uniform(-5000, 5000), rng.uniform(-5000, 5000)
+    return [translate(rotate(p, angle, origin=(0, 0)), dx, dy) for p in polygons]
+
+
+def describe(result):
+    """Short text for a mismatch report"""
+    if not result['success']:
+        return f"failed ({result.get('reason')})"
+    if result.get('is_split'):
+        return ' + '.join(describe(result[name]) for name in ('drainfield_1', 'drainfield_2'))
+    return (f"{result['product']} {result['config_type']} {result['pattern_key']} "
+            f"at {result['rotation']:.3f} deg ({result['offset_x']:.3f}, {result['offset_y']:.3f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lots', type=int, default=20)
+    parser.add_argument('--copies', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--anchor', choices=ANCHOR_STRATEGIES, default='centroid')
+    parser.add_argument('--simplify-tolerance', type=float, default=None)
+    parser.add_argument('--json-dir', default=str(Path(__file__).resolve().parent.parent / 'json'))
+    args = parser.parse_args()
+
+    loader = ConfigLoader(args.json_dir)
+    loader.load_all_configs()
+    selector = DrainFieldSelector(loader, anchor=args.anchor,
+                                  simplify_tolerance=args.simplify_tolerance,
+                                  canonical_frames=True)
+    cache = FitCache(':memory:')
+    rng = random.Random(args.seed)
+
+    # (boundary, split boundaries) cases: rectangles, concave lots and split fields
+    cases = [([box(0, 0, w, h)], False) for w, h in [(20, 30), (30, 50), (15, 80), (40, 40), (60, 25)]]
+    cases += [([polygon], False) for name, polygon in concave_corpus(args.lots, args.seed)]
+    cases += [([box(0, 0, 5, 5), box(0, 0, 20, 30), box(100, 0, 115, 40)], True)]
+
+    copies = 0
+    mismatches = 0
+    fresh_seconds = 0.0
+    for polygons, is_split in cases:
+        for flow in FLOWS:
+            variants = [polygons] + [moved_copy(polygons, rng) for _ in range(args.copies)]
+            for i, variant in enumerate(variants):
+                split_boundaries = variant[1:] if is_split else None
+                result = cache.apply_hierarchy(selector, variant[0], flow, split_boundaries)
+                if i == 0:
+                    continue
+
+                start = time.perf_counter()
+                expected = selector.apply_hierarchy(variant[0], flow, split_boundaries)
+                fresh_seconds += time.perf_counter() - start
+
+                copies += 1
+                if not same_selection(result, expected):
+                    mismatches += 1
+                    print(f"  ✗ {flow} GPD copy {i}: cache gave {describe(result)}, "
+                          f"fresh search gave {describe(expected)}")
+
+    summary = cache.summary()
+    print()
+    print(f"{len(cases)} lots x {len(FLOWS)} flows, {args.copies} moved/rotated copies each")
+    print(f"Hit rate: {summary['hit_rate']:.1%} ({summary['hits']} of {summary['lookups']}), "
+          f"{summary['verify_failures']} hits failed polygon_fits")
+    print(f"Latency: hit {summary['avg_hit_ms']:.2f} ms, miss {summary['avg_miss_ms']:.2f} ms, "
+          f"fresh search {1000.0 * fresh_seconds / max(copies, 1):.2f} ms")
+    if mismatches:
+        print(f"✗ {mismatches} of {copies} copies differ from a fresh search")
+        sys.exit(1)
+    print(f"✓ All {copies} copies match a fresh search")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Output Assembly Benchmark
+Time and memory to place drainfields into a large survey drawing
+
+Compares the original deepcopy-the-base assembly (one copy for a single
+field, three for a split system) against the copy-on-write assembly in
+placer.py. The fixture is a synthetic CAD JSON of roughly --size-mb
+megabytes of survey polylines, lines and texts.
+
+Usage:
+    python benchmarks/bench_output.py [--size-mb 50] [--repeat 3]
+"""
+
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_loader import ConfigLoader
+from placer import place_drainfield, place_split_drainfield
+
+
+SPEC_TEXT = "DRAINFIELD SPECIFICATION\nFLOW: 300 GPD\nSEPTIC TANK: 1050 GAL"
+
+
+def make_drawing(size_mb, seed=0):
+    """Synthetic survey drawing of about size_mb megabytes of JSON"""
+    rng = random.Random(seed)
+    drawing = {'layers': [{'name': 'Survey', 'visible': True}],
+               'polylines': [], 'lines': [], 'texts': [], 'dims': [], 'circles': []}
+
+    size = 0
+    while size < size_mb * 1e6:
+        points = [{'x': rng.uniform(0, 5000), 'y': rng.uniform(0, 5000)}
+                  for _ in range(rng.randint(4, 60))]
+        drawing['polylines'].append({'points': points, 'selected': False, 'layer': 'Survey'})
+        drawing['lines'].append({'x1': rng.uniform(0, 5000), 'y1': rng.uniform(0, 5000),
+                                 'x2': rng.uniform(0, 5000), 'y2': rng.uniform(0, 5000)})
+        drawing['texts'].append({'x': rng.uniform(0, 5000), 'y': rng.uniform(0, 5000),
+                                 'text': f'EL {rng.uniform(10, 30):.2f}', 'height': 2,
+                                 'rotation': 0, 'selected': False})
+        size += 45 * len(points) + 250
+
+    return drawing
+
+
+def legacy_place(base, result, *args):
+    """Original assembly: deep copy of the whole base drawing"""
+    return place_drainfield(copy.deepcopy(base), result, *args, in_place=True)
+
+
+def legacy_place_split(base, result, *args):
+    """Original split assembly: one deep copy, then one more per field"""
+    output = copy.deepcopy(base)
+    output = place_drainfield(copy.deepcopy(output), result['drainfield_1'], in_place=True)
+    return place_drainfield(copy.deepcopy(output), result['drainfield_2'], *args, in_place=True)
+
+
+def selection(loader, product, pattern_key, rotation):
+    config_data = loader.get_config_data(product, 'bed', pattern_key)
+    return {'product': product, 'pattern_key': pattern_key, 'config_data': config_data,
+            'metadata': config_data['metadata'], 'rotation': rotation,
+            'offset_x': 2500.0, 'offset_y': 2500.0}
+
+
+def measure(function, repeat):
+    """Best wall time (ms) over repeat runs and peak traced allocation (MB)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000.0, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json-dir', default=str(Path(__file__).resolve().parent.parent / 'json'))
+    args = parser.parse_args()
+
+    loader = ConfigLoader(args.json_dir)
+    loader.load_all_configs()
+
+    base = make_drawing(args.size_mb)
+    print(f"\nFixture: {len(json.dumps(base)) / 1e6:.1f} MB JSON, "
+          f"{len(base['polylines'])} polylines")
+
+    single = selection(loader, 'mps9', '[10, 10, 10, 10, 10, 10, 10, 10, 10, 10]', 30.0)
+    split = {'drainfield_1': selection(loader, 'mps9', '[5, 5, 5, 5, 5]', 0.0),
+             'drainfield_2': selection(loader, 'mps9', '[5, 5, 5, 5, 5]', 90.0)}
+    tanks = (SPEC_TEXT, 1050, 1050)
+
+    cases = [
+        ('single', lambda: legacy_place(base, single, *tanks),
+         lambda: place_drainfield(base, single, *tanks)),
+        ('split', lambda: legacy_place_split(base, split, *tanks),
+         lambda: place_split_drainfield(base, split, *tanks)),
+    ]
+
+    print()
+    print(f"{'case':<8}{'legacy ms':>11}{'cow ms':>9}{'speedup':>9}"
+          f"{'legacy MB':>11}{'cow MB':>9}")
+    for name, legacy, cow in cases:
+        assert json.dumps(legacy()) == json.dumps(cow()), f"{name}: outputs differ"
+        legacy_ms, legacy_mb = measure(legacy, args.repeat)
+        cow_ms, cow_mb = measure(cow, args.repeat)
+        print(f"{name:<8}{legacy_ms:>11.1f}{cow_ms:>9.2f}{legacy_ms / cow_ms:>8.0f}x"
+              f"{legacy_mb:>11.1f}{cow_mb:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Boundary Simplification Benchmark
+Compares fit time on dense CAD boundaries with and without simplification
+
+Usage:
+    python benchmarks/bench_simplify.py [--lots N] [--seed S] [--tolerance T]
+"""
+
+import sys
+import math
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shapely.geometry import Polygon
+from shapely.affinity import rotate
+
+from config_loader import ConfigLoader
+from selector import DrainFieldSelector
+
+
+FLOWS = [200, 300, 450, 600]
+
+
+def dense_corpus(count, seed=0):
+    """
+    Build a reproducible corpus of densely digitized lot boundaries
+
+    Rounded rectangles with tessellated arcs and jittered straight edges,
+    the way traced or surveyed CAD boundaries usually arrive.
+
+    Args:
+        count: Number of lots
+        seed: Random seed
+
+    Returns:
+        List of (name, Polygon) tuples
+    """
+    rng = random.Random(seed)
+    lots = []
+
+    for i in range(count):
+        width = rng.uniform(35, 90)
+        height = rng.uniform(35, 90)
+        radius = rng.uniform(3, min(width, height) / 3)
+        per_side = rng.randint(20, 80)
+        per_arc = rng.randint(8, 32)
+        jitter = rng.uniform(0.0, 0.05)
+
+        corners = [
+            (width - radius, height - radius, 0),
+            (radius, height - radius, 90),
+            (radius, radius, 180),
+            (width - radius, radius, 270),
+        ]
+        points = []
+        for k, (cx, cy, start) in enumerate(corners):
+            for j in range(per_arc + 1):
+                a = math.radians(start + 90.0 * j / per_arc)
+                points.append((cx + radius * math.cos(a), cy + radius * math.sin(a)))
+
+            # Jittered straight run to the next arc
+            nx, ny, nstart = corners[(k + 1) % 4]
+            a = math.radians(nstart)
+            x0, y0 = points[-1]
+            x1, y1 = nx + radius * math.cos(a), ny + radius * math.sin(a)
+            for j in range(1, per_side):
+                t = j / per_side
+                points.append((x0 + (x1 - x0) * t + rng.uniform(-jitter, jitter),
+                               y0 + (y1 - y0) * t + rng.uniform(-jitter, jitter)))
+
+        polygon = rotate(Polygon(points), rng.uniform(0, 360))
+        if polygon.is_valid:
+            lots.append((f'dense{i}', polygon))
+
+    return lots
+
+
+def run(selector, lots):
+    """Run the single-boundary hierarchy over every lot and flow"""
+    outcomes = []
+    vertices = [0, 0]
+    start = time.perf_counter()
+
+    for name, polygon in lots:
+        for flow in FLOWS:
+            result = selector.apply_hierarchy(polygon, flow)
+            stats = result.get('search_stats', {})
+            vertices[0] += stats.get('vertices_original', len(polygon.exterior.coords) - 1)
+            vertices[1] += stats.get('vertices_simplified', len(polygon.exterior.coords) - 1)
+            outcomes.append((result['success'], result.get('product'), result.get('pattern_key')))
+
+    elapsed = time.perf_counter() - start
+    designs = len(outcomes)
+    return {
+        'outcomes': outcomes,
+        'fit_rate': sum(1 for o in outcomes if o[0]) / designs if designs else 0.0,
+        'ms_per_design': 1000.0 * elapsed / designs if designs else 0.0,
+        'vertices': vertices,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lots', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument('--json-dir', default=str(Path(__file__).resolve().parent.parent / 'json'))
+    args = parser.parse_args()
+
+    loader = ConfigLoader(args.json_dir)
+    loader.load_all_configs()
+    lots = dense_corpus(args.lots, args.seed)
+
+    baseline = run(DrainFieldSelector(loader), lots)
+    simplified = run(DrainFieldSelector(loader, simplify_tolerance=args.tolerance), lots)
+
+    same = sum(1 for a, b in zip(baseline['outcomes'], simplified['outcomes']) if a == b)
+    saved = baseline['ms_per_design'] - simplified['ms_per_design']
+
+    print()
+    print(f"{len(lots)} dense lots x {len(FLOWS)} flows, tolerance {args.tolerance} ft")
+    print(f"{'mode':<12}{'vertices':>10}{'fit rate':>10}{'ms/design':>12}")
+    for label, stats in (('original', baseline), ('simplified', simplified)):
+        print(f"{label:<12}{stats['vertices'][1]:>10}{stats['fit_rate']:>10.1%}"
+              f"{stats['ms_per_design']:>12.1f}")
+    print(f"Vertex reduction: {1 - simplified['vertices'][1] / max(simplified['vertices'][0], 1):.1%}")
+    print(f"Time saved: {saved:.1f} ms/design")
+    print(f"Same selection: {same}/{len(baseline['outcomes'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Startup Benchmark
+Time to load every rule table component from CSVs versus the data store
+
+Loads the tank catalog, sewage flow calculator, tank sizer, specification
+generator, drainfield requirements and configuration generator from a
+directory holding only the CSVs and from one holding only the compiled
+data store (tables.dfdata), first in-process (best of --repeat, the store
+reopened and checksummed every time) and then as fresh interpreters.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 50] [--processes 10]
+"""
+
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import data_store
+from data_store import DATA_DIR, build_data_store
+from tank_catalog import TankCatalog
+from sewage_flow import SewageFlowCalculator
+from tank_sizing import TankSizer
+from specifications import SpecificationGenerator
+from drainfield_requirements import DrainFieldRequirements
+from config_generator import ConfigGenerator
+
+
+# Run by each fresh interpreter; argv[1] is the data directory
+CHILD = """
+import sys, time
+start = time.perf_counter()
+from tank_catalog import TankCatalog
+from sewage_flow import SewageFlowCalculator
+from tank_sizing import TankSizer
+from specifications import SpecificationGenerator
+from drainfield_requirements import DrainFieldRequirements
+from config_generator import ConfigGenerator
+imported = time.perf_counter()
+data_dir = sys.argv[1]
+catalog = TankCatalog(data_dir)
+SewageFlowCalculator(data_dir), TankSizer(data_dir, catalog)
+SpecificationGenerator(data_dir, catalog), DrainFieldRequirements(data_dir)
+ConfigGenerator(data_dir)
+print((time.perf_counter() - imported) * 1000.0, (imported - start) * 1000.0)
+"""
+
+
+def load_all(data_dir):
+    """Build every component that reads a rule table"""
+    catalog = TankCatalog(data_dir)
+    return (catalog, SewageFlowCalculator(data_dir), TankSizer(data_dir, catalog),
+            SpecificationGenerator(data_dir, catalog), DrainFieldRequirements(data_dir),
+            ConfigGenerator(data_dir))
+
+
+def loaded_state(components):
+    """Everything the components read, for checking the two paths agree"""
+    catalog, flow, sizer, spec, requirements, generator = components
+    return (catalog.tanks, catalog.manufacturers, flow.flow_data, sizer.tank_data,
+            spec.available_tank_sizes, spec.available_dosing_tank_sizes,
+            requirements.requirements, generator.materials)
+
+
+def in_process(data_dir, repeat):
+    """Best in-process load time (ms), with the store cache cleared each run"""
+    best = float('inf')
+    for _ in range(repeat):
+        data_store._stores.clear()
+        start = time.perf_counter()
+        load_all(data_dir)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def fresh_processes(data_dir, processes):
+    """Median (load ms, import ms) over fresh interpreters"""
+    loads, imports = [], []
+    for _ in range(processes):
+        output = subprocess.run([sys.executable, '-c', CHILD, str(data_dir)], cwd=tempfile.gettempdir(),
+                                env={'PYTHONPATH': str(ROOT)}, capture_output=True, text=True,
+                                check=True).stdout.split()
+        loads.append(float(output[0]))
+        imports.append(float(output[1]))
+    loads.sort()
+    imports.sort()
+    return loads[len(loads) // 2], imports[len(imports) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--processes', type=int, default=10)
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        csv_dir = Path(work) / 'csv'
+        store_dir = Path(work) / 'store'
+        shutil.copytree(args.data_dir, csv_dir, ignore=shutil.ignore_patterns('*.dfdata'))
+        store_dir.mkdir()
+        store = build_data_store(csv_dir, store_dir / data_store.DATA_FILENAME)
+        print(f"\nData store: {store.stat().st_size:,} bytes from "
+              f"{len(list(csv_dir.glob('*.csv')))} CSV files")
+
+        assert loaded_state(load_all(csv_dir)) == loaded_state(load_all(store_dir)), \
+            "CSV and data store loads differ"
+
+        print()
+        print(f"{'source':<8}{'in-process ms':>15}{'fresh load ms':>15}{'fresh import ms':>17}")
+        for name, data_dir in (('csv', csv_dir), ('store', store_dir)):
+            best = in_process(data_dir, args.repeat)
+            load_ms, import_ms = fresh_processes(data_dir, args.processes)
+            print(f"{name:<8}{best:>15.2f}{load_ms:>15.2f}{import_ms:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
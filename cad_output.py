@@ -0,0 +1,291 @@
+"""
+CAD Output Module
+Delta (sidecar) output and streaming JSON writers for placed drainfields
+
+Instead of rewriting the whole drawing, a delta lists only the entities a
+placement adds (drainfield polylines or block inserts, specification
+texts, tank rectangles) together with the SHA-256 of the drawing it
+applies to. The CAD plugin appends each 'append' list to the matching
+collection of the base drawing and merges 'blocks' into its blocks.
+
+Delta layout:
+    {
+      "format": "drainfield-delta",
+      "version": 1,
+      "base_sha256": "<hex digest>",
+      "base_hash": "file" | "canonical-json",
+      "append": {"polylines": [...], "texts": [...], "inserts": [...]},
+      "blocks": {...}                      (blocks output mode only)
+    }
+
+'file' digests are over the input file's bytes; 'canonical-json' digests
+(used when no file path is known) are over
+json.dumps(drawing, sort_keys=True, separators=(',', ':')).
+"""
+
+import json
+import hashlib
+import itertools
+
+from placer import place_drainfield, place_split_drainfield
+
+
+DELTA_FORMAT = 'drainfield-delta'
+DELTA_VERSION = 1
+
+# 'full' writes the merged drawing; 'delta' writes a sidecar of the additions
+OUTPUT_FORMATS = ('full', 'delta')
+
+_COMPACT = (',', ':')
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def canonical_sha256(cad_json):
+    """SHA-256 hex digest of a parsed drawing's canonical JSON"""
+    text = json.dumps(cad_json, sort_keys=True, separators=_COMPACT)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def placement_delta(selection_result, spec_text=None, septic_tank_gallons=None,
+                    dosing_tank_gallons=None, output_mode='exploded', tank_catalog=None):
+    """
+    Entities a placement adds to a drawing, without touching the drawing
+
+    Args:
+        selection_result: Result dictionary from selector (single or split)
+        spec_text: Optional specification text
+        septic_tank_gallons: Septic tank size in gallons (for drawing tank)
+        dosing_tank_gallons: Dosing tank size in gallons (for drawing tank)
+        output_mode: 'exploded' or 'blocks'
+        tank_catalog: Loaded TankCatalog for tank footprints
+
+    Returns:
+        Dictionary of collection name -> new entities ('blocks' is a dict
+        of block name -> definition, the rest are lists)
+    """
+    place = place_split_drainfield if selection_result.get('is_split') else place_drainfield
+    return place({}, selection_result, spec_text, septic_tank_gallons, dosing_tank_gallons,
+                 in_place=True, output_mode=output_mode, tank_catalog=tank_catalog)
+
+
+def make_sidecar(delta, base_sha256, base_hash='file'):
+    """
+    Wrap placement_delta output in the sidecar layout
+
+    Args:
+        delta: Dictionary from placement_delta
+        base_sha256: Digest of the drawing the delta applies to
+        base_hash: 'file' or 'canonical-json' (how base_sha256 was computed)
+
+    Returns:
+        Sidecar dictionary
+    """
+    if base_hash not in ('file', 'canonical-json'):
+        raise ValueError(f"Unknown base hash type: {base_hash}")
+
+    sidecar = {
+        'format': DELTA_FORMAT,
+        'version': DELTA_VERSION,
+        'base_sha256': base_sha256,
+        'base_hash': base_hash,
+        'append': {key: value for key, value in delta.items()
+                   if key != 'blocks' and value},
+    }
+    if delta.get('blocks'):
+        sidecar['blocks'] = delta['blocks']
+    return sidecar
+
+
+def apply_delta(base_cad_json, sidecar, base_path=None):
+    """
+    Merge a sidecar into its base drawing
+
+    The base digest is checked first. The result is copy-on-write: it
+    shares the base drawing's entities.
+
+    Args:
+        base_cad_json: Parsed base drawing
+        sidecar: Sidecar dictionary
+        base_path: Base drawing file (required for 'file' digests)
+
+    Returns:
+        Merged CAD JSON dictionary
+    """
+    if sidecar.get('format') != DELTA_FORMAT or sidecar.get('version') != DELTA_VERSION:
+        raise ValueError(f"Not a {DELTA_FORMAT} v{DELTA_VERSION} sidecar")
+
+    if sidecar['base_hash'] == 'file':
+        if base_path is None:
+            raise ValueError("Sidecar is keyed by file digest; base_path is required")
+        digest = file_sha256(base_path)
+    else:
+        digest = canonical_sha256(base_cad_json)
+
+    if digest != sidecar['base_sha256']:
+        raise ValueError("Sidecar does not match the base drawing (SHA-256 differs)")
+
+    return dict(_merged_items(base_cad_json, _sidecar_additions(sidecar), materialize=True))
+
+
+def _sidecar_additions(sidecar):
+    """Collection name -> new entities of a sidecar, in placement_delta's form"""
+    additions = dict(sidecar.get('append', {}))
+    if sidecar.get('blocks'):
+        additions['blocks'] = sidecar['blocks']
+    return additions
+
+
+def _merged_items(base_cad_json, additions, materialize=False):
+    """
+    (key, value) pairs of a drawing with additions merged in
+
+    Keys come out in the order place_drainfield leaves them: the base
+    drawing's, then new collections in the additions' order. List values
+    may be iterators unless materialize is set.
+
+    Args:
+        base_cad_json: Parsed base drawing
+        additions: Dictionary from placement_delta (or _sidecar_additions)
+        materialize: Build every merged list
+    """
+    for key, value in base_cad_json.items():
+        if key not in additions:
+            yield key, value
+        elif key == 'blocks':
+            # Existing definitions win, as with place_drainfield
+            merged = dict(value or {})
+            for name, block in additions[key].items():
+                merged.setdefault(name, block)
+            yield key, merged
+        else:
+            # A null collection in the base counts as empty
+            merged = itertools.chain(value or (), additions[key])
+            yield key, list(merged) if materialize else merged
+
+    for key, value in additions.items():
+        if key not in base_cad_json:
+            yield key, dict(value) if key == 'blocks' else list(value)
+
+
+def write_json_stream(f, items):
+    """
+    Write a JSON object one entity at a time
+
+    Lists and iterators are written element by element, each element on
+    its own line, so only one entity is encoded in memory at a time.
+    Other values are encoded whole.
+
+    Args:
+        f: Text file open for writing
+        items: Iterable of (key, value) pairs
+    """
+    f.write('{')
+    for i, (key, value) in enumerate(items):
+        if i:
+            f.write(',')
+        f.write('\n' + json.dumps(key) + ':')
+
+        if isinstance(value, (list, tuple)) or hasattr(value, '__next__'):
+            f.write('[')
+            for j, element in enumerate(value):
+                f.write(',\n' if j else '\n')
+                f.write(json.dumps(element, separators=_COMPACT))
+            f.write('\n]')
+        else:
+            f.write(json.dumps(value, separators=_COMPACT))
+    f.write('\n}\n')
+
+
+def dump_json_stream(f, items, indent=None, separators=None):
+    """
+    Write a JSON object exactly as json.dump would, one entity at a time
+
+    Lists and iterators are written element by element, so the object (and
+    any iterator value) is never built; the text is byte for byte what
+    json.dump(dict(items), f, indent=indent, separators=separators) writes.
+
+    Args:
+        f: Text file open for writing
+        items: Iterable of (key, value) pairs with string keys
+        indent: As for json.dump
+        separators: As for json.dump
+    """
+    if separators is None:
+        separators = (',', ': ') if indent is not None else (', ', ': ')
+    item_separator, key_separator = separators
+    if isinstance(indent, int):
+        indent = ' ' * indent
+
+    def newline(level):
+        return '' if indent is None else '\n' + indent * level
+
+    def encode(value, level):
+        text = json.dumps(value, indent=indent, separators=separators)
+        # Strings are escaped, so every newline is part of the layout
+        return text if indent is None else text.replace('\n', newline(level))
+
+    f.write('{')
+    empty = True
+    for key, value in items:
+        f.write(('' if empty else item_separator) + newline(1) + json.dumps(key) + key_separator)
+        empty = False
+
+        if isinstance(value, (list, tuple)) or hasattr(value, '__next__'):
+            f.write('[')
+            first = True
+            for element in value:
+                f.write(('' if first else item_separator) + newline(2) + encode(element, 2))
+                first = False
+            f.write(']' if first else newline(1) + ']')
+        else:
+            f.write(encode(value, 1))
+    f.write('}' if empty else newline(0) + '}')
+
+
+def write_sidecar(path, sidecar):
+    """Write a sidecar file (only the added entities, so it stays small)"""
+    with open(path, 'w') as f:
+        write_json_stream(f, sidecar.items())
+
+
+def write_placed(path, base_cad_json, delta, indent=None, separators=None):
+    """
+    Write a drawing with a placement merged in, without building it
+
+    Base entities are streamed first, then the placed ones; the file is
+    what json.dump writes for the drawing place_drainfield (or
+    place_split_drainfield) returns for the same placement.
+
+    Args:
+        path: Output file path
+        base_cad_json: Parsed input drawing
+        delta: Dictionary from placement_delta
+        indent: As for json.dump
+        separators: As for json.dump
+    """
+    with open(path, 'w') as f:
+        dump_json_stream(f, _merged_items(base_cad_json, delta), indent, separators)
+
+
+def write_merged(path, base_cad_json, sidecar, indent=None, separators=None):
+    """
+    Write base drawing plus sidecar as one drawing, without building it
+
+    Args:
+        path: Output file path
+        base_cad_json: Parsed base drawing
+        sidecar: Sidecar dictionary (digest is not checked here)
+        indent: As for json.dump
+        separators: As for json.dump
+    """
+    with open(path, 'w') as f:
+        dump_json_stream(f, _merged_items(base_cad_json, _sidecar_additions(sidecar)),
+                         indent, separators)
@@ -0,0 +1,348 @@
+"""
+Parametric Drainfield Configuration Generator
+Synthesizes drainfield configurations from the FDEP materials table
+
+Chambers are laid out in rows along x (row pitch = chamber width plus the
+bed or trench spacing) and stacked end to end along y, starting 4 ft above
+the shoulder's bottom edge. The shoulder surrounds the chambers with a
+4 ft margin. Output matches the hand-generated json/<product>_<type>.json
+files; run this module with --validate to compare against them.
+
+Usage:
+    python config_generator.py --validate [--json-dir json] [--data-dir data]
+    python config_generator.py --export OUT_DIR [--max-rows N] [--max-per-row N]
+"""
+
+import re
+import json
+import argparse
+from pathlib import Path
+
+from shapely.geometry import box
+from shapely.geometry.polygon import orient
+import shapely
+
+from data_store import DATA_DIR, read_table
+
+
+MATERIALS_FILENAME = 'fdep_drainfield_materials.csv'
+
+# Shoulder clearance around the chambers (ft); the first chamber starts
+# this far above the shoulder's bottom edge
+SHOULDER_MARGIN = 4.0
+
+CONFIG_TYPES = ('bed', 'trench')
+
+CAD_LAYERS = [
+    {'name': 'Default', 'visible': True, 'color': '#000000', 'linetype': 'Continuous',
+     'lineweight': 1, 'transparency': 0},
+    {'name': 'Drainfield', 'visible': True, 'color': '#0000FF', 'linetype': 'Continuous',
+     'lineweight': 1, 'transparency': 0},
+    {'name': 'Shoulder', 'visible': True, 'color': '#FF0000', 'linetype': 'Continuous',
+     'lineweight': 2, 'transparency': 0},
+]
+
+
+def product_key(material_name):
+    """Product key used throughout the app for a material name ('MPS-9' -> 'mps9')"""
+    return re.sub(r'[^a-z0-9]', '', material_name.lower())
+
+
+def pattern_key(pattern):
+    """Configuration key for an array pattern ([2, 2] -> '[2, 2]')"""
+    return json.dumps(list(pattern))
+
+
+class ConfigGenerator:
+    """Builds drainfield configurations on demand from the materials table"""
+
+    def __init__(self, data_dir=DATA_DIR, max_rows=10, max_pieces_per_row=10):
+        """
+        Load the materials table
+
+        Args:
+            data_dir: Directory containing CSV data files
+            max_rows: Largest number of chamber rows generated
+            max_pieces_per_row: Largest number of chambers per row generated
+        """
+        self.data_dir = Path(data_dir)
+        self.source_path = self.data_dir / MATERIALS_FILENAME
+        self.max_rows = max_rows
+        self.max_pieces_per_row = max_pieces_per_row
+        self.materials = {}
+
+        # Memoized output: (product, config_type, pattern) -> value
+        self._cad_json = {}
+        self._fit_indexes = {}
+
+        self._load_data()
+
+    def _load_data(self):
+        """Load drainfield materials from CSV (or the compiled data store)"""
+        rows = read_table(self.data_dir, MATERIALS_FILENAME)
+        if rows is None:
+            raise FileNotFoundError(f"Drainfield materials data not found at {self.source_path}")
+
+        for row in rows:
+            self.materials[product_key(row['material_name'])] = {
+                'name': row['material_name'],
+                'width': float(row['rect_width']),
+                'height': float(row['rect_height']),
+                'credit_per_piece': float(row['credit_per_unit']),
+                'spacing_bed': float(row['spacing_bed']),
+                'spacing_trench': float(row['spacing_trench']),
+                'description': row['full_description'],
+            }
+
+    def products(self):
+        """Product keys available in the materials table"""
+        return list(self.materials)
+
+    def get_product_specs(self, product):
+        """
+        Get the physical specifications for a product
+
+        Args:
+            product: 'mps9', 'arc24', or 'eq36lp'
+
+        Returns:
+            Dictionary with width, height, and credit_per_piece (empty if unknown)
+        """
+        material = self.materials.get(product)
+        if material is None:
+            return {}
+        return {
+            'width': material['width'],
+            'height': material['height'],
+            'credit_per_piece': material['credit_per_piece'],
+        }
+
+    def patterns(self):
+        """Uniform array patterns in file order: rows outer, pieces per row inner"""
+        return [[pieces] * rows
+                for rows in range(1, self.max_rows + 1)
+                for pieces in range(1, self.max_pieces_per_row + 1)]
+
+    def row_pitch(self, product, config_type):
+        """Distance between chamber rows along x"""
+        material = self.materials[product]
+        return material['width'] + material[f'spacing_{config_type}']
+
+    def metadata(self, product, pattern):
+        """
+        Configuration metadata for an array pattern
+
+        Args:
+            product: Product key
+            pattern: Pieces per row, e.g. [5, 5, 5]
+
+        Returns:
+            Dictionary with array_pattern, num_pieces, credit_sqft, is_rectangular
+        """
+        num_pieces = sum(pattern)
+        credit = round(self.materials[product]['credit_per_piece'] * num_pieces, 4)
+        return {
+            'array_pattern': list(pattern),
+            'num_pieces': num_pieces,
+            'credit_sqft': credit,
+            'is_rectangular': len(set(pattern)) == 1,
+        }
+
+    def shoulder(self, product, config_type, pattern):
+        """
+        Shoulder outline, clockwise from the top-left corner
+
+        Uniform patterns give a rectangle; uneven rows give the stepped
+        outline of each row's chambers plus the margin.
+
+        Args:
+            product: Product key
+            config_type: 'bed' or 'trench'
+            pattern: Pieces per row
+
+        Returns:
+            List of (x, y) points (ring not closed)
+        """
+        material = self.materials[product]
+        pitch = self.row_pitch(product, config_type)
+        margin = SHOULDER_MARGIN
+
+        if len(set(pattern)) == 1:
+            left = -margin
+            right = (len(pattern) - 1) * pitch + material['width'] + margin
+            top = margin + pattern[0] * material['height'] + margin
+            return [(left, top), (right, top), (right, 0.0), (left, 0.0)]
+
+        rows = [box(i * pitch - margin, 0.0, i * pitch + material['width'] + margin,
+                    margin + pieces * material['height'] + margin)
+                for i, pieces in enumerate(pattern)]
+        outline = orient(shapely.union_all(rows).simplify(0), sign=-1.0)
+        points = list(outline.exterior.coords)[:-1]
+
+        start = min(range(len(points)), key=lambda i: (points[i][0], -points[i][1]))
+        return points[start:] + points[:start]
+
+    def cad_json(self, product, config_type, pattern):
+        """
+        Full CAD geometry (chambers and shoulder) for a pattern, memoized
+
+        Callers share the memoized dictionary; copy it before modifying.
+
+        Args:
+            product: Product key
+            config_type: 'bed' or 'trench'
+            pattern: Pieces per row
+
+        Returns:
+            cad_json dictionary in the configuration file format
+        """
+        memo_key = (product, config_type, tuple(pattern))
+        if memo_key in self._cad_json:
+            return self._cad_json[memo_key]
+
+        material = self.materials[product]
+        width = material['width']
+        height = material['height']
+        pitch = self.row_pitch(product, config_type)
+
+        polylines = []
+        for row, pieces in enumerate(pattern):
+            x = row * pitch
+            for piece in range(pieces):
+                # Chambers listed top to bottom, bottom row at the margin
+                top = SHOULDER_MARGIN + (pieces - piece) * height
+                bottom = top - height
+                corners = [(x, top), (x, top), (x + width, top), (x + width, bottom),
+                           (x, bottom), (x, top)]
+                polylines.append({
+                    'points': [{'x': px, 'y': py} for px, py in corners],
+                    'selected': False,
+                    'layer': None,
+                })
+
+        polylines.append({
+            'points': [{'x': px, 'y': py}
+                       for px, py in self.shoulder(product, config_type, pattern)],
+            'closed': True,
+            'selected': False,
+        })
+
+        cad_json = {
+            'layers': [dict(layer) for layer in CAD_LAYERS],
+            'lines': [],
+            'dims': [],
+            'texts': [],
+            'circles': [],
+            'polylines': polylines,
+            'textHeightEntries': [],
+        }
+        self._cad_json[memo_key] = cad_json
+        return cad_json
+
+    def config(self, product, config_type, pattern):
+        """Full configuration ('metadata' and 'cad_json') for a pattern"""
+        return {
+            'metadata': self.metadata(product, pattern),
+            'cad_json': self.cad_json(product, config_type, pattern),
+        }
+
+    def configs(self, product, config_type):
+        """Every generated configuration for a product/type, keyed by pattern"""
+        return {pattern_key(p): self.config(product, config_type, p) for p in self.patterns()}
+
+    def fit_index(self, product, config_type):
+        """
+        Fit records ('metadata' and 'shoulder') without building chamber polylines
+
+        Args:
+            product: Product key
+            config_type: 'bed' or 'trench'
+
+        Returns:
+            Dictionary of pattern_key -> fit record, memoized per product/type
+        """
+        memo_key = (product, config_type)
+        if memo_key not in self._fit_indexes:
+            self._fit_indexes[memo_key] = {
+                pattern_key(p): {
+                    'metadata': self.metadata(product, p),
+                    'shoulder': self.shoulder(product, config_type, p),
+                }
+                for p in self.patterns()
+            }
+        return self._fit_indexes[memo_key]
+
+    def cad_json_for_key(self, product, config_type, key):
+        """cad_json for a pattern key such as '[2, 2]'"""
+        return self.cad_json(product, config_type, json.loads(key))
+
+
+def validate(generator, json_dir):
+    """
+    Compare generated configurations with the hand-generated JSON files
+
+    Args:
+        generator: ConfigGenerator
+        json_dir: Directory containing the configuration JSON files
+
+    Returns:
+        Number of mismatching configurations
+    """
+    mismatches = 0
+    for product in generator.products():
+        for config_type in CONFIG_TYPES:
+            path = Path(json_dir) / f"{product}_{config_type}.json"
+            if not path.exists():
+                continue
+
+            with open(path, 'r') as f:
+                expected = json.load(f)
+            generated = generator.configs(product, config_type)
+
+            bad = [key for key in expected if generated.get(key) != expected[key]]
+            missing = [key for key in generated if key not in expected]
+            same_order = list(generated)[:len(expected)] == list(expected)
+            mismatches += len(bad)
+
+            status = '✓' if not bad and same_order else '✗'
+            print(f"  {status} {path.name}: {len(expected) - len(bad)}/{len(expected)} match"
+                  f"{'' if same_order else ', order differs'}"
+                  f"{f', {len(missing)} extra generated' if missing else ''}")
+            for key in bad[:5]:
+                print(f"      mismatch: {key}")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate drainfield configurations")
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--json-dir', default=str(Path(__file__).resolve().parent / 'json'))
+    parser.add_argument('--max-rows', type=int, default=10)
+    parser.add_argument('--max-per-row', type=int, default=10)
+    parser.add_argument('--validate', action='store_true',
+                        help="compare with the JSON files in --json-dir")
+    parser.add_argument('--export', metavar='OUT_DIR',
+                        help="write <product>_<type>.json files to OUT_DIR")
+    args = parser.parse_args()
+
+    generator = ConfigGenerator(args.data_dir, args.max_rows, args.max_per_row)
+
+    if args.validate:
+        print("Validating generated configurations...")
+        if validate(generator, args.json_dir):
+            raise SystemExit(1)
+
+    if args.export:
+        out_dir = Path(args.export)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for product in generator.products():
+            for config_type in CONFIG_TYPES:
+                path = out_dir / f"{product}_{config_type}.json"
+                with open(path, 'w') as f:
+                    json.dump(generator.configs(product, config_type), f, indent=2)
+                print(f"  ✓ Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,44 +5,319 @@ Handles loading and filtering drainfield JSON configurations
 
 import json
 import os
+import re
+from bisect import bisect_left
+from collections.abc import Sequence
+from functools import partial
 from pathlib import Path
 
+from config_store import STORE_FILENAME, open_store
+from config_generator import ConfigGenerator, MATERIALS_FILENAME
+from geometry import extract_shoulder_polygon, rectangle_dimensions
+
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+def fit_record(config_data):
+    """
+    Reduce a full configuration to what the selector searches on
+
+    Args:
+        config_data: Configuration dictionary with metadata and cad_json
+
+    Returns:
+        Dictionary with 'metadata' and 'shoulder' (first closed polyline's
+        points, empty if there is none)
+    """
+    shoulder = []
+    for polyline in config_data['cad_json']['polylines']:
+        if polyline.get('closed', False):
+            shoulder = [(pt['x'], pt['y']) for pt in polyline['points']]
+            break
+    return {'metadata': config_data['metadata'], 'shoulder': shoulder}
+
+
+def scan_config_file(path):
+    """
+    Parse a configuration JSON file into fit records and byte spans
+
+    The file is decoded one configuration at a time; only the fit record
+    is kept, along with the byte range of each configuration's JSON so
+    its cad_json can be re-read later without parsing the whole file.
+
+    Args:
+        path: Configuration JSON file
+
+    Returns:
+        Tuple of (fit index dict, spans dict of pattern_key -> (start, end))
+    """
+    raw = Path(path).read_bytes()
+    text = raw.decode('utf-8')
+    decoder = json.JSONDecoder()
+    ascii_only = len(raw) == len(text)
+    converted = [0, 0]  # (character position, byte position) converted so far
+
+    def byte_offset(index):
+        if ascii_only:
+            return index
+        char_pos, byte_pos = converted
+        byte_pos += len(text[char_pos:index].encode('utf-8'))
+        converted[:] = [index, byte_pos]
+        return byte_pos
+
+    def expect(pos, char, message):
+        if pos >= len(text) or text[pos] != char:
+            raise json.JSONDecodeError(message, text, pos)
+        return _WHITESPACE.match(text, pos + 1).end()
+
+    records = {}
+    spans = {}
+    pos = expect(_WHITESPACE.match(text, 0).end(), '{', "Expecting '{'")
+
+    if pos < len(text) and text[pos] == '}':
+        return records, spans
+
+    while True:
+        pattern_key, pos = decoder.raw_decode(text, pos)
+        pos = expect(_WHITESPACE.match(text, pos).end(), ':', "Expecting ':' delimiter")
+
+        config_data, end = decoder.raw_decode(text, pos)
+        records[pattern_key] = fit_record(config_data)
+        spans[pattern_key] = (byte_offset(pos), byte_offset(end))
+
+        pos = _WHITESPACE.match(text, end).end()
+        if pos < len(text) and text[pos] == '}':
+            break
+        pos = expect(pos, ',', "Expecting ',' delimiter")
+
+    return records, spans
+
+
+class CandidateIndex:
+    """
+    Candidates of one product/type in selection priority order
+
+    Built once at load time: entries are ordered rectangular first, then by
+    credit (stable, so ties keep file order), exactly as sort_candidates
+    orders them. Each fit record gets its shoulder 'polygon' and, for
+    rectangular shoulders, its (width, length) 'dimensions' prebuilt.
+    """
+
+    def __init__(self, configs):
+        """
+        Args:
+            configs: Dictionary of pattern_key -> fit record
+        """
+        for record in configs.values():
+            try:
+                record['polygon'] = extract_shoulder_polygon(record)
+            except ValueError:
+                # Reported by the selector when the candidate is tried
+                continue
+            if record['metadata'].get('is_rectangular', False):
+                record['dimensions'] = rectangle_dimensions(record['polygon'])
+
+        self.entries = sorted(configs.items(), key=lambda x: (
+            not x[1]['metadata']['is_rectangular'],
+            x[1]['metadata']['credit_sqft']
+        ))
+        self.credits = [record['metadata']['credit_sqft'] for _, record in self.entries]
+
+        # Entries [0, rectangular_end) are rectangular, the rest are not
+        self.rectangular_end = sum(1 for _, record in self.entries
+                                   if record['metadata']['is_rectangular'])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def starts(self, min_sqft):
+        """
+        Where the candidates meeting a requirement begin
+
+        Args:
+            min_sqft: Minimum required square footage
+
+        Returns:
+            Tuple of (rectangular_start, other_start) entry positions
+        """
+        split = self.rectangular_end
+        rectangular_start = bisect_left(self.credits, min_sqft, 0, split)
+        other_start = bisect_left(self.credits, min_sqft, split, len(self.entries))
+        return (rectangular_start, other_start)
+
+    def view(self, rectangular_start, other_start):
+        """
+        Candidates from precomputed start positions (see starts)
+
+        Returns:
+            CandidateView over this index (no copy)
+        """
+        return CandidateView(self.entries, (rectangular_start, self.rectangular_end),
+                             (other_start, len(self.entries)))
+
+    def at_least(self, min_sqft):
+        """
+        Candidates with at least the required credit, in priority order
+
+        Args:
+            min_sqft: Minimum required square footage
+
+        Returns:
+            CandidateView over this index (no copy)
+        """
+        return self.view(*self.starts(min_sqft))
+
+
+class CandidateView(Sequence):
+    """Read-only view of two ranges of a CandidateIndex, already in priority order"""
+
+    def __init__(self, entries, first, second):
+        self.entries = entries
+        self.first = first
+        self.second = second
+        self.first_length = first[1] - first[0]
+
+    def __len__(self):
+        return self.first_length + self.second[1] - self.second[0]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("candidate index out of range")
+        if i < self.first_length:
+            return self.entries[self.first[0] + i]
+        return self.entries[self.second[0] + i - self.first_length]
+
+    def __iter__(self):
+        for start, end in (self.first, self.second):
+            for i in range(start, end):
+                yield self.entries[i]
+
+
+class JsonCadSource:
+    """Reads one configuration's cad_json back out of its JSON file on demand"""
+
+    def __init__(self, path, spans):
+        """
+        Args:
+            path: Configuration JSON file
+            spans: pattern_key -> (start, end) byte ranges from scan_config_file
+        """
+        self.path = Path(path)
+        self.spans = spans
+        stat = os.stat(self.path)
+        self.stamp = (stat.st_size, stat.st_mtime_ns)
+
+    def cad_json(self, pattern_key):
+        """
+        cad_json for one pattern
+
+        Args:
+            pattern_key: Configuration pattern key
+
+        Returns:
+            cad_json dictionary
+        """
+        stat = os.stat(self.path)
+        if (stat.st_size, stat.st_mtime_ns) != self.stamp:
+            # File changed since it was scanned; byte ranges no longer apply
+            print(f"  ✗ Warning: {self.path.name} changed since loading, re-reading it")
+            with open(self.path, 'r') as f:
+                return json.load(f)[pattern_key]['cad_json']
+
+        start, end = self.spans[pattern_key]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))['cad_json']
+
 
 class ConfigLoader:
     """Manages loading and caching of drainfield configuration files"""
     
-    def __init__(self, json_dir=r"C:\drainfield_generator\json"):
+    def __init__(self, json_dir=r"C:\drainfield_generator\json", store_path=None,
+                 use_store=True, data_dir=None, generate_missing=True):
         """
         Initialize the configuration loader
         
         Args:
             json_dir: Directory containing the JSON configuration files
+            store_path: Compiled configuration store (default json_dir/configs.dfstore)
+            use_store: Read the compiled store when it is up to date with the JSON
+            data_dir: Directory containing fdep_drainfield_materials.csv
+                      (default: 'data' next to json_dir)
+            generate_missing: Generate configurations from the materials table
+                              for product/types that have no JSON file
         """
         self.json_dir = Path(json_dir)
+        self.store_path = Path(store_path) if store_path else self.json_dir / STORE_FILENAME
+        self.use_store = use_store
+        self.store = None
+        self.generate_missing = generate_missing
+
+        data_dir = Path(data_dir) if data_dir else self.json_dir.parent / 'data'
+        try:
+            self.generator = ConfigGenerator(data_dir)
+        except FileNotFoundError:
+            self.generator = None
+
+        # Resident fit index: key -> {pattern_key: {'metadata', 'shoulder'}}
         self.configs = {}
+
+        # Render geometry, fetched per pattern: key -> callable(pattern_key)
+        self.cad_json_sources = {}
+
+        # Priority-ordered candidates with prebuilt shoulders: key -> CandidateIndex
+        self.candidate_indexes = {}
         
     def load_all_configs(self):
-        """Load all 6 configuration files at startup"""
+        """
+        Load all 6 configuration files at startup
+
+        Only the fit index (metadata and shoulder ring per pattern) stays in
+        memory; chamber polylines are fetched per pattern by get_config_data.
+        Uses the compiled store (see config_store.py) when it exists and
+        matches the JSON files; otherwise scans the JSON files directly.
+        """
         products = ['mps9', 'arc24', 'eq36lp']
         config_types = ['bed', 'trench']
         
         print("Loading drainfield configurations...")
+        self.store = open_store(self.store_path, self.json_dir) if self.use_store else None
+
         for product in products:
             for config_type in config_types:
                 filename = f"{product}_{config_type}.json"
                 filepath = self.json_dir / filename
+                key = f"{product}_{config_type}"
+
+                if self.store is not None and key in self.store.tables:
+                    self.configs[key] = self.store.fit_index(key)
+                    self.cad_json_sources[key] = partial(self.store.cad_json, key)
+                    print(f"  ✓ Loaded {filename} from {self.store_path.name} "
+                          f"({len(self.configs[key])} configurations)")
+                    continue
                 
                 try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                        key = f"{product}_{config_type}"
-                        self.configs[key] = data
-                        print(f"  ✓ Loaded {filename} ({len(data)} configurations)")
+                    data, spans = scan_config_file(filepath)
+                    self.configs[key] = data
+                    self.cad_json_sources[key] = JsonCadSource(filepath, spans).cad_json
+                    print(f"  ✓ Loaded {filename} ({len(data)} configurations)")
                 except FileNotFoundError:
-                    print(f"  ✗ Warning: {filename} not found")
+                    if self._generate(product, config_type):
+                        print(f"  ✓ Generated {key} from {MATERIALS_FILENAME} "
+                              f"({len(self.configs[key])} configurations)")
+                    else:
+                        print(f"  ✗ Warning: {filename} not found")
                 except json.JSONDecodeError as e:
                     print(f"  ✗ Error parsing {filename}: {e}")
         
+        for key, configs in self.configs.items():
+            self.candidate_indexes[key] = CandidateIndex(configs)
+
         return len(self.configs) == 6
     
     def get_configs(self, product, config_type):
@@ -54,22 +329,79 @@ class ConfigLoader:
             config_type: 'bed' or 'trench'
             
         Returns:
-            Dictionary of configurations or empty dict if not found
+            Dictionary of pattern_key -> fit record ('metadata' and 'shoulder')
+            or empty dict if not found
         """
         key = f"{product}_{config_type}"
         return self.configs.get(key, {})
+
+    def _generate(self, product, config_type):
+        """
+        Fill a product/type from the materials table when its JSON is missing
+
+        Returns:
+            True if configurations were generated
+        """
+        if not self.generate_missing or self.generator is None:
+            return False
+        if product not in self.generator.materials:
+            return False
+
+        key = f"{product}_{config_type}"
+        self.configs[key] = self.generator.fit_index(product, config_type)
+        self.cad_json_sources[key] = partial(self.generator.cad_json_for_key, product, config_type)
+        return True
+
+    def get_candidate_index(self, product, config_type):
+        """
+        Priority-ordered candidate index for a product and type
+
+        Args:
+            product: 'mps9', 'arc24', or 'eq36lp'
+            config_type: 'bed' or 'trench'
+
+        Returns:
+            CandidateIndex, or None if the configurations are not loaded
+        """
+        return self.candidate_indexes.get(f"{product}_{config_type}")
+
+    def get_config_data(self, product, config_type, pattern_key):
+        """
+        Full configuration for one pattern, with its cad_json for placement
+
+        Args:
+            product: 'mps9', 'arc24', or 'eq36lp'
+            config_type: 'bed' or 'trench'
+            pattern_key: Configuration pattern key
+
+        Returns:
+            Dictionary with 'metadata' and 'cad_json', or None if not found
+        """
+        key = f"{product}_{config_type}"
+        record = self.configs.get(key, {}).get(pattern_key)
+        if record is None:
+            return None
+
+        return {
+            'metadata': record['metadata'],
+            'cad_json': self.cad_json_sources[key](pattern_key),
+        }
     
     def filter_by_size(self, configs, min_sqft):
         """
         Filter configurations that meet minimum square footage
         
         Args:
-            configs: Dictionary of configuration data
+            configs: Dictionary of configuration data, or a CandidateIndex
             min_sqft: Minimum required square footage
             
         Returns:
             List of (pattern_key, config_data) tuples that meet requirements
+            (a CandidateView in priority order for a CandidateIndex)
         """
+        if isinstance(configs, CandidateIndex):
+            return configs.at_least(min_sqft)
+
         candidates = []
         
         for pattern_key, config_data in configs.items():
@@ -89,6 +421,10 @@ class ConfigLoader:
         Returns:
             Sorted list of candidates
         """
+        # Views of a CandidateIndex are already in priority order
+        if isinstance(candidates, CandidateView):
+            return candidates
+
         return sorted(candidates, key=lambda x: (
             not x[1]['metadata']['is_rectangular'],  # False (rectangular) sorts first
             x[1]['metadata']['credit_sqft']  # Then by size
@@ -98,27 +434,15 @@ class ConfigLoader:
         """
         Get the physical specifications for a product
         
+        Read from data/fdep_drainfield_materials.csv.
+
         Args:
             product: 'mps9', 'arc24', or 'eq36lp'
             
         Returns:
             Dictionary with width, height, and credit_per_piece
+            (empty if the product or the materials table is unavailable)
         """
-        specs = {
-            'mps9': {
-                'width': 2.0,
-                'height': 10.0,
-                'credit_per_piece': 30.0
-            },
-            'arc24': {
-                'width': 1.8333,
-                'height': 5.0,
-                'credit_per_piece': 15.0
-            },
-            'eq36lp': {
-                'width': 1.8333,
-                'height': 4.0,
-                'credit_per_piece': 11.32
-            }
-        }
-        return specs.get(product, {})
+        if self.generator is None:
+            return {}
+        return self.generator.get_product_specs(product)
@@ -0,0 +1,410 @@
+"""
+Compiled Configuration Store
+Packs the drainfield configuration JSON files into one memory-mappable file
+
+Layout:
+    8 bytes   magic (b'DFSTORE1')
+    8 bytes   header length (little-endian uint64)
+    header    UTF-8 JSON (pattern keys, source file stamps, array table,
+              deduplicated polyline attributes and cad_json templates)
+    data      little-endian arrays, each aligned to 64 bytes
+
+Each product/type table holds:
+    credit_sqft, num_pieces, is_rectangular    metadata columns
+    pattern_values, pattern_offsets            array_pattern, flattened
+    shoulder_coords, shoulder_offsets          shoulder rings, flattened
+    points, point_offsets                      every polyline's points
+    polyline_offsets, polyline_style           polylines per config
+    cad_template                               non-polyline cad_json fields
+
+Build with:
+    python config_store.py [--json-dir json] [--output json/configs.dfstore]
+"""
+
+import os
+import json
+import struct
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from file_stamps import file_stamp, source_record, matches_source
+
+
+MAGIC = b'DFSTORE1'
+STORE_VERSION = 1
+STORE_FILENAME = 'configs.dfstore'
+ALIGNMENT = 64
+
+PRODUCTS = ['mps9', 'arc24', 'eq36lp']
+CONFIG_TYPES = ['bed', 'trench']
+
+METADATA_COLUMNS = ('array_pattern', 'num_pieces', 'credit_sqft', 'is_rectangular')
+
+
+def source_files(json_dir):
+    """Configuration JSON files that exist in a directory, keyed by table name"""
+    json_dir = Path(json_dir)
+    sources = {}
+    for product in PRODUCTS:
+        for config_type in CONFIG_TYPES:
+            path = json_dir / f"{product}_{config_type}.json"
+            if path.exists():
+                sources[f"{product}_{config_type}"] = path
+    return sources
+
+
+def source_stamps(json_dir):
+    """
+    Size and modification time of each configuration JSON file
+
+    Args:
+        json_dir: Directory containing the configuration JSON files
+
+    Returns:
+        Dictionary of table name -> {'size', 'mtime_ns'}
+    """
+    return {key: file_stamp(path) for key, path in source_files(json_dir).items()}
+
+
+def _is_standard_metadata(metadata):
+    """True if the metadata round-trips through the column arrays unchanged"""
+    return (
+        tuple(metadata) == METADATA_COLUMNS
+        and isinstance(metadata['array_pattern'], list)
+        and all(type(v) is int for v in metadata['array_pattern'])
+        and type(metadata['num_pieces']) is int
+        and type(metadata['credit_sqft']) is float
+        and type(metadata['is_rectangular']) is bool
+    )
+
+
+def _table_arrays(configs, styles, templates):
+    """Column arrays and header entry for one product/type"""
+    pattern_keys = list(configs)
+    count = len(pattern_keys)
+
+    credit = np.zeros(count, dtype='<f8')
+    pieces = np.zeros(count, dtype='<i4')
+    rectangular = np.zeros(count, dtype='|u1')
+    pattern_values = []
+    pattern_offsets = [0]
+    shoulder_coords = []
+    shoulder_offsets = [0]
+    points = []
+    point_offsets = [0]
+    polyline_offsets = [0]
+    polyline_style = []
+    cad_template = np.zeros(count, dtype='<u2')
+    metadata_overrides = {}
+
+    for i, pattern_key in enumerate(pattern_keys):
+        config = configs[pattern_key]
+        metadata = config['metadata']
+
+        if _is_standard_metadata(metadata):
+            credit[i] = metadata['credit_sqft']
+            pieces[i] = metadata['num_pieces']
+            rectangular[i] = metadata['is_rectangular']
+            pattern_values.extend(metadata['array_pattern'])
+        else:
+            metadata_overrides[str(i)] = metadata
+            credit[i] = metadata.get('credit_sqft', 0) or 0
+            pieces[i] = metadata.get('num_pieces', 0) or 0
+            rectangular[i] = bool(metadata.get('is_rectangular', False))
+        pattern_offsets.append(len(pattern_values))
+
+        cad_json = config['cad_json']
+        shoulder_found = False
+        for polyline in cad_json['polylines']:
+            coords = [(pt['x'], pt['y']) for pt in polyline['points']]
+            points.extend(coords)
+            point_offsets.append(len(points))
+
+            style = json.dumps({k: (None if k == 'points' else v) for k, v in polyline.items()})
+            polyline_style.append(styles.setdefault(style, len(styles)))
+
+            # Same rule as extract_shoulder_polygon: first closed polyline
+            if not shoulder_found and polyline.get('closed', False):
+                shoulder_coords.extend(coords)
+                shoulder_found = True
+        shoulder_offsets.append(len(shoulder_coords))
+        polyline_offsets.append(len(point_offsets) - 1)
+
+        template = json.dumps({k: (None if k == 'polylines' else v) for k, v in cad_json.items()})
+        cad_template[i] = templates.setdefault(template, len(templates))
+
+    arrays = {
+        'credit_sqft': credit,
+        'num_pieces': pieces,
+        'is_rectangular': rectangular,
+        'pattern_values': np.asarray(pattern_values, dtype='<i4'),
+        'pattern_offsets': np.asarray(pattern_offsets, dtype='<i8'),
+        'shoulder_coords': np.asarray(shoulder_coords, dtype='<f8').reshape(-1, 2),
+        'shoulder_offsets': np.asarray(shoulder_offsets, dtype='<i8'),
+        'points': np.asarray(points, dtype='<f8').reshape(-1, 2),
+        'point_offsets': np.asarray(point_offsets, dtype='<i8'),
+        'polyline_offsets': np.asarray(polyline_offsets, dtype='<i8'),
+        'polyline_style': np.asarray(polyline_style, dtype='<u2'),
+        'cad_template': cad_template,
+    }
+    header = {
+        'pattern_keys': pattern_keys,
+        'metadata_overrides': metadata_overrides,
+    }
+    return header, arrays
+
+
+def build_store(json_dir, output=None):
+    """
+    Compile the configuration JSON files in a directory into a store
+
+    The file is written next to the JSON files by default, through a
+    temporary file so a running loader never sees a partial store.
+
+    Args:
+        json_dir: Directory containing the configuration JSON files
+        output: Store path (default json_dir/configs.dfstore)
+
+    Returns:
+        Path of the written store
+    """
+    json_dir = Path(json_dir)
+    output = Path(output) if output else json_dir / STORE_FILENAME
+
+    sources = source_files(json_dir)
+    if not sources:
+        raise FileNotFoundError(f"No configuration JSON files found in {json_dir}")
+
+    styles = {}
+    templates = {}
+    tables = {}
+    table_arrays = {}
+
+    for key, path in sources.items():
+        source = source_record(path)
+        with open(path, 'r') as f:
+            configs = json.load(f)
+        header, arrays = _table_arrays(configs, styles, templates)
+        header['source'] = {'file': path.name, **source}
+        tables[key] = header
+        table_arrays[key] = arrays
+
+    # Lay out every array on an aligned offset inside the data section
+    chunks = []
+    offset = 0
+    for key, arrays in table_arrays.items():
+        layout = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            layout[name] = {'offset': offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            data = array.tobytes()
+            padding = (-len(data)) % ALIGNMENT
+            chunks.append(data + b'\0' * padding)
+            offset += len(data) + padding
+        tables[key]['arrays'] = layout
+
+    header = json.dumps({
+        'version': STORE_VERSION,
+        'tables': tables,
+        'polyline_styles': [json.loads(s) for s in styles],
+        'cad_templates': [json.loads(t) for t in templates],
+    }).encode('utf-8')
+    header += b' ' * ((-(len(MAGIC) + 8 + len(header))) % ALIGNMENT)
+
+    temporary = output.with_name(output.name + '.tmp')
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temporary, output)
+
+    return output
+
+
+class ConfigStore:
+    """Read-only, memory-mapped view of a compiled configuration store"""
+
+    def __init__(self, path):
+        """
+        Open a store and map its data section
+
+        Args:
+            path: Store file written by build_store
+        """
+        self.path = Path(path)
+
+        with open(self.path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a configuration store")
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length))
+
+        if header.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported configuration store version {header.get('version')}")
+
+        self.tables = header['tables']
+        self.polyline_styles = header['polyline_styles']
+        self.cad_templates = header['cad_templates']
+
+        data_start = len(MAGIC) + 8 + header_length
+        self._data = np.memmap(self.path, dtype=np.uint8, mode='r', offset=data_start)
+        self._tables = {}
+
+    def is_fresh(self, json_dir):
+        """
+        Check the store against the JSON files it was built from
+
+        Args:
+            json_dir: Directory containing the configuration JSON files
+
+        Returns:
+            True if the same files exist with the same content (size and
+            mtime, falling back to a content hash when only the mtime moved,
+            e.g. after a fresh checkout; see file_stamps)
+        """
+        sources = source_files(json_dir)
+        if set(sources) != set(self.tables):
+            return False
+
+        for key, path in sources.items():
+            if not matches_source(path, self.tables[key]['source']):
+                return False
+
+        return True
+
+    def array(self, key, name):
+        """Zero-copy view of one array of a table"""
+        spec = self.tables[key]['arrays'][name]
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'])) if spec['shape'] else 1
+        if count == 0:
+            return np.empty(spec['shape'], dtype=dtype)
+        view = np.frombuffer(self._data, dtype=dtype, count=count, offset=spec['offset'])
+        return view.reshape(spec['shape'])
+
+    def fit_index(self, key):
+        """
+        Fit records of one product/type (everything the selector searches on)
+
+        Args:
+            key: Table name such as 'mps9_bed'
+
+        Returns:
+            Dictionary of pattern_key -> {'metadata', 'shoulder'}, in file order
+        """
+        table = self._table(key)
+        return {pattern_key: {'metadata': table.metadata(i), 'shoulder': table.shoulder(i)}
+                for i, pattern_key in enumerate(self.tables[key]['pattern_keys'])}
+
+    def cad_json(self, key, pattern_key):
+        """
+        Rebuild one configuration's cad_json from the mapped arrays
+
+        Args:
+            key: Table name such as 'mps9_bed'
+            pattern_key: Configuration pattern key
+
+        Returns:
+            cad_json dictionary, exactly as it appears in the JSON file
+        """
+        table = self._table(key)
+        return table.cad_json(table.index[pattern_key])
+
+    def _table(self, key):
+        """StoredTable for a product/type, created on first use"""
+        if key not in self._tables:
+            self._tables[key] = StoredTable(self, key)
+        return self._tables[key]
+
+
+class StoredTable:
+    """Array views of one product/type"""
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+
+        header = store.tables[key]
+        self.index = {pattern_key: i for i, pattern_key in enumerate(header['pattern_keys'])}
+        self.metadata_overrides = header['metadata_overrides']
+        for name in header['arrays']:
+            setattr(self, name, store.array(key, name))
+
+    def metadata(self, i):
+        """Metadata dictionary for config i"""
+        override = self.metadata_overrides.get(str(i))
+        if override is not None:
+            return override
+
+        start, end = self.pattern_offsets[i], self.pattern_offsets[i + 1]
+        return {
+            'array_pattern': [int(v) for v in self.pattern_values[start:end]],
+            'num_pieces': int(self.num_pieces[i]),
+            'credit_sqft': float(self.credit_sqft[i]),
+            'is_rectangular': bool(self.is_rectangular[i]),
+        }
+
+    def shoulder(self, i):
+        """(N, 2) view of config i's shoulder ring (empty if it has none)"""
+        return self.shoulder_coords[self.shoulder_offsets[i]:self.shoulder_offsets[i + 1]]
+
+    def cad_json(self, i):
+        """Rebuild config i's cad_json exactly as it appears in the JSON file"""
+        polylines = []
+        for line in range(self.polyline_offsets[i], self.polyline_offsets[i + 1]):
+            coords = self.points[self.point_offsets[line]:self.point_offsets[line + 1]]
+            points = [{'x': x, 'y': y} for x, y in coords.tolist()]
+            style = self.store.polyline_styles[self.polyline_style[line]]
+            polylines.append({k: (points if k == 'points' else v) for k, v in style.items()})
+
+        template = self.store.cad_templates[self.cad_template[i]]
+        return {k: (polylines if k == 'polylines' else json.loads(json.dumps(v)))
+                for k, v in template.items()}
+
+
+def open_store(store_path, json_dir):
+    """
+    Open a store if it exists and matches the JSON files
+
+    Args:
+        store_path: Store file path
+        json_dir: Directory containing the configuration JSON files
+
+    Returns:
+        ConfigStore, or None if the store is missing, unreadable or stale
+    """
+    if not Path(store_path).exists():
+        return None
+
+    try:
+        store = ConfigStore(store_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"  ✗ Warning: could not open configuration store: {e}")
+        return None
+
+    if not store.is_fresh(json_dir):
+        print(f"  ✗ Warning: {Path(store_path).name} is stale, loading JSON")
+        return None
+
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the compiled configuration store")
+    parser.add_argument('--json-dir', default=str(Path(__file__).resolve().parent / 'json'))
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    output = build_store(args.json_dir, args.output)
+    store = ConfigStore(output)
+    counts = ', '.join(f"{key} ({len(t['pattern_keys'])})" for key, t in store.tables.items())
+    print(f"✓ Wrote {output} ({output.stat().st_size:,} bytes): {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""
+Compiled Data Store
+Packs every CSV rule table in data/ into one versioned, checksummed file
+
+Layout:
+    8 bytes   magic (b'DFDATA01')
+    8 bytes   header length (little-endian uint64)
+    header    UTF-8 JSON (version, payload SHA-256, source file stamps)
+    payload   UTF-8 JSON object of table name -> [column names, rows],
+              every row a list of the CSV's strings
+
+The payload is plain data, like the configuration store's arrays, so
+opening a store never runs code from the file.
+
+Loaders read tables through read_table(), which returns the same row
+dictionaries csv.DictReader would. A table comes from the store when the
+store holds it and its CSV is unchanged (or absent, e.g. a deployment
+that ships only the store), otherwise from the CSV. The store is opened
+once per process and checked against its payload checksum.
+
+Default paths are relative to this module, not the working directory.
+
+Build with:
+    python data_store.py [--data-dir data] [--output data/tables.dfdata]
+"""
+
+import os
+import csv
+import json
+import struct
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+
+from file_stamps import file_stamp, file_digest, source_record, matches_source
+
+
+MAGIC = b'DFDATA01'
+DATA_VERSION = 2
+DATA_FILENAME = 'tables.dfdata'
+
+# Data directory shipped alongside the modules
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+# Open stores, keyed by path: (size, mtime_ns, DataStore or None)
+_stores = {}
+_stores_lock = threading.Lock()
+
+def _read_csv(path):
+    """(column names, row tuples) of a CSV file"""
+    with open(path, 'r', newline='') as f:
+        reader = csv.DictReader(f)
+        fields = tuple(reader.fieldnames or ())
+        rows = tuple(tuple(row[name] for name in fields) for row in reader)
+    return fields, rows
+
+
+def build_data_store(data_dir=DATA_DIR, output=None):
+    """
+    Compile every CSV in a directory into a data store
+
+    Written through a temporary file so a running loader never sees a
+    partial store.
+
+    Args:
+        data_dir: Directory containing the CSV data files
+        output: Store path (default data_dir/tables.dfdata)
+
+    Returns:
+        Path of the written store
+    """
+    data_dir = Path(data_dir)
+    output = Path(output) if output else data_dir / DATA_FILENAME
+
+    paths = sorted(data_dir.glob('*.csv'))
+    if not paths:
+        raise FileNotFoundError(f"No CSV data files found in {data_dir}")
+
+    tables = {}
+    sources = {}
+    for path in paths:
+        sources[path.name] = source_record(path)
+        tables[path.name] = _read_csv(path)
+
+    payload = json.dumps(tables, separators=(',', ':')).encode('utf-8')
+    header = json.dumps({
+        'version': DATA_VERSION,
+        'payload_sha256': hashlib.sha256(payload).hexdigest(),
+        'sources': sources,
+    }).encode('utf-8')
+
+    temporary = output.with_name(output.name + '.tmp')
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        f.write(payload)
+    os.replace(temporary, output)
+
+    return output
+
+
+class DataStore:
+    """Tables of a compiled data store, loaded into memory"""
+
+    def __init__(self, path):
+        """
+        Read a store and verify its checksum
+
+        Args:
+            path: Store file written by build_data_store
+        """
+        self.path = Path(path)
+
+        with open(self.path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a data store")
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length))
+            payload = f.read()
+
+        if header.get('version') != DATA_VERSION:
+            raise ValueError(f"Unsupported data store version {header.get('version')}")
+        if hashlib.sha256(payload).hexdigest() != header.get('payload_sha256'):
+            raise ValueError(f"{self.path.name} checksum does not match its contents")
+
+        self.sources = header['sources']
+        self.tables = json.loads(payload)
+        # Tables already found stale, so the warning is printed once
+        self._stale = set()
+
+    def is_fresh(self, data_dir, name):
+        """
+        Check one table against its CSV
+
+        Args:
+            data_dir: Directory containing the CSV data files
+            name: CSV file name, e.g. 'fdep_tank_sizing.csv'
+
+        Returns:
+            True if the CSV is absent or has the content the table was
+            built from (size and mtime, falling back to a content hash
+            when only the mtime moved, e.g. after a fresh checkout)
+        """
+        path = Path(data_dir) / name
+        if not path.exists():
+            return True
+
+        return matches_source(path, self.sources[name])
+
+    def rows(self, name):
+        """
+        Rows of a table, as csv.DictReader would give them
+
+        Args:
+            name: CSV file name
+
+        Returns:
+            List of new row dictionaries (column name -> string)
+        """
+        fields, rows = self.tables[name]
+        return [dict(zip(fields, row)) for row in rows]
+
+    def current_rows(self, data_dir, name):
+        """
+        Rows of a table if the store holds it and it is fresh
+
+        Args:
+            data_dir: Directory containing the CSV data files
+            name: CSV file name
+
+        Returns:
+            List of row dictionaries, or None (the caller reads the CSV)
+        """
+        if name not in self.tables:
+            return None
+        if self.is_fresh(data_dir, name):
+            return self.rows(name)
+
+        if name not in self._stale:
+            self._stale.add(name)
+            print(f"  ✗ Warning: {self.path.name} is stale for {name}, reading CSV")
+        return None
+
+
+def open_data_store(data_dir=DATA_DIR):
+    """
+    The data store in a directory, opened once per process
+
+    Reopened when the file changes. Missing or unreadable stores give None
+    (with a warning for unreadable ones).
+
+    Args:
+        data_dir: Directory containing tables.dfdata
+
+    Returns:
+        DataStore, or None
+    """
+    path = Path(data_dir).resolve() / DATA_FILENAME
+    try:
+        stamp = file_stamp(path)
+    except OSError:
+        return None
+
+    with _stores_lock:
+        cached = _stores.get(path)
+        if cached is not None and cached[:2] == (stamp['size'], stamp['mtime_ns']):
+            return cached[2]
+
+        try:
+            store = DataStore(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  ✗ Warning: could not open data store: {e}")
+            store = None
+
+        _stores[path] = (stamp['size'], stamp['mtime_ns'], store)
+        return store
+
+
+def read_table(data_dir, name):
+    """
+    Rows of one data table, from the compiled store when it is current
+
+    Args:
+        data_dir: Directory containing the CSV data files (and the store)
+        name: CSV file name, e.g. 'fdep_sewage_flows.csv'
+
+    Returns:
+        List of row dictionaries (column name -> string), or None if
+        neither the store nor the directory has the table
+    """
+    store = open_data_store(data_dir)
+    if store is not None:
+        rows = store.current_rows(data_dir, name)
+        if rows is not None:
+            return rows
+
+    path = Path(data_dir) / name
+    if not path.exists():
+        return None
+
+    with open(path, 'r') as f:
+        return list(csv.DictReader(f))
+
+
+def table_digest(data_dir, name):
+    """
+    SHA-256 of a data table's CSV content
+
+    Taken from the store's source record when the table is current there,
+    so CSV and store-only deployments give the same digest without
+    reading the CSV.
+
+    Args:
+        data_dir: Directory containing the CSV data files (and the store)
+        name: CSV file name
+
+    Returns:
+        Hex digest, or None if neither the store nor the directory has the table
+    """
+    store = open_data_store(data_dir)
+    if store is not None and name in store.tables and store.is_fresh(data_dir, name):
+        return store.sources[name]['sha256']
+
+    path = Path(data_dir) / name
+    if not path.exists():
+        return None
+    return file_digest(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the compiled data store")
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    output = build_data_store(args.data_dir, args.output)
+    store = DataStore(output)
+    counts = ', '.join(f"{name} ({len(rows)})" for name, (fields, rows) in store.tables.items())
+    print(f"✓ Wrote {output} ({output.stat().st_size:,} bytes): {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+"""
+Design Table Module
+Precomputed flow -> design parameters for every reachable sewage flow
+
+Sewage flows come from a short list of table steps plus 60 GPD overflow
+increments, so everything that depends only on the flow can be worked
+out once: tank and pump sizes, the stocked tank sizes the specification
+uses, and for each of the 8 hierarchy levels the required square footage,
+the FDEP requirements row and where the candidate list starts for each
+product. A design then does one dictionary lookup instead of repeating
+that arithmetic and searching.
+
+Overflow flows are covered up to the largest flow any rule table lists
+(flow_limit); past it every table is clamped to its last row, and callers
+get None from lookup() and calculate those designs directly.
+
+ATU size also depends on bedrooms and square footage and is not stored.
+
+The table is kept in memory, and can be saved as JSON with a digest of
+everything it was built from; load() returns None when the digest no
+longer matches. The digest takes the configuration files' size and
+modification time rather than their content, so checking it at startup
+reads no JSON (a touched file just rebuilds the table).
+"""
+
+import os
+import json
+import hashlib
+from bisect import bisect_left
+from pathlib import Path
+
+from drainfield_requirements import CONFIG_NAMES
+from config_store import source_stamps
+from config_generator import MATERIALS_FILENAME
+from data_store import table_digest
+
+
+# Bump when the row layout changes
+TABLE_VERSION = 2
+
+# Hierarchy levels, in CONFIG_NAMES order ('trench' ... 'split_bed_atu')
+CONFIG_TYPES = tuple(CONFIG_NAMES)
+
+# CSV tables the stored values are derived from
+SOURCE_TABLES = ('fdep_sewage_flows.csv', 'fdep_tank_sizing.csv',
+                 'fdep_drainfield_configs.csv', 'fdep_tanks.csv')
+
+
+def flow_limit(tank_sizer, drainfield_requirements):
+    """
+    Largest flow listed in the tank sizing or drainfield requirement tables
+
+    Args:
+        tank_sizer: TankSizer
+        drainfield_requirements: DrainFieldRequirements
+
+    Returns:
+        Flow in GPD
+    """
+    flows = [row['max_flow_gpd'] for row in tank_sizer.tank_data]
+    if drainfield_requirements.highest_flow is not None:
+        flows.append(drainfield_requirements.highest_flow)
+    return max(flows)
+
+
+def reachable_flows(flow_calculator, max_flow):
+    """
+    Every flow calculate_flow can return, with overflow steps up to a limit
+
+    Args:
+        flow_calculator: SewageFlowCalculator
+        max_flow: Largest overflow flow to include (table flows are always
+                  included)
+
+    Returns:
+        Sorted list of flows in GPD
+    """
+    flows = set()
+    for ranges in flow_calculator.flow_data.values():
+        flows.update(r['flow_gpd'] for r in ranges)
+
+        # 60 GPD per additional 750 sqft past the largest range
+        last_range = max(ranges, key=lambda x: x['sqft_max'])
+        flows.update(range(last_range['flow_gpd'] + 60, max_flow + 1, 60))
+
+    return sorted(flows)
+
+
+def source_digest(data_dir, config_loader, product_priority):
+    """
+    Digest of the inputs a table is built from
+
+    Args:
+        data_dir: Directory containing CSV data files
+        config_loader: ConfigLoader the candidate starts come from
+        product_priority: Selector product order
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{TABLE_VERSION}".encode())
+    for name in SOURCE_TABLES:
+        digest.update(name.encode())
+        digest.update(str(table_digest(data_dir, name)).encode())
+
+    # Configuration files by stat stamp, as the configuration store checks them
+    digest.update(json.dumps(source_stamps(config_loader.json_dir), sort_keys=True).encode())
+    generator = config_loader.generator
+    if generator is not None and config_loader.generate_missing:
+        digest.update(str(table_digest(generator.data_dir, MATERIALS_FILENAME)).encode())
+        digest.update(f"{generator.max_rows}x{generator.max_pieces_per_row}".encode())
+    digest.update(json.dumps(list(product_priority)).encode())
+    return digest.hexdigest()
+
+
+class DesignTable:
+    """Flow -> precomputed design parameters"""
+
+    def __init__(self, rows, stocked_septic_sizes, max_flow, digest=None):
+        """
+        Args:
+            rows: Dictionary of flow_gpd -> row (see build)
+            stocked_septic_sizes: SpecificationGenerator.available_tank_sizes
+            max_flow: Overflow flows are covered up to this flow
+            digest: Optional source_digest the rows were built from
+        """
+        self.rows = rows
+        self.stocked_septic_sizes = list(stocked_septic_sizes)
+        self.max_flow = max_flow
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, flow_calculator, tank_sizer, drainfield_requirements, spec_generator,
+              selector, max_flow=None, digest=None):
+        """
+        Compute the table from loaded components
+
+        Args:
+            flow_calculator: SewageFlowCalculator (for the reachable flows)
+            tank_sizer: TankSizer
+            drainfield_requirements: DrainFieldRequirements
+            spec_generator: SpecificationGenerator (stocked tank sizes)
+            selector: DrainFieldSelector (required sqft and candidate indexes)
+            max_flow: Largest overflow flow covered (default: flow_limit)
+            digest: Optional source_digest to record
+
+        Returns:
+            DesignTable
+        """
+        if max_flow is None:
+            max_flow = flow_limit(tank_sizer, drainfield_requirements)
+
+        rows = {}
+        for flow_gpd in reachable_flows(flow_calculator, max_flow):
+            septic_tank = tank_sizer.get_septic_tank_size(flow_gpd)
+            dosing_tank = tank_sizer.get_pump_tank_size(flow_gpd, is_residential=True)
+
+            config_types = {}
+            for config_type in CONFIG_TYPES:
+                required_sqft = selector.hierarchy_requirement(flow_gpd, config_type)[0]
+                base_type = 'trench' if 'trench' in config_type else 'bed'
+
+                candidate_starts = {}
+                for product in selector.product_priority:
+                    index = selector.config_loader.get_candidate_index(product, base_type)
+                    if index is not None:
+                        candidate_starts[f"{product}_{base_type}"] = index.starts(required_sqft)
+
+                config_types[config_type] = {
+                    'required_sqft': required_sqft,
+                    'requirements': drainfield_requirements.get_requirements(flow_gpd,
+                                                                             config_type),
+                    'candidate_starts': candidate_starts,
+                }
+
+            rows[flow_gpd] = {
+                'flow_gpd': flow_gpd,
+                'septic_tank': septic_tank,
+                # Whether the 75 gallons per extra dwelling unit applies
+                'septic_tank_per_home': tank_sizer.get_septic_tank_size(flow_gpd, 2)
+                                        != septic_tank,
+                'dosing_tank': dosing_tank,
+                'pump_tank_commercial': tank_sizer.get_pump_tank_size(flow_gpd,
+                                                                      is_residential=False),
+                'actual_septic_tank': spec_generator.get_actual_tank_size(septic_tank),
+                'actual_dosing_tank': spec_generator.get_actual_dosing_tank_size(dosing_tank),
+                'config_types': config_types,
+            }
+
+        return cls(rows, spec_generator.available_tank_sizes, max_flow, digest)
+
+    def get(self, flow_gpd):
+        """
+        Row for a flow
+
+        Returns:
+            Row dictionary, or None for a flow outside the table
+        """
+        return self.rows.get(flow_gpd)
+
+    def lookup(self, flow_gpd, num_homes=1):
+        """
+        Tank sizes for a design, adjusted for the number of dwelling units
+
+        Args:
+            flow_gpd: Sewage flow in gallons per day
+            num_homes: Number of dwelling units
+
+        Returns:
+            Row dictionary (a copy when num_homes changes the septic tank),
+            or None for a flow outside the table
+        """
+        row = self.rows.get(flow_gpd)
+        if row is None or num_homes <= 1 or not row['septic_tank_per_home']:
+            return row
+
+        # Add 75 gallons per additional dwelling unit, then the next stocked size
+        septic_tank = row['septic_tank'] + num_homes * 75
+        i = bisect_left(self.stocked_septic_sizes, septic_tank)
+        actual = self.stocked_septic_sizes[i] if i < len(self.stocked_septic_sizes) else septic_tank
+        return dict(row, septic_tank=septic_tank, actual_septic_tank=actual)
+
+    def save(self, path):
+        """Write the table as JSON"""
+        payload = {
+            'version': TABLE_VERSION,
+            'digest': self.digest,
+            'stocked_septic_sizes': self.stocked_septic_sizes,
+            'max_flow': self.max_flow,
+            'rows': list(self.rows.values()),
+        }
+        # Through a temporary file so another process never reads a partial table
+        path = Path(path)
+        temporary = path.with_name(path.name + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path, digest=None):
+        """
+        Read a saved table
+
+        Args:
+            path: JSON file written by save
+            digest: Expected source_digest (None to skip the check)
+
+        Returns:
+            DesignTable, or None if the file is missing, from another
+            version, or built from different inputs
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        with open(path, 'r') as f:
+            payload = json.load(f)
+
+        if payload.get('version') != TABLE_VERSION:
+            return None
+        if digest is not None and payload.get('digest') != digest:
+            return None
+
+        rows = {}
+        for row in payload['rows']:
+            for level in row['config_types'].values():
+                level['candidate_starts'] = {key: tuple(starts) for key, starts
+                                             in level['candidate_starts'].items()}
+            rows[row['flow_gpd']] = row
+
+        return cls(rows, payload['stocked_septic_sizes'], payload['max_flow'],
+                   payload.get('digest'))
@@ -3,14 +3,31 @@ Drainfield Requirements Module
 Provides drainfield sizing requirements based on flow and configuration type
 """
 
-import csv
+from bisect import bisect_left
 from pathlib import Path
 
+import numpy as np
+
+from data_store import DATA_DIR, read_table
+
+
+# Map config_type to CSV configuration_name
+CONFIG_NAMES = {
+    'trench': 'Trench',
+    'bed': 'Bed',
+    'trench_atu': 'Trench with ATU',
+    'bed_atu': 'Bed with ATU',
+    'split_trench': 'Trench split in half',
+    'split_bed': 'Bed split in half',
+    'split_trench_atu': 'Trench split in half with ATU',
+    'split_bed_atu': 'Bed split in half with ATU'
+}
+
 
 class DrainFieldRequirements:
     """Handles drainfield requirement lookups"""
 
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir=DATA_DIR):
         """
         Initialize with drainfield requirements data
 
@@ -19,29 +36,43 @@ class DrainFieldRequirements:
         """
         self.data_dir = Path(data_dir)
         self.requirements = {}
+        # configuration_name -> sorted flows that have a row for it
+        self.flows_by_name = {}
+        # Highest flow in the table (the last-resort row for every name)
+        self.highest_flow = None
         self._load_data()
+        self._compile()
 
     def _load_data(self):
-        """Load drainfield requirements from CSV"""
-        csv_path = self.data_dir / "fdep_drainfield_configs.csv"
-
-        if not csv_path.exists():
-            raise FileNotFoundError(f"Drainfield config data not found at {csv_path}")
-
-        with open(csv_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                flow_gpd = int(row['flow_gpd'])
-                config_name = row['configuration_name'].strip()
-                drainfield_size = int(row['drainfield_size'])
-                unobstructed_area = int(row['unobstructed_area'])
-
-                # Create key from flow and config name
-                key = (flow_gpd, config_name)
-                self.requirements[key] = {
-                    'drainfield_size': drainfield_size,
-                    'unobstructed_area': unobstructed_area
-                }
+        """Load drainfield requirements from CSV (or the compiled data store)"""
+        rows = read_table(self.data_dir, "fdep_drainfield_configs.csv")
+
+        if rows is None:
+            raise FileNotFoundError(
+                f"Drainfield config data not found at {self.data_dir / 'fdep_drainfield_configs.csv'}")
+
+        for row in rows:
+            flow_gpd = int(row['flow_gpd'])
+            config_name = row['configuration_name'].strip()
+            drainfield_size = int(row['drainfield_size'])
+            unobstructed_area = int(row['unobstructed_area'])
+
+            # Create key from flow and config name
+            key = (flow_gpd, config_name)
+            self.requirements[key] = {
+                'drainfield_size': drainfield_size,
+                'unobstructed_area': unobstructed_area
+            }
+
+    def _compile(self):
+        """Sorted flow list per configuration name for round-up lookups"""
+        for flow_gpd, config_name in self.requirements:
+            self.flows_by_name.setdefault(config_name, []).append(flow_gpd)
+        for flows in self.flows_by_name.values():
+            flows.sort()
+
+        if self.requirements:
+            self.highest_flow = max(k[0] for k in self.requirements)
 
     def get_requirements(self, flow_gpd, config_type):
         """
@@ -54,19 +85,7 @@ class DrainFieldRequirements:
         Returns:
             Dictionary with drainfield_size and unobstructed_area, or None if not found
         """
-        # Map config_type to CSV configuration_name
-        config_map = {
-            'trench': 'Trench',
-            'bed': 'Bed',
-            'trench_atu': 'Trench with ATU',
-            'bed_atu': 'Bed with ATU',
-            'split_trench': 'Trench split in half',
-            'split_bed': 'Bed split in half',
-            'split_trench_atu': 'Trench split in half with ATU',
-            'split_bed_atu': 'Bed split in half with ATU'
-        }
-
-        config_name = config_map.get(config_type)
+        config_name = CONFIG_NAMES.get(config_type)
         if not config_name:
             return None
 
@@ -75,27 +94,62 @@ class DrainFieldRequirements:
         if key in self.requirements:
             return self.requirements[key]
 
-        # If not found, find closest flow_gpd (round up)
-        available_flows = sorted(set(k[0] for k in self.requirements.keys()))
-
-        # Find the next higher flow rate
-        for available_flow in available_flows:
-            if available_flow >= flow_gpd:
-                key = (available_flow, config_name)
-                if key in self.requirements:
-                    return self.requirements[key]
+        # If not found, use the next higher flow listed for this configuration
+        flows = self.flows_by_name.get(config_name, [])
+        i = bisect_left(flows, flow_gpd)
+        if i < len(flows) and flows[i] >= flow_gpd:
+            return self.requirements[(flows[i], config_name)]
 
         # If still not found, use highest available
-        if available_flows:
-            key = (available_flows[-1], config_name)
-            if key in self.requirements:
-                return self.requirements[key]
+        key = (self.highest_flow, config_name)
+        if key in self.requirements:
+            return self.requirements[key]
 
         return None
 
+    def get_requirements_batch(self, flow_gpd, config_type):
+        """
+        Vectorized get_requirements for one configuration type
+
+        Args:
+            flow_gpd: Array-like of flows in gallons per day
+            config_type: Configuration type (e.g., 'trench', 'bed', 'trench_atu')
+
+        Returns:
+            Tuple of (drainfield_size, unobstructed_area) float arrays, NaN
+            where get_requirements returns None
+        """
+        flow_gpd = np.asarray(flow_gpd, dtype=float)
+        drainfield_size = np.full(flow_gpd.shape, np.nan)
+        unobstructed_area = np.full(flow_gpd.shape, np.nan)
+
+        config_name = CONFIG_NAMES.get(config_type)
+        if not config_name:
+            return drainfield_size, unobstructed_area
+
+        # Next listed flow at or above each value (an exact match included)
+        flows = self.flows_by_name.get(config_name, [])
+        rows = [self.requirements[(flow, config_name)] for flow in flows]
+        i = np.searchsorted(np.asarray(flows, dtype=float), flow_gpd, side='left')
+        found = i < len(flows)
+
+        if flows:
+            sizes = np.asarray([r['drainfield_size'] for r in rows], dtype=float)
+            areas = np.asarray([r['unobstructed_area'] for r in rows], dtype=float)
+            drainfield_size[found] = sizes[i[found]]
+            unobstructed_area[found] = areas[i[found]]
+
+        # Otherwise the highest flow in the table, if listed for this name
+        fallback = self.requirements.get((self.highest_flow, config_name))
+        if fallback is not None:
+            drainfield_size[~found] = fallback['drainfield_size']
+            unobstructed_area[~found] = fallback['unobstructed_area']
+
+        return drainfield_size, unobstructed_area
+
 
 # Convenience function
-def get_drainfield_requirements(flow_gpd, config_type, data_dir="data"):
+def get_drainfield_requirements(flow_gpd, config_type, data_dir=DATA_DIR):
     """
     Quick function to get drainfield requirements
 
@@ -0,0 +1,74 @@
+"""
+File Stamps Module
+Staleness checks for the compiled stores against their source files
+
+The configuration and data stores record each source file's size,
+modification time and SHA-256 when they are built. A source is current
+when its size and mtime still match; when only the mtime moved (a fresh
+checkout or a touch), the content hash decides, and a match is remembered
+for the file's new stamp so later checks stay cheap.
+"""
+
+import os
+import hashlib
+from pathlib import Path
+
+
+# Source path -> (size, mtime_ns, sha256) whose content already matched a
+# store, so a file whose mtime moved is hashed once per process
+_verified = {}
+
+
+def file_stamp(path):
+    """Size and modification time used to detect a stale store"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_digest(path):
+    """SHA-256 of a file's content"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def source_record(path):
+    """
+    Source entry a store records for one file
+
+    Args:
+        path: Source file path
+
+    Returns:
+        Dictionary with 'sha256', 'size' and 'mtime_ns'
+    """
+    # Stamp first, so an edit made while hashing leaves the entry stale
+    stamp = file_stamp(path)
+    return {'sha256': file_digest(path), **stamp}
+
+
+def matches_source(path, source):
+    """
+    True if a file has the content recorded in a store's source entry
+
+    Args:
+        path: Source file path
+        source: Entry written by source_record when the store was built
+
+    Returns:
+        True if the size and mtime match, or only the mtime moved and the
+        content hash still matches
+    """
+    stamp = file_stamp(path)
+    if stamp['size'] != source['size']:
+        return False
+    if stamp['mtime_ns'] == source['mtime_ns']:
+        return True
+
+    key = str(Path(path).resolve())
+    verified = (stamp['size'], stamp['mtime_ns'], source['sha256'])
+    if _verified.get(key) == verified:
+        return True
+    if file_digest(path) != source['sha256']:
+        return False
+    _verified[key] = verified
+    return True
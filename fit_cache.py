@@ -0,0 +1,399 @@
+"""
+Fit Result Cache
+Persists hierarchy selections keyed by canonicalized boundary geometry
+"""
+
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import weakref
+from pathlib import Path
+
+import shapely
+from shapely.affinity import translate, rotate
+
+from geometry import canonical_frame, extract_shoulder_polygon, polygon_fits
+
+
+# Bump when the stored payload layout changes
+CACHE_VERSION = 2
+
+
+def canonicalize_boundary(polygon, grid_size=0.01):
+    """
+    Reduce a boundary to a translation- and rotation-independent form
+
+    The boundary is moved and rotated into its canonical frame (see
+    geometry.canonical_frame, the frame DrainFieldSelector searches
+    rotations in) and snapped to the grid, so every copy of a lot maps to
+    the same canonical geometry wherever it sits in the site plan.
+
+    Args:
+        polygon: Shapely Polygon of user boundary
+        grid_size: Snapping grid in feet
+
+    Returns:
+        Tuple of (digest: str, transform: (cx, cy, theta)) where the caller's
+        boundary is the canonical one rotated by theta degrees about the
+        origin and translated by (cx, cy)
+    """
+    cx, cy, theta = canonical_frame(polygon)
+    canonical = rotate(translate(polygon, -cx, -cy), -theta, origin=(0, 0))
+    wkb = shapely.to_wkb(shapely.normalize(shapely.set_precision(canonical, grid_size)))
+    return (hashlib.sha256(wkb).hexdigest(), (cx, cy, theta))
+
+
+def _to_canonical(point, transform):
+    """Map a point from caller coordinates into the canonical frame"""
+    cx, cy, theta = transform
+    radians = math.radians(-theta)
+    x, y = point[0] - cx, point[1] - cy
+    return (x * math.cos(radians) - y * math.sin(radians),
+            x * math.sin(radians) + y * math.cos(radians))
+
+
+def _from_canonical(point, transform):
+    """Map a point from the canonical frame into caller coordinates"""
+    cx, cy, theta = transform
+    radians = math.radians(theta)
+    x, y = point
+    return (x * math.cos(radians) - y * math.sin(radians) + cx,
+            x * math.sin(radians) + y * math.cos(radians) + cy)
+
+
+def same_selection(result, expected, tolerance=1e-6):
+    """
+    Check that two apply_hierarchy results select the same placement
+
+    Args:
+        result: Dictionary from apply_hierarchy (e.g. a cache hit)
+        expected: Dictionary from apply_hierarchy (e.g. a fresh search)
+        tolerance: Allowed difference in degrees and feet
+
+    Returns:
+        True if both agree on success, failure reason, split, product,
+        configuration type, pattern, rotation and offset
+    """
+    keys = ('success', 'reason', 'is_split', 'config_type')
+    if any(result.get(key) != expected.get(key) for key in keys):
+        return False
+    if not result['success']:
+        return True
+
+    if result.get('is_split'):
+        pairs = [(result[name], expected[name]) for name in ('drainfield_1', 'drainfield_2')]
+    else:
+        pairs = [(result, expected)]
+
+    for placed, fresh in pairs:
+        if (placed['product'], placed['config_type'], placed['pattern_key']) != \
+           (fresh['product'], fresh['config_type'], fresh['pattern_key']):
+            return False
+        turn = (placed['rotation'] - fresh['rotation'] + 180) % 360 - 180
+        if abs(turn) > tolerance:
+            return False
+        if abs(placed['offset_x'] - fresh['offset_x']) > tolerance or \
+           abs(placed['offset_y'] - fresh['offset_y']) > tolerance:
+            return False
+
+    return True
+
+
+def config_fingerprint(config_loader):
+    """
+    Hash the configuration files a loader reads
+
+    Args:
+        config_loader: ConfigLoader instance
+
+    Returns:
+        Hex digest of every configuration file present (name and content),
+        plus the materials table and limits used for generated configurations
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(config_loader.json_dir).glob('*.json')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+
+    generator = getattr(config_loader, 'generator', None)
+    if generator is not None and config_loader.generate_missing:
+        # The parsed table, so a deployment without the CSV (data store only) hashes the same
+        digest.update(json.dumps(generator.materials, sort_keys=True).encode())
+        digest.update(f"{generator.max_rows}x{generator.max_pieces_per_row}".encode())
+
+    return digest.hexdigest()
+
+
+class FitCache:
+    """SQLite-backed LRU cache of DrainFieldSelector.apply_hierarchy results"""
+
+    def __init__(self, db_path='fit_cache.sqlite', max_entries=5000, grid_size=0.01,
+                 verify=False):
+        """
+        Open (or create) the cache database
+
+        Args:
+            db_path: Path of the SQLite file (':memory:' for a throwaway cache)
+            max_entries: Entries kept before least recently used ones are evicted
+            grid_size: Snapping grid in feet for boundary canonicalization
+            verify: Cross-check every hit against a fresh selector search
+        """
+        if max_entries < 1:
+            raise ValueError(f"Cache size must be at least 1, got {max_entries}")
+
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self.grid_size = grid_size
+        self.verify = verify
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS fit_cache ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+        # Config content hash per loader; a reloaded loader is hashed afresh,
+        # so entries for replaced configurations simply stop matching
+        self._fingerprints = weakref.WeakKeyDictionary()
+        self.stats = {'hits': 0, 'misses': 0, 'verify_failures': 0, 'mismatches': 0,
+                      'hit_ms': 0.0, 'miss_ms': 0.0}
+
+    def close(self):
+        """Close the database connection"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def clear(self):
+        """Remove every cached entry"""
+        self.connection.execute("DELETE FROM fit_cache")
+        self.connection.commit()
+
+    def apply_hierarchy(self, selector, user_boundary, flow_gpd, split_boundaries=None,
+                        design_row=None):
+        """
+        Cached equivalent of selector.apply_hierarchy
+
+        A hit is mapped back into the caller's coordinates and re-checked
+        with polygon_fits before it is returned; a hit that no longer fits
+        is treated as a miss and overwritten. The selector must search
+        rotations in each boundary's canonical frame (canonical_frames=True),
+        so a hit, including a cached failure, is what a fresh search of the
+        moved or rotated copy would return; with verify set, every hit is
+        checked against one.
+
+        Args:
+            selector: DrainFieldSelector (with canonical_frames) to run on a miss
+            user_boundary: Shapely Polygon of user boundary
+            flow_gpd: Gallons per day
+            split_boundaries: Optional list of 2 boundaries for split system
+            design_row: Optional DesignTable row passed to the selector on a miss
+
+        Returns:
+            Dictionary in the same shape as DrainFieldSelector.apply_hierarchy
+        """
+        if not selector.canonical_frames:
+            raise ValueError("FitCache needs a DrainFieldSelector with canonical_frames=True")
+
+        start = time.perf_counter()
+
+        boundaries = [user_boundary] + list(split_boundaries or [])
+        canonical = [canonicalize_boundary(b, self.grid_size) for b in boundaries]
+        transforms = [transform for digest, transform in canonical]
+        key = self._key(selector, [digest for digest, transform in canonical],
+                        flow_gpd, split_boundaries is not None)
+
+        payload = self._get(key)
+        if payload is not None:
+            result = self._restore(selector, payload, boundaries, transforms)
+            if result is not None and self.verify:
+                expected = selector.apply_hierarchy(user_boundary, flow_gpd, split_boundaries,
+                                                    design_row)
+                if not same_selection(result, expected):
+                    print(f"Warning: fit cache returned {result.get('pattern_key')} "
+                          f"({result.get('reason')}), a fresh search gives "
+                          f"{expected.get('pattern_key')} ({expected.get('reason')})")
+                    self.stats['mismatches'] += 1
+                    self._put(key, self._payload(expected, transforms))
+                    return expected
+            if result is not None:
+                self.stats['hits'] += 1
+                self.stats['hit_ms'] += 1000.0 * (time.perf_counter() - start)
+                return result
+            self.stats['verify_failures'] += 1
+
+        result = selector.apply_hierarchy(user_boundary, flow_gpd, split_boundaries, design_row)
+        self._put(key, self._payload(result, transforms))
+        result.setdefault('search_stats', {})['fit_cache_misses'] = 1
+
+        self.stats['misses'] += 1
+        self.stats['miss_ms'] += 1000.0 * (time.perf_counter() - start)
+        return result
+
+    def summary(self):
+        """
+        Hit rate and latency since the cache was opened
+
+        Returns:
+            Dictionary with lookups, hits, misses, hit_rate, verify_failures,
+            mismatches (verify mode), avg_hit_ms and avg_miss_ms
+        """
+        hits = self.stats['hits']
+        misses = self.stats['misses']
+        lookups = hits + misses
+        return {
+            'lookups': lookups,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'verify_failures': self.stats['verify_failures'],
+            'mismatches': self.stats['mismatches'],
+            'avg_hit_ms': self.stats['hit_ms'] / hits if hits else 0.0,
+            'avg_miss_ms': self.stats['miss_ms'] / misses if misses else 0.0,
+        }
+
+    def _key(self, selector, digests, flow_gpd, is_split):
+        """Cache key for a set of boundaries, a flow and the selector settings"""
+        loader = selector.config_loader
+        if loader not in self._fingerprints:
+            self._fingerprints[loader] = config_fingerprint(loader)
+
+        settings = [
+            CACHE_VERSION,
+            self.grid_size,
+            selector.product_priority,
+            selector.allow_translation,
+            selector.anchor,
+            selector.rotation_budget,
+            selector.simplify_tolerance,
+            self._fingerprints[loader],
+            digests,
+            flow_gpd,
+            is_split,
+        ]
+        return hashlib.sha256(json.dumps(settings).encode()).hexdigest()
+
+    def _get(self, key):
+        """Stored payload for a key (refreshing its LRU position), or None"""
+        row = self.connection.execute(
+            "SELECT payload FROM fit_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.connection.execute(
+            "UPDATE fit_cache SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        self.connection.commit()
+        return json.loads(row[0])
+
+    def _put(self, key, payload):
+        """Store a payload and evict the least recently used overflow"""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO fit_cache (key, payload, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(payload), time.time())
+        )
+
+        count = self.connection.execute("SELECT COUNT(*) FROM fit_cache").fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM fit_cache WHERE key IN "
+                "(SELECT key FROM fit_cache ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+        self.connection.commit()
+
+    def _payload(self, result, transforms):
+        """Strip a selector result down to what is needed to rebuild it"""
+        payload = {
+            key: value for key, value in result.items()
+            if key not in ('search_stats', 'drainfield_1', 'drainfield_2',
+                           'config_data', 'metadata', 'fitted_polygon',
+                           'rotation', 'offset_x', 'offset_y')
+        }
+
+        if result['success'] and result.get('is_split'):
+            payload['drainfield_1'] = self._placement(result['drainfield_1'], transforms[1])
+            payload['drainfield_2'] = self._placement(result['drainfield_2'], transforms[2])
+        elif result['success']:
+            payload['placement'] = self._placement(result, transforms[0])
+
+        return payload
+
+    def _placement(self, result, transform):
+        """Selection with rotation and position relative to the canonical frame"""
+        shoulder = extract_shoulder_polygon(result['config_data'])
+        centroid = shoulder.centroid
+        placed = (centroid.x + result['offset_x'], centroid.y + result['offset_y'])
+
+        relative = {
+            key: value for key, value in result.items()
+            if key not in ('config_data', 'metadata', 'fitted_polygon',
+                           'rotation', 'offset_x', 'offset_y')
+        }
+        relative['rotation'] = (result['rotation'] - transform[2]) % 360
+        relative['position'] = _to_canonical(placed, transform)
+        return relative
+
+    def _restore(self, selector, payload, boundaries, transforms):
+        """Rebuild a cached result in caller coordinates, or None if it no longer fits"""
+        result = {key: value for key, value in payload.items()
+                  if key not in ('placement', 'drainfield_1', 'drainfield_2')}
+
+        if not payload['success']:
+            result['search_stats'] = {'fit_cache_hits': 1}
+            return result
+
+        if payload.get('is_split'):
+            for i, name in enumerate(('drainfield_1', 'drainfield_2')):
+                drainfield = self._locate(selector, payload[name], boundaries[i + 1],
+                                          transforms[i + 1])
+                if drainfield is None:
+                    return None
+                result[name] = drainfield
+        else:
+            drainfield = self._locate(selector, payload['placement'], boundaries[0],
+                                      transforms[0])
+            if drainfield is None:
+                return None
+            result.update(drainfield)
+
+        result['search_stats'] = {'fit_cache_hits': 1}
+        return result
+
+    def _locate(self, selector, placement, boundary, transform):
+        """Place a cached selection on a boundary and verify that it fits"""
+        config_type = placement['config_type']
+        base_type = 'trench' if 'trench' in config_type else 'bed'
+        configs = selector.config_loader.get_configs(placement['product'], base_type)
+        record = configs.get(placement['pattern_key'])
+        if record is None:
+            return None
+
+        shoulder = extract_shoulder_polygon(record)
+        centroid = shoulder.centroid
+        rotation = (placement['rotation'] + transform[2]) % 360
+        x, y = _from_canonical(placement['position'], transform)
+        dx, dy = x - centroid.x, y - centroid.y
+
+        fitted_polygon = translate(rotate(shoulder, rotation, origin='centroid'), dx, dy)
+        if not polygon_fits(fitted_polygon, boundary):
+            return None
+
+        config_data = selector.config_loader.get_config_data(
+            placement['product'], base_type, placement['pattern_key']
+        )
+
+        drainfield = {key: value for key, value in placement.items()
+                      if key not in ('rotation', 'position')}
+        drainfield.update({
+            'config_data': config_data,
+            'metadata': config_data['metadata'],
+            'rotation': rotation,
+            'offset_x': dx,
+            'offset_y': dy,
+            'fitted_polygon': fitted_polygon,
+        })
+        return drainfield
@@ -4,9 +4,16 @@ Handles all Shapely-based geometric operations for drainfield placement
 WITH EDGE ALIGNMENT AND STRICT FIT CHECKING
 """
 
-from shapely.geometry import Polygon, LineString
+from shapely.geometry import Polygon, LineString, Point
 from shapely.affinity import translate, rotate
+from shapely.ops import nearest_points, polylabel
+import shapely
+import numpy as np
 import math
+from functools import lru_cache
+
+
+ANCHOR_STRATEGIES = ('centroid', 'pole')
 
 
 def extract_shoulder_polygon(config):
@@ -14,11 +21,22 @@ def extract_shoulder_polygon(config):
     Extract the shoulder boundary polygon from a configuration
     
     Args:
-        config: Configuration dictionary with cad_json data
+        config: Configuration dictionary with cad_json data (or a fit
+                record with a prebuilt 'polygon' or 'shoulder' coordinates)
         
     Returns:
         Shapely Polygon representing the shoulder boundary
     """
+    # Prebuilt by ConfigLoader's candidate index
+    if 'polygon' in config:
+        return config['polygon']
+
+    # Compiled store configs carry the shoulder ring directly
+    if 'shoulder' in config:
+        if len(config['shoulder']) == 0:
+            raise ValueError("No closed shoulder boundary found in configuration")
+        return Polygon(config['shoulder'])
+
     polylines = config['cad_json']['polylines']
     
     # Find the closed polyline (shoulder boundary - should be last one)
@@ -67,25 +85,367 @@ def parse_user_boundary(cad_json, boundary_layer_name='polyline_boundary'):
     return Polygon(points)
 
 
+class BoundaryContext:
+    """
+    Per-boundary data shared by every fit test of a design
+
+    Built once per boundary in DrainFieldSelector.apply_hierarchy so the
+    prepared geometry, centroid, edge angles and rotation set are not
+    recomputed for every candidate of every product and hierarchy level.
+
+    The anchor is the point drainfields are centered on during fit tests:
+    the centroid, or the pole of inaccessibility (center of the largest
+    inscribed circle), which stays well inside concave lots.
+
+    With a frame_angle (the lot's canonical frame, see canonical_frame),
+    rotation angles are generated relative to it, so a rotated copy of a
+    lot is searched at correspondingly rotated angles and gets the same
+    pattern and relative rotation. Without one they are measured from the
+    x axis.
+    """
+
+    def __init__(self, user_boundary, rotation_step=5, anchor='centroid',
+                 rotation_budget=36, cluster_tolerance=2.0, frame_angle=None):
+        """
+        Initialize the context and prepare the boundary for repeated predicates
+
+        Args:
+            user_boundary: Shapely Polygon of user-drawn boundary
+            rotation_step: Degrees between fallback rotation attempts
+            anchor: 'centroid' or 'pole' (see ANCHOR_STRATEGIES)
+            rotation_budget: Maximum number of edge-aligned angles (None for no cap)
+            cluster_tolerance: Degrees within which edge directions are merged
+            frame_angle: Orientation (degrees) the cardinal and fallback
+                         angles are measured from (None for the x axis)
+        """
+        if anchor not in ANCHOR_STRATEGIES:
+            raise ValueError(f"Unknown anchor strategy '{anchor}'")
+
+        self.polygon = user_boundary
+        shapely.prepare(self.polygon)
+
+        self.bounds = user_boundary.bounds
+        self.area = user_boundary.area
+        self.centroid = user_boundary.centroid
+        self.anchor_strategy = anchor
+        if anchor == 'pole':
+            self.anchor = pole_of_inaccessibility(user_boundary, frame_angle)
+        else:
+            self.anchor = self.centroid
+        self.edge_angles = get_boundary_edge_angles(user_boundary)
+        self.rotation_step = rotation_step
+        self.frame_angle = frame_angle
+        angle = frame_angle or 0
+
+        self.rotation_budget = rotation_budget
+        self.edge_clusters = cluster_edge_angles(self.edge_angles, cluster_tolerance, angle)
+        self.edge_rotation_angles = rotation_candidates(
+            self.edge_angles, rotation_budget, cluster_tolerance, angle
+        )
+        self.rotation_angles = _with_fallback_angles(
+            self.edge_rotation_angles, rotation_step, angle
+        )
+
+        # Quick-reject / quick-accept certificate inputs
+        self.min_width = convex_hull_min_width(user_boundary)
+        if user_boundary.contains(self.anchor):
+            self.anchor_clearance = user_boundary.boundary.distance(self.anchor)
+        else:
+            self.anchor_clearance = 0.0
+
+        # (width, length) of rectangular shoulders that failed every rotation
+        self.failed_shoulders = []
+
+        # (product, base type, pattern_key) -> placement or None, kept across
+        # hierarchy levels so ATU and split levels reuse earlier searches
+        self.fit_memo = {}
+
+        # Search counters reported back in the selection result
+        self.stats = {}
+
+    def count(self, name, amount=1):
+        """Increment a search counter"""
+        self.stats[name] = self.stats.get(name, 0) + amount
+
+
+@lru_cache(maxsize=256)
+def _pole_from_wkb(wkb):
+    """Cached polylabel keyed by the boundary's WKB"""
+    polygon = shapely.from_wkb(wkb)
+    minx, miny, maxx, maxy = polygon.bounds
+    precision = max(maxx - minx, maxy - miny) / 1000.0
+    pole = polylabel(polygon, tolerance=max(precision, 1e-6))
+    return (pole.x, pole.y)
+
+
+def pole_of_inaccessibility(polygon, frame_angle=None):
+    """
+    Interior point farthest from the boundary edges (polylabel)
+
+    This is the center of the largest inscribed circle, found to within
+    1/1000 of the boundary's extent. Results are cached per boundary shape,
+    so repeated designs on the same lot only compute it once.
+
+    polylabel searches an axis-aligned grid and breaks ties (e.g. along
+    the midline of a rectangle) by vertex order, so with a frame angle the
+    pole is found on the boundary centered, turned into the frame and
+    normalized, then mapped back. Rotated copies of a lot get the same pole.
+
+    Args:
+        polygon: Shapely Polygon
+        frame_angle: Orientation (degrees) of the search grid
+
+    Returns:
+        Shapely Point
+    """
+    if frame_angle is None:
+        x, y = _pole_from_wkb(polygon.wkb)
+        return Point(x, y)
+
+    frame = (polygon.centroid.x, polygon.centroid.y, frame_angle)
+    x, y = _pole_from_wkb(_to_frame(polygon, frame).wkb)
+    return _from_frame(Point(x, y), frame)
+
+
+def _to_frame(geometry, frame, grid_size=0.01):
+    """Geometry moved and turned into a (cx, cy, theta) frame, snapped and normalized"""
+    cx, cy, theta = frame
+    local = rotate(translate(geometry, -cx, -cy), -theta, origin=(0, 0))
+    return shapely.normalize(shapely.set_precision(local, grid_size))
+
+
+def _from_frame(geometry, frame):
+    """Geometry in a (cx, cy, theta) frame mapped back to site coordinates"""
+    cx, cy, theta = frame
+    return translate(rotate(geometry, theta, origin=(0, 0)), cx, cy)
+
+
+def _frame_axes(centered):
+    """
+    Candidate frame directions (degrees, modulo 90) of a centered boundary
+
+    The principal axes of the area, or for isotropic shapes (squares,
+    regular polygons), where those are undefined, the longest convex hull
+    edges.
+    """
+    coords = np.asarray(centered.exterior.coords)
+    x0, y0 = coords[:-1, 0], coords[:-1, 1]
+    x1, y1 = coords[1:, 0], coords[1:, 1]
+    cross = x0 * y1 - x1 * y0
+    sign = 1.0 if cross.sum() >= 0 else -1.0
+
+    # Second moments of area about the centroid (shoelace form)
+    sxx = sign * (cross * (x0 * x0 + x0 * x1 + x1 * x1)).sum() / 12.0
+    syy = sign * (cross * (y0 * y0 + y0 * y1 + y1 * y1)).sum() / 12.0
+    sxy = sign * (cross * (2 * x0 * y0 + x0 * y1 + x1 * y0 + 2 * x1 * y1)).sum() / 24.0
+
+    if math.hypot(sxx - syy, 2 * sxy) > 1e-4 * (sxx + syy):
+        angles = [0.5 * math.atan2(2 * sxy, sxx - syy)]
+    else:
+        hull = np.asarray(centered.convex_hull.exterior.coords)
+        edges = hull[1:] - hull[:-1]
+        lengths = np.hypot(edges[:, 0], edges[:, 1])
+        angles = [math.atan2(dy, dx) for dx, dy in edges[lengths >= lengths.max() * (1 - 1e-9)]]
+
+    # Drop float noise so axis-aligned lots keep exact (integer) cardinal angles
+    axes = {round(math.degrees(angle), 9) % 90 for angle in angles}
+    return sorted(int(axis) if axis.is_integer() else axis for axis in axes)
+
+
+def canonical_frame(polygon, grid_size=0.01):
+    """
+    Position and orientation that make a boundary independent of placement
+
+    The centroid is the origin and the orientation puts a principal axis of
+    the area (for isotropic shapes, one of the longest convex hull edges)
+    along the x axis. Of those alignments, four per axis 90 degrees apart,
+    the one under which the boundary snapped to the grid has the smallest
+    WKB is used. Every moved or rotated copy of a lot therefore gets the
+    frame moved and rotated with it, and copies of a symmetric lot pick
+    alignments with identical canonical geometry.
+
+    Args:
+        polygon: Shapely Polygon of user boundary
+        grid_size: Snapping grid in feet used to compare alignments
+
+    Returns:
+        Tuple of (cx, cy, theta) where the boundary is its canonical form
+        rotated by theta degrees about the origin and translated by (cx, cy)
+    """
+    centroid = polygon.centroid
+    centered = translate(polygon, -centroid.x, -centroid.y)
+    if centered.area <= 0:
+        return (centroid.x, centroid.y, 0)
+
+    best = None
+    for base in _frame_axes(centered):
+        for k in range(4):
+            theta = base + 90 * k
+            wkb = shapely.to_wkb(_to_frame(centered, (0, 0, theta), grid_size))
+            if best is None or wkb < best[0]:
+                best = (wkb, theta)
+
+    return (centroid.x, centroid.y, best[1])
+
+
+def rectangle_dimensions(polygon):
+    """
+    Get the axis-aligned (width, length) of a rectangular polygon
+
+    Args:
+        polygon: Shapely Polygon
+
+    Returns:
+        Tuple of (width, length), or None if the polygon is not an
+        axis-aligned rectangle
+    """
+    minx, miny, maxx, maxy = polygon.bounds
+    width = maxx - minx
+    length = maxy - miny
+
+    if abs(polygon.area - width * length) > 1e-9 * max(width * length, 1.0):
+        return None
+
+    return (width, length)
+
+
+def convex_hull_min_width(polygon):
+    """
+    Minimum width of a polygon's convex hull (rotating calipers)
+
+    The minimum width is attained with one caliper flush against a hull
+    edge, so it is the smallest, over all hull edges, of the largest
+    distance from that edge's line to any hull vertex.
+
+    Args:
+        polygon: Shapely Polygon
+
+    Returns:
+        Minimum width in feet
+    """
+    hull = polygon.convex_hull
+    if hull.geom_type != 'Polygon':
+        return 0.0
+
+    coords = np.asarray(hull.exterior.coords)
+    starts = coords[:-1]
+    edges = coords[1:] - starts
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    keep = lengths > 0
+    starts, edges, lengths = starts[keep], edges[keep], lengths[keep]
+
+    # Distance of every hull vertex from every edge line
+    rel = coords[None, :-1, :] - starts[:, None, :]
+    cross = np.abs(edges[:, None, 0] * rel[:, :, 1] - edges[:, None, 1] * rel[:, :, 0])
+    widths = cross.max(axis=1) / lengths
+
+    return float(widths.min())
+
+
+def quick_reject(drainfield_polygon, user_boundary, tolerance=0.001):
+    """
+    Cheap certificate that a drainfield cannot fit at any angle or position
+
+    - Area: the part outside the boundary is at least the area difference.
+    - Width: a rectangle's shorter side cannot exceed the boundary hull's
+      minimum width. Sticking out of the hull's narrowest slab by depth d
+      leaves a corner outside with area of at least d^2, so the check only
+      fires once the excess is beyond what polygon_fits' overlap tolerance
+      could absorb.
+
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield
+        user_boundary: BoundaryContext of user boundary
+        tolerance: Allowed overlap area (see polygon_fits)
+
+    Returns:
+        'area' or 'width' naming the certificate that fired, or None
+    """
+    context = as_boundary_context(user_boundary)
+
+    if drainfield_polygon.area - context.area >= tolerance:
+        return 'area'
+
+    dimensions = rectangle_dimensions(drainfield_polygon)
+    if dimensions is not None:
+        excess = min(dimensions) - context.min_width
+        if excess / 2 > math.sqrt(tolerance):
+            return 'width'
+
+    return None
+
+
+def quick_accept(drainfield_polygon, user_boundary):
+    """
+    Cheap certificate that a drainfield fits at every angle
+
+    Fits are tested with the drainfield centered on the boundary anchor.
+    If the drainfield's circumradius about its own centroid is no larger
+    than the anchor's clearance from the boundary edges, the circle
+    swept by every rotation stays inside the boundary.
+
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield
+        user_boundary: BoundaryContext of user boundary
+
+    Returns:
+        True if every rotation is guaranteed to fit
+    """
+    context = as_boundary_context(user_boundary)
+
+    if context.anchor_clearance <= 0:
+        return False
+
+    coords = np.asarray(drainfield_polygon.exterior.coords)
+    centroid = drainfield_polygon.centroid
+    circumradius = np.hypot(coords[:, 0] - centroid.x, coords[:, 1] - centroid.y).max()
+
+    return circumradius <= context.anchor_clearance
+
+
+def as_boundary_context(user_boundary):
+    """
+    Return a BoundaryContext for a boundary, building one only if needed
+
+    Args:
+        user_boundary: Shapely Polygon or existing BoundaryContext
+
+    Returns:
+        BoundaryContext
+    """
+    if isinstance(user_boundary, BoundaryContext):
+        return user_boundary
+    return BoundaryContext(user_boundary)
+
+
+def _boundary_polygon(user_boundary):
+    """Underlying Shapely Polygon of a Polygon or BoundaryContext"""
+    if isinstance(user_boundary, BoundaryContext):
+        return user_boundary.polygon
+    return user_boundary
+
+
 def polygon_fits(drainfield_polygon, user_boundary, tolerance=0.001):
     """
     STRICT fit check - drainfield must be fully within boundary
     
     Args:
         drainfield_polygon: Shapely Polygon of drainfield shoulder
-        user_boundary: Shapely Polygon of user-drawn boundary
+        user_boundary: Shapely Polygon or BoundaryContext of user-drawn boundary
         tolerance: Small buffer for floating-point precision (0.001 sq ft = ~0.14 inches)
         
     Returns:
         Boolean indicating if it fits
     """
-    # Check if completely within
-    if drainfield_polygon.within(user_boundary):
+    boundary = _boundary_polygon(user_boundary)
+
+    # Check if completely within (contains lets GEOS use the prepared boundary)
+    if shapely.contains(boundary, drainfield_polygon):
         return True
     
     # Allow tiny overlap due to floating point precision
-    if drainfield_polygon.intersects(user_boundary):
-        overlap_area = drainfield_polygon.difference(user_boundary).area
+    if shapely.intersects(boundary, drainfield_polygon):
+        overlap_area = drainfield_polygon.difference(boundary).area
         if overlap_area < tolerance:
             return True
     
@@ -127,113 +487,304 @@ def get_boundary_edge_angles(boundary_polygon):
     return angles
 
 
-def try_edge_aligned_rotations(drainfield_polygon, user_boundary):
+def cluster_edge_angles(edge_angles, tolerance=2.0, frame_angle=0):
     """
-    Try rotating drainfield to align with boundary edges
-    Also tries 0, 90, 180, 270 degrees (cardinal directions)
+    Group boundary edge directions modulo 90 degrees, weighted by edge length
+
+    An edge and its perpendicular give the same pair of alignments, so
+    directions are folded onto [0, 90) past the frame angle before
+    clustering. Edges are visited longest first and join the first cluster
+    within the tolerance, so each cluster is centered exactly on its
+    longest edge.
 
     Args:
-        drainfield_polygon: Shapely Polygon of drainfield
-        user_boundary: Shapely Polygon of user boundary
+        edge_angles: List of (angle, length, index) from get_boundary_edge_angles
+        tolerance: Maximum angular distance (degrees) to join a cluster
+        frame_angle: Orientation (degrees) directions are folded relative to
 
     Returns:
-        Tuple of (fits: bool, rotation_angle: float, rotated_polygon: Polygon)
+        List of (angle, total_length) clusters, heaviest first, with angles
+        in [0, 90) measured from the frame angle
     """
-    # Get boundary edge angles
-    edge_angles = get_boundary_edge_angles(user_boundary)
+    clusters = []
+
+    for angle, length, idx in sorted(edge_angles, key=lambda x: x[1], reverse=True):
+        if length <= 0:
+            continue
 
-    # Sort by edge length (try longest edges first)
-    edge_angles.sort(key=lambda x: x[1], reverse=True)
+        if frame_angle:
+            # Rounded so a direction on the frame axis does not fold to 89.999...
+            folded = round((angle - frame_angle) % 90, 9) % 90
+        else:
+            folded = angle % 90
+        for cluster in clusters:
+            diff = abs(folded - cluster[0]) % 90
+            if min(diff, 90 - diff) <= tolerance:
+                cluster[1] += length
+                break
+        else:
+            clusters.append([folded, length])
 
-    # Collect rotation angles to try
-    rotation_angles = set()
+    clusters.sort(key=lambda c: c[1], reverse=True)
+    return [(angle, weight) for angle, weight in clusters]
 
-    # Add boundary edge angles
-    for angle, length, idx in edge_angles:
-        rotation_angles.add(angle)
-        rotation_angles.add(angle + 90)  # Perpendicular to edge
+
+def rotation_candidates(edge_angles, budget=36, tolerance=2.0, frame_angle=0):
+    """
+    Build a capped, priority-ordered rotation set from boundary edges
+
+    Each edge cluster contributes its alignment and the perpendicular, then
+    the cardinal directions of the frame follow, then +/-5 degree
+    fine-tuning around each of those in the same order. The list is cut at
+    the budget, so the heaviest (longest-edge) alignments are always kept.
+
+    Args:
+        edge_angles: List of (angle, length, index) from get_boundary_edge_angles
+        budget: Maximum number of angles to return (None for no cap)
+        tolerance: Clustering tolerance in degrees (see cluster_edge_angles)
+        frame_angle: Orientation (degrees) of the frame's 0 direction
+
+    Returns:
+        List of rotation angles in degrees (0-360), highest priority first
+    """
+    clusters = cluster_edge_angles(edge_angles, tolerance, frame_angle)
+
+    # Boundary alignments and their perpendiculars, heaviest cluster first
+    base_angles = []
+    for angle, weight in clusters:
+        base_angles.extend([frame_angle + angle, frame_angle + angle + 90])
 
     # Add cardinal directions
-    rotation_angles.update([0, 90, 180, 270])
+    base_angles.extend(frame_angle + cardinal for cardinal in (0, 90, 180, 270))
+
+    # Add fine-tuning around each alignment (±5 degrees)
+    rotation_angles = list(base_angles)
+    for angle in base_angles:
+        rotation_angles.extend([angle - 5, angle + 5])
+
+    # Normalize all angles to 0-360 and drop repeats, keeping priority order
+    unique = {}
+    for angle in rotation_angles:
+        angle = angle % 360
+        unique.setdefault(round(angle, 9), angle)
+    rotation_angles = list(unique.values())
+
+    if budget is not None:
+        rotation_angles = rotation_angles[:budget]
+
+    return rotation_angles
+
 
-    # Add fine-tuning around boundary edges (±5 degrees)
-    extra_angles = set()
-    for angle in list(rotation_angles):
-        extra_angles.add(angle - 5)
-        extra_angles.add(angle + 5)
-    rotation_angles.update(extra_angles)
+def _with_fallback_angles(edge_rotation_angles, rotation_step, frame_angle=0):
+    """Edge-aligned angles followed by the every-N-degrees fallback (from the frame), deduplicated"""
+    angles = list(edge_rotation_angles)
+    if frame_angle:
+        angles.extend((frame_angle + step) % 360 for step in range(0, 360, rotation_step))
+    else:
+        angles.extend(range(0, 360, rotation_step))
 
-    # Normalize all angles to 0-360
-    rotation_angles = {a % 360 for a in rotation_angles}
+    # Fallback angles already covered by the edge-aligned set can only fail again
+    return list(dict.fromkeys(angles))
 
-    # Calculate boundary centroid once
-    boundary_centroid = user_boundary.centroid
 
-    # Try each rotation
-    for angle in sorted(rotation_angles):
-        # Rotate around drainfield's centroid
-        rotated = rotate(drainfield_polygon, angle, origin='centroid')
+def edge_aligned_rotation_angles(user_boundary):
+    """
+    Build the edge-aligned rotation set for a boundary
+
+    Clustered boundary edge alignments and their perpendiculars, the
+    cardinal directions, and +/-5 degree fine-tuning around each, capped
+    at the default budget (see rotation_candidates).
+
+    Args:
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
+
+    Returns:
+        List of rotation angles in degrees, highest priority first
+    """
+    if isinstance(user_boundary, BoundaryContext):
+        return list(user_boundary.edge_rotation_angles)
+    return rotation_candidates(get_boundary_edge_angles(user_boundary))
+
+
+def rotate_and_position_batch(drainfield_polygon, angles, anchor):
+    """
+    Rotate a drainfield to every angle at once and center each copy on an anchor
+
+    Builds a single (angles x vertices x 2) coordinate array and applies the
+    same rotation as shapely.affinity.rotate(origin='centroid') followed by a
+    translation of the centroid onto the anchor.
+
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield
+        angles: Sequence of rotation angles in degrees
+        anchor: Shapely Point the rotated drainfield is centered on
+
+    Returns:
+        NumPy array of positioned Shapely Polygons, one per angle
+    """
+    coords = np.asarray(drainfield_polygon.exterior.coords)
+    centroid = drainfield_polygon.centroid
+    local = coords - (centroid.x, centroid.y)
+
+    radians = np.radians(np.asarray(angles, dtype=float))
+    cos_a = np.cos(radians)
+    sin_a = np.sin(radians)
+    # Same snapping shapely.affinity.rotate applies to exact multiples of 90
+    cos_a[np.abs(cos_a) < 2.5e-16] = 0.0
+    sin_a[np.abs(sin_a) < 2.5e-16] = 0.0
+
+    x = local[:, 0]
+    y = local[:, 1]
+    batch = np.empty((len(cos_a), len(coords), 2))
+    batch[:, :, 0] = cos_a[:, None] * x - sin_a[:, None] * y + anchor.x
+    batch[:, :, 1] = sin_a[:, None] * x + cos_a[:, None] * y + anchor.y
+
+    return shapely.polygons(batch)
+
+
+def first_fitting_polygon(polygons, user_boundary, tolerance=0.001, corner_reach=None):
+    """
+    Vectorized polygon_fits over an array of candidates
+
+    Evaluates containment for every candidate in one pass and only computes
+    overlap areas for the candidates that come before the first one fully
+    within the boundary, so the answer matches a sequential polygon_fits loop.
+
+    For rectangles, pass the shorter side as corner_reach: a corner lying a
+    distance d outside the boundary puts a quarter disc of radius
+    min(d, corner_reach) outside it, so candidates whose worst corner already
+    exceeds the overlap tolerance are rejected without a polygon difference.
+
+    Args:
+        polygons: NumPy array of Shapely Polygons in priority order
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
+        tolerance: Allowed overlap area (see polygon_fits)
+        corner_reach: Shorter side of rectangular candidates, or None
+
+    Returns:
+        Index of the first polygon that fits, or None
+    """
+    if len(polygons) == 0:
+        return None
+
+    context = user_boundary if isinstance(user_boundary, BoundaryContext) else None
+    user_boundary = _boundary_polygon(user_boundary)
+
+    # contains/intersects with the boundary first so GEOS uses the prepared geometry
+    inside = shapely.contains(user_boundary, polygons)
+    first_inside = int(np.argmax(inside)) if inside.any() else len(polygons)
+
+    # Anything earlier than the first clean fit may still pass on tolerance
+    earlier = polygons[:first_inside]
+    if len(earlier):
+        touching = np.flatnonzero(shapely.intersects(user_boundary, earlier))
+
+        if len(touching) and corner_reach is not None:
+            corners = shapely.get_coordinates(earlier[touching]).reshape(len(touching), -1, 2)
+            corner_distance = shapely.distance(user_boundary, shapely.points(corners)).max(axis=1)
+            reach = np.minimum(corner_distance, corner_reach)
+            hopeless = math.pi * reach * reach / 4 >= tolerance
+            if context is not None:
+                context.count('corner_rejects', int(hopeless.sum()))
+            touching = touching[~hopeless]
+
+        if len(touching):
+            overlap = shapely.area(shapely.difference(earlier[touching], user_boundary))
+            passing = touching[overlap < tolerance]
+            if len(passing):
+                return int(passing[0])
 
-        # Translate to center on boundary
-        dx = boundary_centroid.x - rotated.centroid.x
-        dy = boundary_centroid.y - rotated.centroid.y
-        positioned = translate(rotated, xoff=dx, yoff=dy)
+    if first_inside < len(polygons):
+        return first_inside
 
-        if polygon_fits(positioned, user_boundary):
-            return (True, angle, positioned)
+    return None
+
+
+def try_rotation_angles(drainfield_polygon, user_boundary, angles):
+    """
+    Try a list of rotations in priority order with the batched fit engine
+
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
+        angles: Rotation angles in degrees, highest priority first
+
+    Returns:
+        Tuple of (fits: bool, rotation_angle: float, rotated_polygon: Polygon)
+    """
+    context = as_boundary_context(user_boundary)
+    angles = list(angles)
+    positioned = rotate_and_position_batch(drainfield_polygon, angles, context.anchor)
+
+    dimensions = rectangle_dimensions(drainfield_polygon)
+    corner_reach = min(dimensions) if dimensions is not None else None
+
+    index = first_fitting_polygon(positioned, context, corner_reach=corner_reach)
+    context.count('angles_tried', len(angles) if index is None else index + 1)
+    if index is not None:
+        return (True, angles[index], positioned[index])
 
     return (False, 0, drainfield_polygon)
 
 
-def try_rotations(drainfield_polygon, user_boundary, rotation_step=5):
+def try_edge_aligned_rotations(drainfield_polygon, user_boundary):
     """
-    FALLBACK: Try rotating every N degrees (used if edge alignment fails)
+    Try rotating drainfield to align with boundary edges
+    Also tries 0, 90, 180, 270 degrees (cardinal directions)
 
     Args:
         drainfield_polygon: Shapely Polygon of drainfield
-        user_boundary: Shapely Polygon of user boundary
-        rotation_step: Degrees between rotation attempts (default 5)
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
 
     Returns:
         Tuple of (fits: bool, rotation_angle: float, rotated_polygon: Polygon)
     """
-    # First try edge-aligned rotations (smarter approach)
-    fits, angle, positioned = try_edge_aligned_rotations(drainfield_polygon, user_boundary)
-    if fits:
-        return (fits, angle, positioned)
+    context = as_boundary_context(user_boundary)
+    return try_rotation_angles(drainfield_polygon, context, context.edge_rotation_angles)
 
-    # Calculate boundary centroid once
-    boundary_centroid = user_boundary.centroid
 
-    # Fallback: try every 5 degrees
-    for angle in range(0, 360, rotation_step):
-        # Rotate around drainfield's centroid
-        rotated = rotate(drainfield_polygon, angle, origin='centroid')
+def try_rotations(drainfield_polygon, user_boundary, rotation_step=5):
+    """
+    Try edge-aligned rotations first, then every N degrees as a fallback
 
-        # Translate to center on boundary
-        dx = boundary_centroid.x - rotated.centroid.x
-        dy = boundary_centroid.y - rotated.centroid.y
-        positioned = translate(rotated, xoff=dx, yoff=dy)
+    Both sets are evaluated in a single vectorized pass; the first passing
+    angle in priority order (edge-aligned, then fallback) is returned.
 
-        if polygon_fits(positioned, user_boundary):
-            return (True, angle, positioned)
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
+        rotation_step: Degrees between fallback rotation attempts (default 5)
 
-    return (False, 0, drainfield_polygon)
+    Returns:
+        Tuple of (fits: bool, rotation_angle: float, rotated_polygon: Polygon)
+    """
+    context = as_boundary_context(user_boundary)
+
+    angles = context.rotation_angles
+    if rotation_step != context.rotation_step:
+        angles = _with_fallback_angles(context.edge_rotation_angles, rotation_step,
+                                       context.frame_angle or 0)
+
+    return try_rotation_angles(drainfield_polygon, context, angles)
 
 
 def calculate_centered_offset(drainfield_polygon, user_boundary):
     """
     Calculate offset to center the drainfield in the boundary
+    (on the context's anchor when given a BoundaryContext)
     
     Args:
         drainfield_polygon: Shapely Polygon of drainfield
-        user_boundary: Shapely Polygon of user boundary
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
         
     Returns:
         Tuple of (dx, dy) offset values
     """
     df_centroid = drainfield_polygon.centroid
-    boundary_centroid = user_boundary.centroid
+    if isinstance(user_boundary, BoundaryContext):
+        boundary_centroid = user_boundary.anchor
+    else:
+        boundary_centroid = user_boundary.centroid
     
     dx = boundary_centroid.x - df_centroid.x
     dy = boundary_centroid.y - df_centroid.y
@@ -241,18 +792,202 @@ def calculate_centered_offset(drainfield_polygon, user_boundary):
     return (dx, dy)
 
 
+def _boundary_segments(boundary_polygon):
+    """All exterior and hole edges of a polygon as an (edges x 2 x 2) array"""
+    rings = [boundary_polygon.exterior] + list(boundary_polygon.interiors)
+    segments = []
+    for ring in rings:
+        coords = np.asarray(ring.coords)
+        segments.append(np.stack([coords[:-1], coords[1:]], axis=1))
+    return np.concatenate(segments)
+
+
+def inner_fit_polygon(drainfield_polygon, user_boundary):
+    """
+    Feasible region for the drainfield's centroid inside the boundary
+
+    This is the boundary eroded by the drainfield (Minkowski difference):
+    a centroid position p is feasible when the translated drainfield does
+    not cross any boundary edge, i.e. p avoids every edge swept by the
+    reflected drainfield, and p itself lies inside the boundary. The
+    drainfield is treated as its convex hull, which is exact for the
+    rectangular shoulders.
+
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield (already rotated)
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
+
+    Returns:
+        Shapely geometry of feasible centroid positions (may be empty)
+    """
+    boundary = _boundary_polygon(user_boundary)
+
+    hull = drainfield_polygon.convex_hull
+    centroid = drainfield_polygon.centroid
+    reflected = -(np.asarray(hull.exterior.coords)[:-1] - (centroid.x, centroid.y))
+
+    # Edge (+) reflected drainfield is the hull of its endpoints moved by every vertex
+    segments = _boundary_segments(boundary)
+    swept = segments[:, :, None, :] + reflected[None, None, :, :]
+    swept = swept.reshape(len(segments), -1, 2)
+    forbidden = shapely.union_all(shapely.convex_hull(shapely.multipoints(swept)))
+
+    return boundary.difference(forbidden)
+
+
+def _point_in_region(region, target, frame_angle=None):
+    """
+    Points of a feasible region to try, nearest to the target first
+
+    With a frame angle, where parts of the region are equally near
+    (symmetric lots), the part first counterclockwise from the frame's 0
+    direction is used rather than whichever GEOS meets first, so rotated
+    copies pick the same part.
+    """
+    if frame_angle is None:
+        return [nearest_points(region, target)[0], region.point_on_surface()]
+
+    parts = shapely.get_parts(region)
+    distances = shapely.distance(parts, target)
+    tied = parts[distances <= distances.min() + 1e-6]
+
+    nearest = [nearest_points(part, target)[0] for part in tied]
+    if len(nearest) > 1:
+        nearest.sort(key=lambda point: round(
+            (math.degrees(math.atan2(point.y - target.y, point.x - target.x)) - frame_angle) % 360, 6
+        ) % 360)
+    return [nearest[0], region.point_on_surface()]
+
+
+def _angles_within_extent(context, dimensions, angles, tolerance=0.001):
+    """
+    Drop angles at which a rectangle is wider or longer than the boundary
+
+    Projected onto the rotated rectangle's own axes, the boundary must be at
+    least as wide and as long as the rectangle wherever it is placed. The
+    margin matches the overlap tolerance argument used by quick_reject.
+    """
+    hull = context.polygon.convex_hull
+    if hull.geom_type != 'Polygon' or not angles:
+        return angles
+
+    coords = np.asarray(hull.exterior.coords)
+    radians = np.radians(np.asarray(angles, dtype=float))
+    cos_a = np.cos(radians)
+    sin_a = np.sin(radians)
+
+    along_width = coords[:, 0][None, :] * cos_a[:, None] + coords[:, 1][None, :] * sin_a[:, None]
+    along_length = coords[:, 1][None, :] * cos_a[:, None] - coords[:, 0][None, :] * sin_a[:, None]
+
+    margin = 2 * math.sqrt(tolerance)
+    width, length = dimensions
+    keep = (np.ptp(along_width, axis=1) >= width - margin) & \
+           (np.ptp(along_length, axis=1) >= length - margin)
+
+    context.count('extent_rejects', int((~keep).sum()))
+    return [angle for angle, ok in zip(angles, keep) if ok]
+
+
+def find_translated_placement(drainfield_polygon, user_boundary, angles, anchor=None):
+    """
+    Translation-aware fit: for each angle, place the drainfield anywhere it fits
+
+    For each angle in priority order, computes the inner-fit polygon of the
+    rotated drainfield and picks the feasible centroid position nearest the
+    anchor. A centrally symmetric drainfield (any rectangle) looks the same
+    after a half turn, so only the first of each angle pair 180 degrees
+    apart is evaluated.
+
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
+        angles: Rotation angles in degrees, highest priority first
+        anchor: Shapely Point to stay close to (default: the context's anchor)
+
+    Returns:
+        Tuple of (fits: bool, rotation_angle: float, positioned: Polygon,
+                  offset: (dx, dy) from the original drainfield position)
+    """
+    context = as_boundary_context(user_boundary)
+    if anchor is None:
+        anchor = context.anchor
+
+    centroid = drainfield_polygon.centroid
+    dimensions = rectangle_dimensions(drainfield_polygon)
+    angles = list(angles)
+
+    if dimensions is not None:
+        angles = _angles_within_extent(context, dimensions, angles)
+
+    seen = set()
+
+    for angle in angles:
+        if dimensions is not None:
+            half_turn = round(angle % 180, 9)
+            if half_turn in seen:
+                continue
+            seen.add(half_turn)
+
+        context.count('inner_fit_angles')
+        rotated = rotate_and_position_batch(drainfield_polygon, [angle], centroid)[0]
+        region = inner_fit_polygon(rotated, context)
+        if region.is_empty:
+            continue
+
+        for point in _point_in_region(region, anchor, context.frame_angle):
+            dx = point.x - centroid.x
+            dy = point.y - centroid.y
+            positioned = translate(rotated, xoff=dx, yoff=dy)
+            if polygon_fits(positioned, context):
+                return (True, angle, positioned, (dx, dy))
+
+    return (False, 0, drainfield_polygon, (0.0, 0.0))
+
+
+def find_placement(drainfield_polygon, user_boundary, allow_translation=True):
+    """
+    Find a rotation and position for a drainfield inside the boundary
+
+    Every rotation is first tried centered on the boundary anchor (the
+    batched try_rotations search). Only if none fits there is the
+    translation-aware inner-fit search run over the same angles.
+
+    Args:
+        drainfield_polygon: Shapely Polygon of drainfield
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
+        allow_translation: Search off-center positions when centered fails
+
+    Returns:
+        Tuple of (fits: bool, rotation_angle: float, positioned: Polygon,
+                  offset: (dx, dy) to apply in placer.place_drainfield)
+    """
+    context = as_boundary_context(user_boundary)
+
+    fits, angle, positioned = try_rotations(drainfield_polygon, context)
+    if fits:
+        return (True, angle, positioned, calculate_centered_offset(drainfield_polygon, context))
+
+    if not allow_translation:
+        return (False, 0, drainfield_polygon, (0.0, 0.0))
+
+    return find_translated_placement(drainfield_polygon, context, context.rotation_angles)
+
+
 def calculate_optimal_offset(drainfield_polygon, user_boundary):
     """
     Calculate optimal offset to position drainfield within boundary
-    Tries to keep it away from edges while staying centered
+    Stays centered when possible, otherwise uses the nearest feasible
+    position from the inner-fit polygon
     
     Args:
         drainfield_polygon: Shapely Polygon of drainfield (already rotated)
-        user_boundary: Shapely Polygon of user boundary
+        user_boundary: Shapely Polygon or BoundaryContext of user boundary
         
     Returns:
         Tuple of (dx, dy) offset values
     """
+    user_boundary = as_boundary_context(user_boundary)
+
     # Start with centered position
     dx, dy = calculate_centered_offset(drainfield_polygon, user_boundary)
     
@@ -263,16 +998,12 @@ def calculate_optimal_offset(drainfield_polygon, user_boundary):
     if polygon_fits(positioned, user_boundary):
         return (dx, dy)
     
-    # If centered doesn't fit, try small adjustments
-    # This shouldn't happen if rotation was correct, but safety check
-    for offset_x in range(-5, 6):
-        for offset_y in range(-5, 6):
-            test_dx = dx + offset_x * 0.5
-            test_dy = dy + offset_y * 0.5
-            test_positioned = translate(drainfield_polygon, xoff=test_dx, yoff=test_dy)
-            
-            if polygon_fits(test_positioned, user_boundary):
-                return (test_dx, test_dy)
+    # Otherwise solve for the feasible positions exactly at this rotation
+    fits, angle, positioned, offset = find_translated_placement(
+        drainfield_polygon, user_boundary, [0]
+    )
+    if fits:
+        return offset
     
     # Fallback to centered even if slightly outside
     return (dx, dy)
@@ -326,6 +1057,56 @@ def polygon_area(polygon):
     return polygon.area
 
 
+def simplify_boundary(polygon, tolerance, grid_size=None, frame=None):
+    """
+    Conservatively simplify a dense boundary for faster fit tests
+
+    The boundary is first eroded by the tolerance plus the grid size, then
+    simplified (topology preserving), snapped to the precision grid and
+    validated. Neither step can move the outline outward by more than the
+    erosion, so the result lies inside the original: a drainfield that fits
+    the simplified boundary also fits the original. If the result is empty,
+    invalid, split into pieces or not inside the original, the original
+    boundary is returned unchanged.
+
+    With a frame, the work is done on the boundary moved and turned into
+    it, so moved and rotated copies of a lot simplify to matching outlines.
+
+    Args:
+        polygon: Shapely Polygon of user boundary
+        tolerance: Simplification tolerance in feet
+        grid_size: Precision grid in feet (default tolerance / 10)
+        frame: Optional (cx, cy, theta) from canonical_frame
+
+    Returns:
+        Tuple of (polygon, simplified: bool)
+    """
+    if grid_size is None:
+        grid_size = tolerance / 10.0
+
+    try:
+        local = _to_frame(polygon, frame) if frame is not None else polygon
+        eroded = local.buffer(-(tolerance + grid_size), join_style='mitre')
+        simplified = shapely.simplify(eroded, tolerance, preserve_topology=True)
+        if grid_size > 0:
+            simplified = shapely.set_precision(simplified, grid_size)
+        if frame is not None:
+            simplified = _from_frame(simplified, frame)
+    except shapely.errors.GEOSException:
+        return (polygon, False)
+
+    if (simplified.is_empty
+            or simplified.geom_type != 'Polygon'
+            or not simplified.is_valid
+            or not polygon.covers(simplified)):
+        return (polygon, False)
+
+    if shapely.get_num_coordinates(simplified) >= shapely.get_num_coordinates(polygon):
+        return (polygon, False)
+
+    return (simplified, True)
+
+
 def validate_boundary(polygon):
     """
     Validate that a boundary polygon is usable
@@ -0,0 +1,236 @@
+"""
+Hot Reload Module
+Reloads configuration and rule tables in a running DrainFieldPlacer
+
+Each component is tied to the files it reads. The files are polled by size
+and modification time; when one moves, the files are hashed and, if the
+content really changed, a fresh component is built off to the side and
+swapped into the placer in one step. Designs already running keep the
+component objects they started with.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+from config_loader import ConfigLoader
+from config_store import STORE_FILENAME
+from config_generator import MATERIALS_FILENAME
+from data_store import DATA_FILENAME
+from selector import DrainFieldSelector
+from sewage_flow import SewageFlowCalculator
+from tank_sizing import TankSizer
+from tank_catalog import TankCatalog
+from drainfield_requirements import DrainFieldRequirements
+from specifications import SpecificationGenerator
+
+
+class WatchedFiles:
+    """Size/mtime snapshot plus content hash of a group of files"""
+
+    def __init__(self, paths):
+        """
+        Args:
+            paths: Callable returning the current list of Paths to watch
+                   (re-evaluated on every poll, so new files are noticed)
+        """
+        self.paths = paths
+        self.stamps = self._stamps()
+        self.digest = self._digest()
+
+    def _stamps(self):
+        stamps = {}
+        for path in self.paths():
+            try:
+                stat = path.stat()
+                stamps[str(path)] = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return stamps
+
+    def _digest(self):
+        digest = hashlib.sha256()
+        for path in sorted(self.paths()):
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            digest.update(str(path).encode())
+            digest.update(data)
+        return digest.hexdigest()
+
+    def poll(self):
+        """
+        Check for changed content
+
+        Stamps are taken before the files are hashed, so an edit made
+        after this poll still looks new to the next one.
+
+        Returns:
+            Tuple of (digest, stamps) to pass to accept() once the new
+            content is loaded, or None if the files did not change
+        """
+        stamps = self._stamps()
+        if stamps == self.stamps:
+            return None
+
+        digest = self._digest()
+        if digest == self.digest:
+            # Touched or rewritten with the same bytes
+            self.stamps = stamps
+            return None
+
+        return (digest, stamps)
+
+    def accept(self, digest, stamps):
+        """
+        Record the files as loaded
+
+        Args:
+            digest: Content digest returned by poll()
+            stamps: Stamps returned by poll(), the snapshot the rebuild read
+                    (not re-read here, so edits made during the rebuild
+                    are picked up by the next poll)
+        """
+        self.stamps = stamps
+        self.digest = digest
+
+
+class HotReloader:
+    """Polls a DrainFieldPlacer's data files and swaps in rebuilt components"""
+
+    def __init__(self, placer, interval=2.0):
+        """
+        Args:
+            placer: DrainFieldPlacer to keep up to date
+            interval: Seconds between polls when running in the background
+        """
+        self.placer = placer
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+        json_dir = Path(placer.json_dir)
+        data_dir = Path(placer.data_dir)
+        # Every rule table can also come from the compiled data store
+        data_store = data_dir / DATA_FILENAME
+
+        def config_files():
+            files = sorted(json_dir.glob('*.json'))
+            files.append(json_dir / STORE_FILENAME)
+            files.append(data_dir / MATERIALS_FILENAME)
+            files.append(data_store)
+            return files
+
+        # name -> (watched files, builder returning {attribute: component})
+        self.components = {
+            'configs': (WatchedFiles(config_files), self._build_configs),
+            'sewage_flow': (
+                WatchedFiles(lambda: [data_dir / "fdep_sewage_flows.csv", data_store]),
+                lambda: {'flow_calculator': SewageFlowCalculator(data_dir)},
+            ),
+            'tank_sizing': (
+                WatchedFiles(lambda: [data_dir / "fdep_tank_sizing.csv", data_store]),
+                lambda: {'tank_sizer': TankSizer(data_dir, self.placer.tank_catalog)},
+            ),
+            'requirements': (
+                WatchedFiles(lambda: [data_dir / "fdep_drainfield_configs.csv", data_store]),
+                lambda: {'drainfield_requirements': DrainFieldRequirements(data_dir)},
+            ),
+            'tank_catalog': (
+                WatchedFiles(lambda: [data_dir / "fdep_tanks.csv",
+                                      data_dir / "fdep_manufacturers.csv", data_store]),
+                self._build_tank_catalog,
+            ),
+        }
+
+    def _build_configs(self):
+        """New ConfigLoader and a selector with the current selector's settings"""
+        placer = self.placer
+        loader = ConfigLoader(placer.json_dir, data_dir=placer.data_dir)
+        if not loader.load_all_configs():
+            print("  ⚠ Warning: Not all configuration files loaded!")
+
+        old = placer.selector
+        selector = DrainFieldSelector(
+            loader,
+            verify_search=old.verify_search,
+            allow_translation=old.allow_translation,
+            anchor=old.anchor,
+            rotation_budget=old.rotation_budget,
+            simplify_tolerance=old.simplify_tolerance,
+            canonical_frames=old.canonical_frames,
+        )
+        selector.product_priority = list(old.product_priority)
+        return {'config_loader': loader, 'selector': selector}
+
+    def _build_tank_catalog(self):
+        """New TankCatalog and the components that share it"""
+        data_dir = self.placer.data_dir
+        catalog = TankCatalog(data_dir)
+        return {
+            'tank_catalog': catalog,
+            'tank_sizer': TankSizer(data_dir, catalog),
+            'spec_generator': SpecificationGenerator(data_dir, catalog),
+        }
+
+    def check(self):
+        """
+        Poll once and reload every component whose files changed
+
+        A component that fails to build (e.g. a file caught mid-write) is
+        left as it was and retried on the next poll. The placer's design
+        table is dropped with every swap (designs fall back to computing
+        their parameters) and rebuilt from the new components at the end.
+
+        Returns:
+            List of reloaded component names
+        """
+        reloaded = []
+
+        for name, (watched, build) in self.components.items():
+            change = watched.poll()
+            if change is None:
+                continue
+
+            try:
+                replacements = build()
+            except Exception as e:
+                print(f"  ⚠ Reload of {name} failed, keeping the loaded version: {e}")
+                continue
+
+            self.placer.swap_components(design_table=None, **replacements)
+            watched.accept(*change)
+            reloaded.append(name)
+            print(f"  ✓ Reloaded {name}")
+
+        if reloaded:
+            try:
+                self.placer.swap_components(design_table=self.placer.build_design_table())
+            except Exception as e:
+                print(f"  ⚠ Design table rebuild failed, computing designs directly: {e}")
+
+        return reloaded
+
+    def start(self):
+        """Poll in a background daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='hot-reload', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"  ⚠ Hot reload error: {e}")
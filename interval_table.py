@@ -0,0 +1,92 @@
+"""
+Interval Table Module
+Compiled first-match lookups over closed [low, high] ranges
+
+The FDEP tables are lists of closed ranges (square footage per bedroom
+count, flow per tank size) searched top to bottom for the first row that
+contains a value. IntervalTable compiles such a list once into a sorted
+array of range endpoints. Every value then falls into one of the
+elementary regions between endpoints (below the first, exactly on an
+endpoint, strictly between two, above the last), and the region already
+knows which row a top-to-bottom scan would have returned. Gaps, overlaps
+and non-integer values behave exactly as with the scan.
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+
+class IntervalTable:
+    """First row (in table order) whose closed [low, high] range contains a value"""
+
+    def __init__(self, lows, highs):
+        """
+        Compile the ranges
+
+        Args:
+            lows: Range minimums, in table order
+            highs: Range maximums, in table order
+        """
+        self.lows = list(lows)
+        self.highs = list(highs)
+        if len(self.lows) != len(self.highs):
+            raise ValueError("lows and highs must have the same length")
+
+        # Sorted distinct endpoints; region 2i is strictly below endpoint i
+        # (and above endpoint i - 1), region 2i + 1 is endpoint i itself
+        self.breakpoints = sorted(set(self.lows) | set(self.highs))
+        self.breakpoint_array = np.asarray(self.breakpoints, dtype=float)
+
+        # A row covers the regions from its low endpoint through its high
+        # endpoint; painting rows last to first leaves each region with the
+        # first row a top-to-bottom scan would match
+        position = {point: i for i, point in enumerate(self.breakpoints)}
+        region_array = np.full(2 * len(self.breakpoints) + 1, -1, dtype=np.intp)
+        for row in range(len(self.lows) - 1, -1, -1):
+            low, high = self.lows[row], self.highs[row]
+            if low <= high:
+                region_array[2 * position[low] + 1:2 * position[high] + 2] = row
+
+        self.region_array = region_array
+        self.regions = region_array.tolist()
+
+    def __len__(self):
+        return len(self.lows)
+
+    def find(self, value):
+        """
+        Row containing a value
+
+        Args:
+            value: Number to look up
+
+        Returns:
+            Index of the first row whose range contains value, or -1
+        """
+        i = bisect_left(self.breakpoints, value)
+        if i < len(self.breakpoints) and self.breakpoints[i] == value:
+            return self.regions[2 * i + 1]
+        # NaN compares false with everything, lands in region 0 and misses
+        return self.regions[2 * i]
+
+    def find_many(self, values):
+        """
+        Rows containing each of an array of values
+
+        Args:
+            values: Array-like of numbers
+
+        Returns:
+            Integer array of row indices (-1 where no row contains the value)
+        """
+        values = np.asarray(values, dtype=float)
+        if not self.breakpoints:
+            return np.full(values.shape, -1, dtype=np.intp)
+
+        i = np.searchsorted(self.breakpoint_array, values, side='left')
+        clipped = np.minimum(i, len(self.breakpoints) - 1)
+        on_point = self.breakpoint_array[clipped] == values
+
+        # NaN sorts past the last endpoint, into the final (empty) region
+        return self.region_array[np.where(on_point, 2 * clipped + 1, 2 * i)]
@@ -3,8 +3,10 @@ Drainfield Placer - Main Application Entry Point
 Simple console interface for quick testing
 """
 
+import os
 import sys
 import json
+import threading
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -15,9 +17,8 @@ from drainfield_placer import (
     DrainFieldSelector,
     parse_user_boundary,
     validate_boundary,
-    place_drainfield,
-    place_split_drainfield,
-    create_placement_summary
+    create_placement_summary,
+    OUTPUT_MODES
 )
 
 # Import new modules for full design mode
@@ -26,31 +27,168 @@ from tank_sizing import TankSizer
 from specifications import SpecificationGenerator
 from database import SepticDatabase
 from drainfield_requirements import DrainFieldRequirements
+from fit_cache import FitCache
+from hot_reload import HotReloader
+from tank_catalog import TankCatalog
+from design_table import DesignTable, source_digest
+from data_store import DATA_DIR
+from cad_output import (
+    OUTPUT_FORMATS,
+    placement_delta,
+    make_sidecar,
+    write_sidecar,
+    write_placed,
+    file_sha256,
+    canonical_sha256
+)
 
 
 class DrainFieldPlacer:
     """Main application class"""
     
-    def __init__(self, json_dir="json", data_dir="data"):
-        """Initialize the application"""
+    def __init__(self, json_dir="json", data_dir=DATA_DIR, fit_cache_path=None,
+                 hot_reload=False, reload_interval=2.0, output_mode='exploded',
+                 output_format='full', design_table_path=None):
+        """
+        Initialize the application
+
+        Args:
+            json_dir: Directory containing the configuration JSON files
+            data_dir: Directory containing the CSV data tables
+            fit_cache_path: Optional SQLite file for the persistent fit cache
+            hot_reload: Poll the JSON configs and CSV tables in the background
+                        and swap in reloaded versions when they change
+            reload_interval: Seconds between hot-reload polls
+            output_mode: 'exploded' writes every chamber as a polyline;
+                         'blocks' writes each configuration once as a block
+                         plus an insert, saved as compact JSON
+            output_format: 'full' writes the input drawing plus the placed
+                           entities (streamed, never building the merged
+                           drawing); 'delta' writes only the placed entities
+                           as a sidecar keyed by the input's SHA-256
+            design_table_path: Optional JSON file for the precomputed
+                               flow -> design table, loaded when it matches
+                               the current data and rebuilt and saved when
+                               not (default: keep the table in memory only)
+        """
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode} (expected one of {OUTPUT_MODES})")
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format} "
+                             f"(expected one of {OUTPUT_FORMATS})")
+
         print("=" * 60)
         print("  DRAINFIELD PLACER - Automatic Configuration Tool")
         print("=" * 60)
         print()
 
-        self.config_loader = ConfigLoader(json_dir)
-        self.selector = DrainFieldSelector(self.config_loader)
+        self.json_dir = json_dir
+        self.data_dir = data_dir
+        self.output_mode = output_mode
+        self.output_format = output_format
+        self.design_table_path = design_table_path
+        self._swap_lock = threading.Lock()
+
+        self.config_loader = ConfigLoader(json_dir, data_dir=data_dir)
+        # Cached selections are reused across moved and rotated lots, which
+        # needs the rotation search in each lot's canonical frame
+        self.selector = DrainFieldSelector(self.config_loader,
+                                           canonical_frames=fit_cache_path is not None)
+        self.fit_cache = FitCache(fit_cache_path) if fit_cache_path else None
 
         # Initialize new modules for full design mode
         self.flow_calculator = SewageFlowCalculator(data_dir)
-        self.tank_sizer = TankSizer(data_dir)
-        self.spec_generator = SpecificationGenerator()
+        self.tank_catalog = TankCatalog(data_dir)
+        self.tank_sizer = TankSizer(data_dir, self.tank_catalog)
+        self.spec_generator = SpecificationGenerator(data_dir, self.tank_catalog)
         self.drainfield_requirements = DrainFieldRequirements(data_dir)
 
         # Load all configurations at startup
         if not self.config_loader.load_all_configs():
             print("\n⚠ Warning: Not all configuration files loaded!")
+
+        self.design_table = None
+        self.design_table = self.build_design_table()
         print()
+
+        self.reloader = HotReloader(self, reload_interval)
+        if hot_reload:
+            self.reloader.start()
+
+    def build_design_table(self):
+        """
+        Precomputed flow -> design table for the current components
+
+        Loaded from design_table_path when it was built from the same data,
+        otherwise built (and saved there, if set).
+
+        Returns:
+            DesignTable
+        """
+        components = self.components()
+        digest = source_digest(self.data_dir, components['config_loader'],
+                               components['selector'].product_priority)
+
+        if self.design_table_path:
+            try:
+                table = DesignTable.load(self.design_table_path, digest)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"  ⚠ Could not read design table, rebuilding: {e}")
+                table = None
+            if table is not None:
+                print(f"  ✓ Loaded design table from {self.design_table_path} "
+                      f"({len(table)} flows up to {table.max_flow} GPD)")
+                return table
+
+        table = DesignTable.build(
+            components['flow_calculator'],
+            components['tank_sizer'],
+            components['drainfield_requirements'],
+            components['spec_generator'],
+            components['selector'],
+            digest=digest
+        )
+        print(f"  ✓ Built design table ({len(table)} flows up to {table.max_flow} GPD)")
+
+        if self.design_table_path:
+            try:
+                table.save(self.design_table_path)
+            except OSError as e:
+                print(f"  ⚠ Could not save design table: {e}")
+        return table
+
+    def swap_components(self, **components):
+        """
+        Replace loaded components (e.g. config_loader, selector, tank_sizer)
+
+        Designs already running keep the objects they captured with
+        components(); the next design picks up the new ones.
+
+        Args:
+            **components: Attribute name -> new component
+        """
+        with self._swap_lock:
+            for name, component in components.items():
+                setattr(self, name, component)
+
+    def components(self):
+        """
+        Consistent snapshot of the loaded components for one design
+
+        Returns:
+            Dictionary of attribute name -> component
+        """
+        with self._swap_lock:
+            return {
+                'config_loader': self.config_loader,
+                'selector': self.selector,
+                'flow_calculator': self.flow_calculator,
+                'tank_catalog': self.tank_catalog,
+                'tank_sizer': self.tank_sizer,
+                'spec_generator': self.spec_generator,
+                'drainfield_requirements': self.drainfield_requirements,
+                'design_table': self.design_table,
+            }
     
     def run_simple_test(self, required_sqft, boundary_width, boundary_height):
         """
@@ -86,7 +224,8 @@ class DrainFieldPlacer:
         
         # Try standard trench first
         print("Attempting selection...")
-        result = self.selector.select_configuration(
+        selector = self.components()['selector']
+        result = selector.select_configuration(
             user_boundary,
             required_sqft,
             'trench'
@@ -123,7 +262,7 @@ class DrainFieldPlacer:
         
         # Apply full hierarchy
         print("Applying selection hierarchy...")
-        result = self.selector.apply_hierarchy(user_boundary, flow_gpd)
+        result = self.apply_hierarchy(user_boundary, flow_gpd)
         
         # Display results
         summary = create_placement_summary(result)
@@ -131,6 +270,33 @@ class DrainFieldPlacer:
         
         return result
     
+    def apply_hierarchy(self, user_boundary, flow_gpd, split_boundaries=None, selector=None,
+                        design_row=None):
+        """
+        Run the selection hierarchy, through the fit cache when one is enabled
+
+        Args:
+            user_boundary: Shapely Polygon of user boundary
+            flow_gpd: Gallons per day
+            split_boundaries: Optional list of 2 boundaries for split system
+            selector: DrainFieldSelector to use (default: the current one)
+            design_row: Optional DesignTable row for flow_gpd, built from
+                        the same components as selector
+
+        Returns:
+            Selection result dictionary
+        """
+        if selector is None:
+            components = self.components()
+            selector = components['selector']
+            if components['design_table'] is not None:
+                design_row = components['design_table'].get(flow_gpd)
+        if self.fit_cache is None:
+            return selector.apply_hierarchy(user_boundary, flow_gpd, split_boundaries,
+                                            design_row)
+        return self.fit_cache.apply_hierarchy(selector, user_boundary, flow_gpd,
+                                              split_boundaries, design_row)
+
     def print_summary(self, summary):
         """Print formatted summary"""
         print()
@@ -183,12 +349,20 @@ class DrainFieldPlacer:
             print(f"\nConfigurations attempted:")
             for config in summary['attempted']:
                 print(f"  - {config}")
+
+        if self.fit_cache is not None:
+            cache = self.fit_cache.summary()
+            print(f"\nFit cache: {cache['hits']}/{cache['lookups']} hits "
+                  f"({cache['hit_rate']:.0%}), "
+                  f"avg {cache['avg_hit_ms']:.1f} ms per hit, "
+                  f"{cache['avg_miss_ms']:.1f} ms per miss")
         
         print()
 
     def run_full_design(self, bedrooms, square_footage, water_type, net_acreage,
                        boundary_polygon, boundary_json=None, property_id=None,
-                       benchmark_text=None, num_homes=1, update_database=True):
+                       benchmark_text=None, num_homes=1, update_database=True,
+                       boundary_json_path=None):
         """
         Run full design workflow from building specs to drainfield placement
 
@@ -203,10 +377,23 @@ class DrainFieldPlacer:
             benchmark_text: Optional benchmark description
             num_homes: Number of dwelling units (default 1)
             update_database: Whether to update database (default True)
+            boundary_json_path: Optional file boundary_json was read from
+                                (delta output is keyed by its SHA-256)
 
         Returns:
             Dictionary with complete design results
         """
+        # Use one consistent set of tables for the whole design, even if a
+        # hot reload swaps in new ones while it runs
+        components = self.components()
+        selector = components['selector']
+        flow_calculator = components['flow_calculator']
+        tank_catalog = components['tank_catalog']
+        tank_sizer = components['tank_sizer']
+        spec_generator = components['spec_generator']
+        drainfield_requirements = components['drainfield_requirements']
+        design_table = components['design_table']
+
         print(f"FULL DESIGN MODE")
         print(f"  Bedrooms: {bedrooms}")
         print(f"  Square Footage: {square_footage}")
@@ -218,15 +405,25 @@ class DrainFieldPlacer:
 
         # Step 1: Calculate sewage flow
         print("Step 1: Calculating sewage flow...")
-        flow_gpd = self.flow_calculator.calculate_flow(bedrooms, square_footage)
+        flow_gpd = flow_calculator.calculate_flow(bedrooms, square_footage)
         print(f"  Sewage Flow: {flow_gpd} GPD")
         print()
 
         # Step 2: Determine tank requirements
         print("Step 2: Determining tank requirements...")
-        septic_tank_size = self.tank_sizer.get_septic_tank_size(flow_gpd, num_homes)
-        dosing_tank_size = self.tank_sizer.get_pump_tank_size(flow_gpd, is_residential=True)
-        atu_size = self.tank_sizer.calculate_atu_size(bedrooms, square_footage, flow_gpd)
+        # Precomputed parameters for this flow, if it is in the design table
+        design = design_table.lookup(flow_gpd, num_homes) if design_table is not None else None
+        if design_table is not None and design is None:
+            print(f"  ⚠ {flow_gpd} GPD is past the design table "
+                  f"(up to {design_table.max_flow} GPD), calculating directly")
+
+        if design:
+            septic_tank_size = design['septic_tank']
+            dosing_tank_size = design['dosing_tank']
+        else:
+            septic_tank_size = tank_sizer.get_septic_tank_size(flow_gpd, num_homes)
+            dosing_tank_size = tank_sizer.get_pump_tank_size(flow_gpd, is_residential=True)
+        atu_size = tank_sizer.calculate_atu_size(bedrooms, square_footage, flow_gpd)
         print(f"  Septic Tank Required: {septic_tank_size} gallons")
         print(f"  Dosing Tank Required: {dosing_tank_size} gallons")
         if atu_size:
@@ -235,7 +432,8 @@ class DrainFieldPlacer:
 
         # Step 3: Apply hierarchy to find drainfield configuration
         print("Step 3: Applying configuration hierarchy...")
-        result = self.selector.apply_hierarchy(boundary_polygon, flow_gpd)
+        result = self.apply_hierarchy(boundary_polygon, flow_gpd, selector=selector,
+                                      design_row=design)
 
         if not result['success']:
             print(f"  ❌ Failed: {result.get('reason', 'Unknown')}")
@@ -248,7 +446,10 @@ class DrainFieldPlacer:
         is_split = result.get('is_split', False)
 
         # Get unobstructed area required from requirements table
-        requirements = self.drainfield_requirements.get_requirements(flow_gpd, config_type)
+        if design:
+            requirements = design['config_types'][config_type]['requirements']
+        else:
+            requirements = drainfield_requirements.get_requirements(flow_gpd, config_type)
         if requirements:
             drainfield_size_required = requirements['drainfield_size']
             unobstructed_area_required = requirements['unobstructed_area']
@@ -302,7 +503,7 @@ class DrainFieldPlacer:
             metadata = result.get('metadata', {})
             drainfield_size_actual = metadata.get('credit_sqft', drainfield_size_required)
 
-        spec_text = self.spec_generator.generate_specification(
+        spec_text = spec_generator.generate_specification(
             flow_gpd=flow_gpd,
             config_type=config_type,
             drainfield_size_required=drainfield_size_required,
@@ -365,22 +566,35 @@ class DrainFieldPlacer:
                 actual_septic_tank = None
                 actual_dosing_tank = None
 
-                if not has_atu:
-                    actual_septic_tank = self.spec_generator.get_actual_tank_size(septic_tank_size)
-                    actual_dosing_tank = self.spec_generator.get_actual_dosing_tank_size(dosing_tank_size)
+                if not has_atu and design:
+                    actual_septic_tank = design['actual_septic_tank']
+                    actual_dosing_tank = design['actual_dosing_tank']
+                elif not has_atu:
+                    actual_septic_tank = spec_generator.get_actual_tank_size(septic_tank_size)
+                    actual_dosing_tank = spec_generator.get_actual_dosing_tank_size(dosing_tank_size)
+
+                # Only the added entities; the input drawing is never copied
+                delta = placement_delta(result, spec_text, actual_septic_tank,
+                                        actual_dosing_tank, self.output_mode, tank_catalog)
+
+                if self.output_format == 'delta':
+                    # Written against the input's digest
+                    if boundary_json_path:
+                        sidecar = make_sidecar(delta, file_sha256(boundary_json_path))
+                    else:
+                        sidecar = make_sidecar(delta, canonical_sha256(boundary_json),
+                                               'canonical-json')
 
-                # Place drainfield into the CAD JSON
-                if is_split:
-                    output_json = place_split_drainfield(boundary_json, result, spec_text,
-                                                        actual_septic_tank, actual_dosing_tank)
+                    output_filename = (f"output_drainfield_"
+                                       f"{property_id if property_id else 'design'}.delta.json")
+                    write_sidecar(output_filename, sidecar)
                 else:
-                    output_json = place_drainfield(boundary_json, result, spec_text,
-                                                  actual_septic_tank, actual_dosing_tank)
-
-                # Save to output file
-                output_filename = f"output_drainfield_{property_id if property_id else 'design'}.json"
-                with open(output_filename, 'w') as f:
-                    json.dump(output_json, f, indent=2)
+                    # Stream the input drawing plus the placed entities
+                    output_filename = f"output_drainfield_{property_id if property_id else 'design'}.json"
+                    if self.output_mode == 'blocks':
+                        write_placed(output_filename, boundary_json, delta, separators=(',', ':'))
+                    else:
+                        write_placed(output_filename, boundary_json, delta, indent=2)
 
                 print(f"  ✓ Output saved to: {output_filename}")
                 result['output_json_file'] = output_filename
@@ -404,9 +618,19 @@ class DrainFieldPlacer:
 
 
 def main():
-    """Main entry point"""
+    """
+    Main entry point
+
+    Environment:
+        DRAINFIELD_FIT_CACHE: SQLite file for the persistent fit cache
+                              (opt-in; no cache when unset)
+    """
+    fit_cache_path = os.environ.get('DRAINFIELD_FIT_CACHE')
+    if fit_cache_path:
+        fit_cache_path = str(Path(fit_cache_path).expanduser().resolve())
+
     # Create application instance
-    app = DrainFieldPlacer()
+    app = DrainFieldPlacer(fit_cache_path=fit_cache_path)
 
     # Mode selection
     print("MODE SELECTION")
@@ -503,7 +727,8 @@ def main():
                 property_id=property_id,
                 benchmark_text=benchmark_text,
                 num_homes=num_homes,
-                update_database=(property_id is not None)
+                update_database=(property_id is not None),
+                boundary_json_path=boundary_json_path
             )
 
         else:
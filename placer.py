@@ -6,43 +6,28 @@ Handles placing drainfield configurations into CAD JSON
 import copy
 from shapely.affinity import translate, rotate
 import math
-import csv
-from pathlib import Path
+import numpy as np
 
+from tank_catalog import shared_catalog
+from data_store import DATA_DIR
 
-def get_tank_dimensions(tank_gallons, data_dir="data"):
+
+def get_tank_dimensions(tank_gallons, data_dir=DATA_DIR, catalog=None):
     """
     Get tank dimensions from fdep_tanks.csv
 
     Args:
         tank_gallons: Tank capacity in gallons
-        data_dir: Directory containing data files
+        data_dir: Directory containing data files (used without a catalog)
+        catalog: Loaded TankCatalog (default: the shared catalog for data_dir,
+                 loaded on first use)
 
     Returns:
         Tuple of (width_ft, length_ft) or None if not found
     """
-    csv_path = Path(data_dir) / "fdep_tanks.csv"
-
-    if not csv_path.exists():
-        return None
-
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get('effective_gallons') == str(tank_gallons):
-                width_in = row.get('width')
-                length_in = row.get('length')
-
-                if width_in and length_in:
-                    try:
-                        # Convert inches to feet
-                        width_ft = float(width_in) / 12.0
-                        length_ft = float(length_in) / 12.0
-                        return (width_ft, length_ft)
-                    except (ValueError, TypeError):
-                        pass
-
-    return None
+    if catalog is None:
+        catalog = shared_catalog(data_dir)
+    return catalog.get_dimensions(tank_gallons)
 
 
 def create_tank_rectangle(x, y, width_ft, length_ft, label):
@@ -130,6 +115,72 @@ def rotate_point(point, angle_deg, origin_x, origin_y):
     }
 
 
+def transform_points(coords, rotation, origin_x, origin_y, dx, dy):
+    """
+    Rotate then translate an array of coordinates
+
+    Uses the same operation order as rotate_point followed by
+    translate_point, so results match the per-point path exactly.
+
+    Args:
+        coords: (N, 2) array of x, y
+        rotation: Rotation angle in degrees
+        origin_x, origin_y: Rotation origin (usually centroid)
+        dx, dy: Translation offset
+
+    Returns:
+        Tuple of (x, y) arrays
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    x = coords[:, 0]
+    y = coords[:, 1]
+
+    if rotation != 0:
+        angle_rad = math.radians(rotation)
+        cos_a = math.cos(angle_rad)
+        sin_a = math.sin(angle_rad)
+
+        x = x - origin_x
+        y = y - origin_y
+        x, y = x * cos_a - y * sin_a + origin_x, x * sin_a + y * cos_a + origin_y
+
+    return (x + dx, y + dy)
+
+
+def transform_polylines(polylines, rotation, origin_x, origin_y, dx, dy):
+    """
+    Transform a group of polylines (rotate then translate) in one pass
+
+    All points are gathered into a single array, transformed together and
+    written back out as new point dictionaries. Other polyline keys are
+    copied.
+
+    Args:
+        polylines: List of CAD polyline dictionaries
+        rotation: Rotation angle in degrees
+        origin_x, origin_y: Rotation origin (usually centroid)
+        dx, dy: Translation offset
+
+    Returns:
+        List of transformed polyline dictionaries
+    """
+    coords = [(pt['x'], pt['y']) for polyline in polylines for pt in polyline['points']]
+    x, y = transform_points(coords, rotation, origin_x, origin_y, dx, dy)
+    points = [{'x': px, 'y': py} for px, py in zip(x.tolist(), y.tolist())]
+
+    transformed = []
+    start = 0
+    for polyline in polylines:
+        end = start + len(polyline['points'])
+        transformed.append({
+            key: points[start:end] if key == 'points' else copy.deepcopy(value)
+            for key, value in polyline.items()
+        })
+        start = end
+
+    return transformed
+
+
 def transform_polyline(polyline, rotation, origin_x, origin_y, dx, dy):
     """
     Transform a polyline (rotate then translate)
@@ -143,22 +194,7 @@ def transform_polyline(polyline, rotation, origin_x, origin_y, dx, dy):
     Returns:
         Transformed polyline dictionary
     """
-    transformed = copy.deepcopy(polyline)
-    
-    # First rotate if needed
-    if rotation != 0:
-        transformed['points'] = [
-            rotate_point(pt, rotation, origin_x, origin_y)
-            for pt in transformed['points']
-        ]
-    
-    # Then translate
-    transformed['points'] = [
-        translate_point(pt, dx, dy)
-        for pt in transformed['points']
-    ]
-    
-    return transformed
+    return transform_polylines([polyline], rotation, origin_x, origin_y, dx, dy)[0]
 
 
 def calculate_polygon_centroid(points):
@@ -181,32 +217,67 @@ def calculate_polygon_centroid(points):
     return (cx, cy)
 
 
-def place_drainfield(base_cad_json, selection_result, spec_text=None,
-                    septic_tank_gallons=None, dosing_tank_gallons=None):
+# 'exploded' writes every placed chamber as a polyline; 'blocks' writes each
+# configuration once as a block definition plus one insert per placement
+OUTPUT_MODES = ('exploded', 'blocks')
+
+
+def _output_drawing(base_cad_json, in_place=False, output_mode='exploded'):
     """
-    Place the selected drainfield configuration into CAD JSON
+    Drawing that placed entities are appended to
+
+    Copy-on-write: the top-level dictionary and its entity collections
+    ('polylines' and 'texts', plus 'blocks' and 'inserts' in blocks mode)
+    are new, but the entities already in the base drawing are shared with
+    it rather than deep-copied. With in_place the base drawing itself is
+    returned (with the collections created if missing).
 
     Args:
         base_cad_json: Original CAD JSON structure
-        selection_result: Result dictionary from selector
-        spec_text: Optional specification text to add at (0,0)
-        septic_tank_gallons: Septic tank size in gallons (for drawing tank)
-        dosing_tank_gallons: Dosing tank size in gallons (for drawing tank)
+        in_place: Append to base_cad_json itself
+        output_mode: 'exploded' or 'blocks'
 
     Returns:
-        Modified CAD JSON with drainfield added
+        CAD JSON dictionary with its entity collections ready to extend
     """
-    # Deep copy to avoid modifying original
-    output_cad = copy.deepcopy(base_cad_json)
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {output_mode} (expected one of {OUTPUT_MODES})")
+
+    collections = {'polylines': list, 'texts': list}
+    if output_mode == 'blocks':
+        collections.update({'blocks': dict, 'inserts': list})
+
+    if in_place:
+        output_cad = base_cad_json
+        for key, kind in collections.items():
+            output_cad.setdefault(key, kind())
+        return output_cad
+
+    output_cad = dict(base_cad_json)
+    for key, kind in collections.items():
+        output_cad[key] = kind(base_cad_json.get(key, kind()))
+    return output_cad
 
-    # Ensure polylines array exists
-    if 'polylines' not in output_cad:
-        output_cad['polylines'] = []
 
-    # Ensure texts array exists
-    if 'texts' not in output_cad:
-        output_cad['texts'] = []
+def _rotation_origin(config_polylines):
+    """Centroid of the shoulder polyline (the rotation origin), or (0, 0)"""
+    # Find shoulder polyline to get centroid (rotation origin)
+    for polyline in config_polylines:
+        if polyline.get('closed', False):
+            return calculate_polygon_centroid(polyline['points'])
+    return (0, 0)
 
+
+def drainfield_polylines(selection_result):
+    """
+    Chamber and shoulder polylines of a selection, placed in the drawing
+
+    Args:
+        selection_result: Result dictionary from selector
+
+    Returns:
+        List of new polyline dictionaries with placement metadata
+    """
     # Get the drainfield configuration
     config_data = selection_result['config_data']
     rotation = selection_result['rotation']
@@ -214,31 +285,20 @@ def place_drainfield(base_cad_json, selection_result, spec_text=None,
     dy = selection_result['offset_y']
 
     # Get polylines from config
-    drainfield_polylines = config_data['cad_json']['polylines']
-
-    # Find shoulder polyline to get centroid (rotation origin)
-    shoulder = None
-    for polyline in drainfield_polylines:
-        if polyline.get('closed', False):
-            shoulder = polyline
-            break
-
-    if shoulder:
-        origin_x, origin_y = calculate_polygon_centroid(shoulder['points'])
-    else:
-        origin_x, origin_y = 0, 0
-
-    # Transform and add each polyline
-    for polyline in drainfield_polylines:
-        transformed = transform_polyline(
-            polyline,
-            rotation,
-            origin_x,
-            origin_y,
-            dx,
-            dy
-        )
-
+    config_polylines = config_data['cad_json']['polylines']
+    origin_x, origin_y = _rotation_origin(config_polylines)
+
+    # Transform every polyline in one pass
+    transformed_polylines = transform_polylines(
+        config_polylines,
+        rotation,
+        origin_x,
+        origin_y,
+        dx,
+        dy
+    )
+
+    for polyline, transformed in zip(config_polylines, transformed_polylines):
         # Add metadata about the placement
         transformed['metadata'] = {
             'source': 'drainfield_placer',
@@ -248,103 +308,260 @@ def place_drainfield(base_cad_json, selection_result, spec_text=None,
             'is_shoulder': polyline.get('closed', False)
         }
 
-        output_cad['polylines'].append(transformed)
+    return transformed_polylines
 
-    # Add specification text at (0, 0) if provided
-    # Split into separate text objects (one per line) for CAD compatibility
-    if spec_text:
-        lines = spec_text.split('\n')
-        line_spacing = 5.52  # Vertical spacing between lines
-        text_height = 5      # Text height
-
-        for i, line in enumerate(lines):
-            if line.strip():  # Only add non-empty lines
-                text_obj = {
-                    'x': 0.0,
-                    'y': -i * line_spacing,  # Decrease Y for each line
-                    'text': line,
-                    'height': text_height,
-                    'rotation': 0,
-                    'selected': False
-                }
-                output_cad['texts'].append(text_obj)
 
-    # Add tank rectangles near the specification text
+def block_name(selection_result):
+    """
+    Block name for a selection's configuration, e.g. 'mps9_bed_[5, 5, 5]'
+
+    Bed and trench layouts of the same pattern differ in row spacing, so
+    the base type is part of the name.
+    """
+    base_type = 'trench' if 'trench' in selection_result.get('config_type', '') else 'bed'
+    return f"{selection_result['product']}_{base_type}_{selection_result['pattern_key']}"
+
+
+def drainfield_block(selection_result):
+    """
+    Block definition and insert for a selection
+
+    The block holds the configuration's polylines untransformed, with the
+    shoulder centroid as its base point. The insert rotates the block
+    about that point and moves it by the placement offset, the same
+    transform the exploded mode applies to each polyline.
+
+    Args:
+        selection_result: Result dictionary from selector
+
+    Returns:
+        Tuple of (name, block definition, insert dictionary)
+    """
+    config_polylines = selection_result['config_data']['cad_json']['polylines']
+    origin_x, origin_y = _rotation_origin(config_polylines)
+    name = block_name(selection_result)
+
+    block = {
+        'base_point': {'x': origin_x, 'y': origin_y},
+        'polylines': copy.deepcopy(config_polylines),
+    }
+    insert = {
+        'block': name,
+        'rotation': selection_result['rotation'],
+        'offset_x': selection_result['offset_x'],
+        'offset_y': selection_result['offset_y'],
+        'selected': False,
+        'metadata': {
+            'source': 'drainfield_placer',
+            'product': selection_result['product'],
+            'pattern': selection_result['pattern_key'],
+            'rotation': selection_result['rotation'],
+        }
+    }
+    return name, block, insert
+
+
+def explode_inserts(cad_json):
+    """
+    Expand drainfield block inserts into explicit polylines
+
+    For consumers that do not read blocks. Polylines come out as in the
+    exploded output mode (same coordinates and metadata), appended after
+    the drawing's existing polylines.
+
+    Args:
+        cad_json: CAD JSON written in blocks mode
+
+    Returns:
+        Copy-on-write CAD JSON without 'blocks' and 'inserts'
+    """
+    output_cad = _output_drawing(cad_json)
+    blocks = output_cad.pop('blocks', {})
+
+    for insert in output_cad.pop('inserts', []):
+        block = blocks[insert['block']]
+        base_point = block['base_point']
+        transformed_polylines = transform_polylines(
+            block['polylines'],
+            insert['rotation'],
+            base_point['x'],
+            base_point['y'],
+            insert['offset_x'],
+            insert['offset_y']
+        )
+
+        for polyline, transformed in zip(block['polylines'], transformed_polylines):
+            transformed['metadata'] = dict(insert['metadata'],
+                                           is_shoulder=polyline.get('closed', False))
+
+        output_cad['polylines'].extend(transformed_polylines)
+
+    return output_cad
+
+
+def specification_texts(spec_text):
+    """
+    Specification text objects at (0, 0)
+
+    Split into separate text objects (one per line) for CAD compatibility
+
+    Args:
+        spec_text: Specification text
+
+    Returns:
+        List of text dictionaries
+    """
+    texts = []
+    lines = spec_text.split('\n')
+    line_spacing = 5.52  # Vertical spacing between lines
+    text_height = 5      # Text height
+
+    for i, line in enumerate(lines):
+        if line.strip():  # Only add non-empty lines
+            texts.append({
+                'x': 0.0,
+                'y': -i * line_spacing,  # Decrease Y for each line
+                'text': line,
+                'height': text_height,
+                'rotation': 0,
+                'selected': False
+            })
+
+    return texts
+
+
+def tank_entities(septic_tank_gallons=None, dosing_tank_gallons=None, tank_catalog=None):
+    """
+    Tank rectangles and labels, placed to the right of the specification text
+
+    Args:
+        septic_tank_gallons: Septic tank size in gallons
+        dosing_tank_gallons: Dosing tank size in gallons
+        tank_catalog: Loaded TankCatalog (default: the shared catalog, loaded
+                      on first use)
+
+    Returns:
+        Tuple of (polylines, texts)
+    """
+    polylines = []
+    texts = []
+
     tank_x_start = 20.0  # Start tanks 20 feet to the right of text
     tank_y_start = 0.0   # Align top with text
     tank_spacing = 2.0   # Space between tanks
 
     current_x = tank_x_start
 
-    # Add septic tank
-    if septic_tank_gallons:
-        dims = get_tank_dimensions(septic_tank_gallons)
-        if dims:
-            width_ft, length_ft = dims
-            tank_poly = create_tank_rectangle(current_x, tank_y_start, width_ft, length_ft,
-                                             f'SEPTIC TANK {septic_tank_gallons} GAL')
-            output_cad['polylines'].append(tank_poly)
-
-            # Add label text for tank
-            label_text = {
-                'x': current_x + length_ft / 2,
-                'y': tank_y_start + width_ft / 2,
-                'text': f'SEPTIC TANK\n{septic_tank_gallons} GAL',
-                'height': 3,
-                'rotation': 0,
-                'selected': False
-            }
-            output_cad['texts'].append(label_text)
-
-            current_x += length_ft + tank_spacing
-
-    # Add dosing tank
-    if dosing_tank_gallons:
-        dims = get_tank_dimensions(dosing_tank_gallons)
-        if dims:
-            width_ft, length_ft = dims
-            tank_poly = create_tank_rectangle(current_x, tank_y_start, width_ft, length_ft,
-                                             f'DOSING TANK {dosing_tank_gallons} GAL')
-            output_cad['polylines'].append(tank_poly)
-
-            # Add label text for tank
-            label_text = {
-                'x': current_x + length_ft / 2,
-                'y': tank_y_start + width_ft / 2,
-                'text': f'DOSING TANK\n{dosing_tank_gallons} GAL',
-                'height': 3,
-                'rotation': 0,
-                'selected': False
-            }
-            output_cad['texts'].append(label_text)
+    if tank_catalog is None and (septic_tank_gallons or dosing_tank_gallons):
+        tank_catalog = shared_catalog()
+
+    for gallons, name in ((septic_tank_gallons, 'SEPTIC TANK'),
+                          (dosing_tank_gallons, 'DOSING TANK')):
+        if not gallons:
+            continue
+
+        dims = tank_catalog.get_dimensions(gallons)
+        if not dims:
+            continue
+
+        width_ft, length_ft = dims
+        polylines.append(create_tank_rectangle(current_x, tank_y_start, width_ft, length_ft,
+                                               f'{name} {gallons} GAL'))
+
+        # Add label text for tank
+        texts.append({
+            'x': current_x + length_ft / 2,
+            'y': tank_y_start + width_ft / 2,
+            'text': f'{name}\n{gallons} GAL',
+            'height': 3,
+            'rotation': 0,
+            'selected': False
+        })
+
+        current_x += length_ft + tank_spacing
+
+    return polylines, texts
+
+
+def place_drainfield(base_cad_json, selection_result, spec_text=None,
+                    septic_tank_gallons=None, dosing_tank_gallons=None, in_place=False,
+                    output_mode='exploded', tank_catalog=None):
+    """
+    Place the selected drainfield configuration into CAD JSON
+
+    The base drawing is not deep-copied: the output shares its existing
+    entities and only the new polylines and texts are created, so treat
+    base entities in the output as read-only.
+
+    In 'blocks' mode the drainfield is written as a block definition in
+    'blocks' (once per configuration, keyed by block_name) and an insert
+    in 'inserts' instead of explicit chamber polylines.
+
+    Args:
+        base_cad_json: Original CAD JSON structure
+        selection_result: Result dictionary from selector
+        spec_text: Optional specification text to add at (0,0)
+        septic_tank_gallons: Septic tank size in gallons (for drawing tank)
+        dosing_tank_gallons: Dosing tank size in gallons (for drawing tank)
+        in_place: Append to base_cad_json instead of a copy-on-write copy
+        output_mode: 'exploded' or 'blocks'
+        tank_catalog: Loaded TankCatalog for tank footprints
+
+    Returns:
+        CAD JSON with drainfield added
+    """
+    output_cad = _output_drawing(base_cad_json, in_place, output_mode)
+
+    if output_mode == 'blocks':
+        name, block, insert = drainfield_block(selection_result)
+        output_cad['blocks'].setdefault(name, block)
+        output_cad['inserts'].append(insert)
+    else:
+        output_cad['polylines'].extend(drainfield_polylines(selection_result))
+
+    # Add specification text at (0, 0) if provided
+    if spec_text:
+        output_cad['texts'].extend(specification_texts(spec_text))
+
+    # Add tank rectangles near the specification text
+    tank_polylines, tank_texts = tank_entities(septic_tank_gallons, dosing_tank_gallons,
+                                               tank_catalog)
+    output_cad['polylines'].extend(tank_polylines)
+    output_cad['texts'].extend(tank_texts)
 
     return output_cad
 
 
 def place_split_drainfield(base_cad_json, selection_result, spec_text=None,
-                          septic_tank_gallons=None, dosing_tank_gallons=None):
+                          septic_tank_gallons=None, dosing_tank_gallons=None, in_place=False,
+                          output_mode='exploded', tank_catalog=None):
     """
     Place a split drainfield system into CAD JSON
 
     Args:
         base_cad_json: Original CAD JSON structure
         selection_result: Split system result dictionary
+        spec_text: Optional specification text to add at (0,0)
         septic_tank_gallons: Septic tank size in gallons (for drawing tank)
         dosing_tank_gallons: Dosing tank size in gallons (for drawing tank)
-        spec_text: Optional specification text to add at (0,0)
+        in_place: Append to base_cad_json instead of a copy-on-write copy
+        output_mode: 'exploded' or 'blocks'
+        tank_catalog: Loaded TankCatalog for tank footprints
 
     Returns:
-        Modified CAD JSON with both drainfields added
+        CAD JSON with both drainfields added
     """
-    # Start with base
-    output_cad = copy.deepcopy(base_cad_json)
+    # One copy-on-write output for both placements
+    output_cad = _output_drawing(base_cad_json, in_place, output_mode)
 
     # Place first drainfield (without text or tanks)
-    output_cad = place_drainfield(output_cad, selection_result['drainfield_1'])
+    place_drainfield(output_cad, selection_result['drainfield_1'], in_place=True,
+                     output_mode=output_mode)
 
     # Place second drainfield (with text and tanks if provided)
-    output_cad = place_drainfield(output_cad, selection_result['drainfield_2'], spec_text,
-                                 septic_tank_gallons, dosing_tank_gallons)
+    place_drainfield(output_cad, selection_result['drainfield_2'], spec_text,
+                     septic_tank_gallons, dosing_tank_gallons, in_place=True,
+                     output_mode=output_mode, tank_catalog=tank_catalog)
 
     return output_cad
 
@@ -4,26 +4,65 @@ Implements the configuration selection hierarchy
 """
 
 import math
+import time
 from geometry import (
+    ANCHOR_STRATEGIES,
+    BoundaryContext,
+    canonical_frame,
     extract_shoulder_polygon,
-    polygon_fits,
-    try_rotations,
-    calculate_centroid_offset
+    simplify_boundary,
+    rectangle_dimensions,
+    quick_reject,
+    quick_accept,
+    try_rotation_angles,
+    find_placement,
+    calculate_centered_offset
 )
 
 
 class DrainFieldSelector:
     """Handles drainfield configuration selection based on hierarchy"""
-    
-    def __init__(self, config_loader):
+
+    def __init__(self, config_loader, verify_search=False,
+                 allow_translation=True, anchor='centroid', rotation_budget=36,
+                 simplify_tolerance=None, canonical_frames=False):
         """
         Initialize selector with configuration loader
         
         Args:
             config_loader: Instance of ConfigLoader
+            verify_search: Cross-check every pruned candidate scan against an
+                           exhaustive scan without dominance pruning
+            allow_translation: Place fields off-center (inner-fit polygon search)
+                               when no rotation fits centered on the boundary
+            anchor: Point fields are centered on during fit tests, 'centroid'
+                    or 'pole' (pole of inaccessibility, better for concave lots)
+            rotation_budget: Maximum number of edge-aligned rotation angles per
+                             boundary, longest-edge alignments kept first
+                             (None for no cap)
+            simplify_tolerance: Simplify dense boundaries to this tolerance (feet)
+                                before fitting; the simplified boundary lies
+                                inside the original (None to disable)
+            canonical_frames: Search rotations in each boundary's canonical
+                              frame (geometry.canonical_frame) instead of
+                              from the x axis, so moved and rotated copies of
+                              a lot get the same selection; needed by FitCache
         """
+        if anchor not in ANCHOR_STRATEGIES:
+            raise ValueError(f"Unknown anchor strategy '{anchor}'")
+        if rotation_budget is not None and rotation_budget < 1:
+            raise ValueError(f"Rotation budget must be at least 1, got {rotation_budget}")
+        if simplify_tolerance is not None and simplify_tolerance <= 0:
+            raise ValueError(f"Simplify tolerance must be positive, got {simplify_tolerance}")
+
         self.config_loader = config_loader
         self.product_priority = ['mps9', 'arc24', 'eq36lp']
+        self.verify_search = verify_search
+        self.allow_translation = allow_translation
+        self.anchor = anchor
+        self.rotation_budget = rotation_budget
+        self.simplify_tolerance = simplify_tolerance
+        self.canonical_frames = canonical_frames
     
     def calculate_required_sqft(self, flow_gpd, config_type):
         """
@@ -48,31 +87,42 @@ class DrainFieldSelector:
         
         return math.ceil(base_sqft)
     
-    def select_configuration(self, user_boundary, required_sqft, config_type='trench'):
+    def select_configuration(self, user_boundary, required_sqft, config_type='trench',
+                             candidate_starts=None):
         """
         Select the best drainfield configuration for given requirements
         
         Args:
-            user_boundary: Shapely Polygon of user-drawn boundary
+            user_boundary: Shapely Polygon or BoundaryContext of user-drawn boundary
             required_sqft: Required square footage
             config_type: 'trench', 'bed', 'trench_atu', or 'bed_atu'
+            candidate_starts: Optional precomputed CandidateIndex.starts for
+                              required_sqft, keyed by '<product>_<base type>'
             
         Returns:
             Dictionary with selection results
         """
         # Extract base type (trench or bed)
         base_type = 'trench' if 'trench' in config_type else 'bed'
+
+        # Prepare the boundary once for every product tried below
+        boundary = self._boundary_context(user_boundary)
         
         # Try each product in priority order
         for product in self.product_priority:
             result = self._try_product(
                 product, 
                 base_type, 
-                user_boundary, 
-                required_sqft
+                boundary, 
+                required_sqft,
+                (candidate_starts or {}).get(f"{product}_{base_type}")
             )
             
             if result['success']:
+                # Full chamber geometry is only fetched for the winner
+                result['config_data'] = self.config_loader.get_config_data(
+                    product, base_type, result['pattern_key']
+                )
                 result['config_type'] = config_type
                 return result
         
@@ -83,73 +133,299 @@ class DrainFieldSelector:
             'config_type': config_type
         }
     
-    def _try_product(self, product, config_type, user_boundary, required_sqft):
+    def _boundary_context(self, user_boundary):
+        """
+        Wrap a boundary in a BoundaryContext using this selector's settings
+
+        With canonical_frames set, rotations are searched in the boundary's
+        canonical frame. With simplify_tolerance set, the boundary is
+        simplified first and the vertex counts and simplification time are
+        added to the search stats.
+
+        Args:
+            user_boundary: Shapely Polygon or existing BoundaryContext
+
+        Returns:
+            BoundaryContext
+        """
+        if isinstance(user_boundary, BoundaryContext):
+            return user_boundary
+
+        frame = canonical_frame(user_boundary) if self.canonical_frames else None
+        frame_angle = frame[2] if frame is not None else None
+        if self.simplify_tolerance is None:
+            return BoundaryContext(user_boundary, anchor=self.anchor,
+                                   rotation_budget=self.rotation_budget,
+                                   frame_angle=frame_angle)
+
+        start = time.perf_counter()
+        simplified, changed = simplify_boundary(user_boundary, self.simplify_tolerance,
+                                                frame=frame)
+        elapsed_ms = 1000.0 * (time.perf_counter() - start)
+
+        context = BoundaryContext(simplified, anchor=self.anchor,
+                                  rotation_budget=self.rotation_budget,
+                                  frame_angle=frame_angle)
+        context.count('vertices_original', len(user_boundary.exterior.coords) - 1)
+        context.count('vertices_simplified', len(simplified.exterior.coords) - 1)
+        context.count('simplify_ms', elapsed_ms)
+        if not changed:
+            context.count('simplify_skipped')
+        return context
+
+    def _try_product(self, product, config_type, boundary, required_sqft, starts=None):
         """
         Try all configurations for a specific product
         
         Args:
             product: 'mps9', 'arc24', or 'eq36lp'
             config_type: 'trench' or 'bed'
-            user_boundary: Shapely Polygon
+            boundary: BoundaryContext of the user boundary
             required_sqft: Required square footage
+            starts: Optional precomputed CandidateIndex.starts(required_sqft)
             
         Returns:
             Dictionary with success status and details
         """
-        # Get configurations for this product/type
-        configs = self.config_loader.get_configs(product, config_type)
+        # Get configurations for this product/type (prebuilt, priority ordered)
+        configs = self.config_loader.get_candidate_index(product, config_type)
         
         if not configs:
             return {'success': False}
         
-        # Filter by size
-        candidates = self.config_loader.filter_by_size(configs, required_sqft)
+        # Filter by size (a bisect into the index, or a precomputed start)
+        if starts is not None:
+            candidates = configs.view(*starts)
+        else:
+            candidates = self.config_loader.filter_by_size(configs, required_sqft)
         
         if not candidates:
             return {'success': False}
         
-        # Sort: rectangular first, then smallest
+        # Sort: rectangular first, then smallest (already in this order)
         sorted_candidates = self.config_loader.sort_candidates(candidates)
-        
-        # Try each candidate with rotation
+
+        result = self._scan(product, config_type, boundary, sorted_candidates)
+
+        if self.verify_search:
+            # Independent of the memo so earlier searches are re-checked too
+            expected = self._scan(product, config_type, boundary, sorted_candidates,
+                                  prune=False, use_memo=False)
+            if (result['success'], result.get('pattern_key')) != \
+               (expected['success'], expected.get('pattern_key')):
+                print(f"Warning: pruned search picked {result.get('pattern_key')} for "
+                      f"{product}, exhaustive scan picked {expected.get('pattern_key')}")
+                return expected
+
+        return result
+
+    def _scan(self, product, config_type, boundary, sorted_candidates, prune=True,
+              use_memo=True):
+        """
+        Try candidates in priority order and return the first that fits
+
+        With pruning, a rectangular candidate whose shoulder is at least as
+        wide and as long as one that already failed on this boundary is
+        skipped without a rotation search (see _search_candidate). That
+        covers every larger pattern nested over a failed one, so the
+        selection is the same as the exhaustive scan (verify_search checks
+        this).
+
+        Args:
+            product: 'mps9', 'arc24', or 'eq36lp'
+            config_type: 'trench' or 'bed'
+            boundary: BoundaryContext of the user boundary
+            sorted_candidates: Candidates in priority order
+            prune: Apply and update the boundary's shoulder dominance record
+            use_memo: Read and update the boundary's fit memo
+
+        Returns:
+            Dictionary with success status and details
+        """
         for pattern_key, config_data in sorted_candidates:
-            # Extract shoulder polygon
-            try:
-                shoulder_polygon = extract_shoulder_polygon(config_data)
-            except Exception as e:
-                print(f"Warning: Could not extract polygon for {pattern_key}: {e}")
-                continue
-            
-            # Try rotations to find a fit
-            fits, rotation_angle, fitted_polygon = try_rotations(
+            result = self._fit_candidate(product, config_type, boundary, pattern_key,
+                                         config_data, prune=prune, use_memo=use_memo)
+            if result is not None:
+                return result
+
+        return {'success': False}
+
+    def _fit_candidate(self, product, config_type, boundary, pattern_key, config_data,
+                       prune=True, use_memo=True):
+        """
+        Fit a single candidate, reusing an earlier search on this boundary
+
+        The ATU levels only lower the required square footage, so they revisit
+        candidates the standard levels already searched; each split boundary
+        likewise sees the same candidates at every split level. The outcome is
+        memoized per boundary by (product, base type, pattern_key).
+
+        Args:
+            product: 'mps9', 'arc24', or 'eq36lp'
+            config_type: 'trench' or 'bed'
+            boundary: BoundaryContext of the user boundary
+            pattern_key: Configuration pattern key
+            config_data: Fit record ('metadata' and 'shoulder')
+            prune: Apply and update the boundary's shoulder dominance record
+            use_memo: Read and update the boundary's fit memo
+
+        Returns:
+            Success result dictionary, or None if the candidate does not fit
+        """
+        memo_key = (product, config_type, pattern_key)
+
+        if use_memo and memo_key in boundary.fit_memo:
+            boundary.count('fit_memo_hits')
+            placement = boundary.fit_memo[memo_key]
+        else:
+            if use_memo:
+                boundary.count('fit_memo_misses')
+            placement = self._search_candidate(boundary, pattern_key, config_data, prune)
+            if use_memo:
+                boundary.fit_memo[memo_key] = placement
+
+        if placement is None:
+            return None
+
+        # Offset moves the ORIGINAL shoulder_polygon (rotated about its
+        # centroid) onto fitted_polygon; this is what placer.py applies
+        rotation_angle, (dx, dy), fitted_polygon = placement
+
+        return {
+            'success': True,
+            'product': product,
+            'pattern_key': pattern_key,
+            'metadata': config_data['metadata'],
+            'rotation': rotation_angle,
+            'offset_x': dx,
+            'offset_y': dy,
+            'fitted_polygon': fitted_polygon
+        }
+
+    def _search_candidate(self, boundary, pattern_key, config_data, prune=True):
+        """
+        Run the rotation search for a single candidate
+
+        With pruning enabled, a rectangular shoulder at least as wide and as
+        long as one that already failed on this boundary is rejected without
+        a search, and shoulders that fail are recorded for later candidates.
+        Quick-reject and quick-accept certificates run before the search.
+
+        Args:
+            boundary: BoundaryContext of the user boundary
+            pattern_key: Configuration pattern key
+            config_data: Fit record ('metadata' and 'shoulder')
+            prune: Apply and update the boundary's shoulder dominance record
+
+        Returns:
+            Tuple of (rotation_angle, (dx, dy), fitted_polygon), or None if the
+            candidate does not fit
+        """
+        # Extract shoulder polygon
+        try:
+            shoulder_polygon = extract_shoulder_polygon(config_data)
+        except Exception as e:
+            print(f"Warning: Could not extract polygon for {pattern_key}: {e}")
+            return None
+
+        dimensions = None
+        if prune and config_data['metadata'].get('is_rectangular', False):
+            if 'dimensions' in config_data:
+                dimensions = config_data['dimensions']
+            else:
+                dimensions = rectangle_dimensions(shoulder_polygon)
+
+        if dimensions is not None and self._is_dominated(boundary, dimensions):
+            boundary.count('dominance_pruned')
+            return None
+
+        # Cheap geometric certificates before the full rotation search
+        reject_reason = quick_reject(shoulder_polygon, boundary)
+
+        if reject_reason is not None:
+            boundary.count(f'quick_reject_{reject_reason}')
+            fits = False
+        elif quick_accept(shoulder_polygon, boundary):
+            # Every angle fits, so the first one in priority order wins
+            boundary.count('quick_accept')
+            fits, rotation_angle, fitted_polygon = try_rotation_angles(
+                shoulder_polygon,
+                boundary,
+                boundary.rotation_angles[:1]
+            )
+            offset = calculate_centered_offset(shoulder_polygon, boundary)
+        else:
+            # Try rotations (and off-center positions) to find a fit
+            boundary.count('rotation_searches')
+            fits, rotation_angle, fitted_polygon, offset = find_placement(
                 shoulder_polygon,
-                user_boundary
+                boundary,
+                self.allow_translation
             )
 
-            if fits:
-                # Calculate placement offset from original position to boundary
-                # Note: fitted_polygon is already positioned, but we need the offset
-                # from the ORIGINAL shoulder_polygon to apply in placer.py
-                boundary_centroid = user_boundary.centroid
-                original_centroid = shoulder_polygon.centroid
-                dx = boundary_centroid.x - original_centroid.x
-                dy = boundary_centroid.y - original_centroid.y
+        if not fits:
+            if dimensions is not None:
+                boundary.failed_shoulders.append(dimensions)
+            return None
 
-                return {
-                    'success': True,
-                    'product': product,
-                    'pattern_key': pattern_key,
-                    'config_data': config_data,
-                    'metadata': config_data['metadata'],
-                    'rotation': rotation_angle,
-                    'offset_x': dx,
-                    'offset_y': dy,
-                    'fitted_polygon': fitted_polygon
-                }
-        
-        return {'success': False}
+        return (rotation_angle, offset, fitted_polygon)
     
-    def apply_hierarchy(self, user_boundary, flow_gpd, split_boundaries=None):
+    def _is_dominated(self, boundary, dimensions, eps=1e-9):
+        """
+        Check whether a shoulder contains one that already failed everywhere
+
+        Args:
+            boundary: BoundaryContext holding the failed shoulder record
+            dimensions: (width, length) of the candidate shoulder
+            eps: Floating-point slack on the comparison
+
+        Returns:
+            True if the candidate cannot fit
+        """
+        width, length = dimensions
+        return any(
+            width >= failed_width - eps and length >= failed_length - eps
+            for failed_width, failed_length in boundary.failed_shoulders
+        )
+
+    def _search_stats(self, contexts):
+        """
+        Combine search counters from one or more boundaries
+
+        Args:
+            contexts: BoundaryContext objects used for this design
+
+        Returns:
+            Dictionary of summed counters
+        """
+        stats = {}
+        for context in contexts:
+            for name, value in context.stats.items():
+                stats[name] = stats.get(name, 0) + value
+        return stats
+
+    def hierarchy_requirement(self, flow_gpd, config_type, design_row=None):
+        """
+        Required square footage (per boundary for split types) for a hierarchy level
+
+        Args:
+            flow_gpd: Gallons per day
+            config_type: Hierarchy level, 'trench' ... 'split_bed_atu'
+            design_row: Optional DesignTable row for flow_gpd
+
+        Returns:
+            Tuple of (required_sqft, candidate starts or None)
+        """
+        if design_row is not None:
+            level = design_row['config_types'][config_type]
+            return level['required_sqft'], level['candidate_starts']
+
+        if config_type.startswith('split_'):
+            # Each boundary gets 50% of requirement
+            return self.calculate_required_sqft(flow_gpd, config_type[len('split_'):]) // 2, None
+        return self.calculate_required_sqft(flow_gpd, config_type), None
+
+    def apply_hierarchy(self, user_boundary, flow_gpd, split_boundaries=None, design_row=None):
         """
         Apply the complete selection hierarchy
         
@@ -169,11 +445,18 @@ class DrainFieldSelector:
             user_boundary: Shapely Polygon (or list of 2 for split)
             flow_gpd: Gallons per day
             split_boundaries: Optional list of 2 boundaries for split system
+            design_row: Optional DesignTable row for flow_gpd (precomputed
+                        required square footage and candidate starts)
             
         Returns:
-            Dictionary with final selection or failure reason
+            Dictionary with final selection or failure reason, including
+            'search_stats' counters (rotation searches, pruned candidates,
+            fit memo hits and misses)
         """
         attempted = []
+
+        # Prepared geometry, edge angles and rotation set shared by every level
+        boundary = self._boundary_context(user_boundary)
         
         # Standard configurations (1-4)
         hierarchy_standard = [
@@ -184,12 +467,14 @@ class DrainFieldSelector:
         ]
         
         for config_type, multiplier in hierarchy_standard:
-            required_sqft = self.calculate_required_sqft(flow_gpd, config_type)
+            required_sqft, candidate_starts = self.hierarchy_requirement(flow_gpd, config_type,
+                                                                         design_row)
             
             result = self.select_configuration(
-                user_boundary, 
+                boundary, 
                 required_sqft, 
-                config_type
+                config_type,
+                candidate_starts
             )
             
             attempted.append(config_type)
@@ -198,6 +483,7 @@ class DrainFieldSelector:
                 result['attempted'] = attempted
                 result['flow_gpd'] = flow_gpd
                 result['required_sqft'] = required_sqft
+                result['search_stats'] = self._search_stats([boundary])
                 return result
         
         # If we get here, we need a split system (step 5)
@@ -206,7 +492,8 @@ class DrainFieldSelector:
                 'success': False,
                 'reason': 'needs_split',
                 'attempted': attempted,
-                'message': 'No configuration fits in single boundary. Please create two boundaries for split system.'
+                'message': 'No configuration fits in single boundary. Please create two boundaries for split system.',
+                'search_stats': self._search_stats([boundary])
             }
         
         # Split configurations (6-9)
@@ -214,9 +501,12 @@ class DrainFieldSelector:
             return {
                 'success': False,
                 'reason': 'invalid_split',
-                'message': 'Split system requires exactly 2 boundaries.'
+                'message': 'Split system requires exactly 2 boundaries.',
+                'search_stats': self._search_stats([boundary])
             }
         
+        split_contexts = [self._boundary_context(b) for b in split_boundaries]
+
         hierarchy_split = [
             ('trench', 1.0),
             ('bed', 1.0),
@@ -226,14 +516,17 @@ class DrainFieldSelector:
         
         for config_type, multiplier in hierarchy_split:
             # Each boundary gets 50% of requirement
-            required_sqft = self.calculate_required_sqft(flow_gpd, config_type) // 2
+            required_sqft, candidate_starts = self.hierarchy_requirement(
+                flow_gpd, f"split_{config_type}", design_row
+            )
             
             results = []
-            for i, boundary in enumerate(split_boundaries):
+            for i, split_boundary in enumerate(split_contexts):
                 result = self.select_configuration(
-                    boundary,
+                    split_boundary,
                     required_sqft,
-                    f"split_{config_type}"
+                    f"split_{config_type}",
+                    candidate_starts
                 )
                 
                 if result['success']:
@@ -252,7 +545,8 @@ class DrainFieldSelector:
                     'drainfield_2': results[1],
                     'attempted': attempted,
                     'flow_gpd': flow_gpd,
-                    'required_sqft_each': required_sqft
+                    'required_sqft_each': required_sqft,
+                    'search_stats': self._search_stats([boundary] + split_contexts)
                 }
         
         # Nothing worked (step 10)
@@ -260,5 +554,6 @@ class DrainFieldSelector:
             'success': False,
             'reason': 'needs_redesign',
             'attempted': attempted,
-            'message': 'No configuration fits even with split system. Architect intervention required.'
+            'message': 'No configuration fits even with split system. Architect intervention required.',
+            'search_stats': self._search_stats([boundary] + split_contexts)
         }
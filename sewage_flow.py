@@ -3,15 +3,19 @@ Sewage Flow Calculation Module
 Calculates gallons per day (GPD) based on bedrooms and square footage
 """
 
-import csv
 import math
 from pathlib import Path
 
+import numpy as np
+
+from interval_table import IntervalTable
+from data_store import DATA_DIR, read_table
+
 
 class SewageFlowCalculator:
     """Handles sewage flow calculations based on FDEP regulations"""
 
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir=DATA_DIR):
         """
         Initialize calculator with sewage flow data
 
@@ -20,31 +24,80 @@ class SewageFlowCalculator:
         """
         self.data_dir = Path(data_dir)
         self.flow_data = {}
+        # bedrooms -> (IntervalTable over the square footage ranges, largest range)
+        self._tables = {}
         self._load_data()
+        self._compile()
 
     def _load_data(self):
-        """Load sewage flow data from CSV"""
-        csv_path = self.data_dir / "fdep_sewage_flows.csv"
+        """Load sewage flow data from CSV (or the compiled data store)"""
+        rows = read_table(self.data_dir, "fdep_sewage_flows.csv")
+
+        if rows is None:
+            raise FileNotFoundError(
+                f"Sewage flow data not found at {self.data_dir / 'fdep_sewage_flows.csv'}")
+
+        for row in rows:
+            bedrooms = int(row['bedrooms'])
+            sqft_min = int(row['square_footage_min'])
+            sqft_max = int(row['square_footage_max'])
+            flow_gpd = int(row['flow_gpd'])
+
+            if bedrooms not in self.flow_data:
+                self.flow_data[bedrooms] = []
+
+            self.flow_data[bedrooms].append({
+                'sqft_min': sqft_min,
+                'sqft_max': sqft_max,
+                'flow_gpd': flow_gpd
+            })
+
+    def _compile(self):
+        """Build the square footage lookup for each bedroom count"""
+        for bedrooms, ranges in self.flow_data.items():
+            table = IntervalTable([r['sqft_min'] for r in ranges],
+                                  [r['sqft_max'] for r in ranges])
+            last_range = max(ranges, key=lambda x: x['sqft_max'])
+            self._tables[bedrooms] = (table, last_range)
+
+    @staticmethod
+    def _check_square_footage(square_footage):
+        """Raise ValueError unless every square footage is finite and non-negative"""
+        square_footage = np.asarray(square_footage, dtype=float)
+        invalid = ~np.isfinite(square_footage) | (square_footage < 0)
+        if invalid.any():
+            value = square_footage[invalid].flat[0]
+            raise ValueError(f"Square footage must be a finite, non-negative number (got {value})")
+
+    def _lookup(self, bedrooms, square_footage):
+        """
+        Flow and matching range for a known bedroom count
 
-        if not csv_path.exists():
-            raise FileNotFoundError(f"Sewage flow data not found at {csv_path}")
+        Returns:
+            Tuple of (flow_gpd, range dictionary or None if outside the table)
+        """
+        table, last_range = self._tables[bedrooms]
 
-        with open(csv_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                bedrooms = int(row['bedrooms'])
-                sqft_min = int(row['square_footage_min'])
-                sqft_max = int(row['square_footage_max'])
-                flow_gpd = int(row['flow_gpd'])
+        # Find matching range
+        row = table.find(square_footage)
+        if row >= 0:
+            range_data = self.flow_data[bedrooms][row]
+            return range_data['flow_gpd'], range_data
 
-                if bedrooms not in self.flow_data:
-                    self.flow_data[bedrooms] = []
+        # Handle overflow (building larger than max in table)
+        max_sqft = last_range['sqft_max']
+        base_flow = last_range['flow_gpd']
 
-                self.flow_data[bedrooms].append({
-                    'sqft_min': sqft_min,
-                    'sqft_max': sqft_max,
-                    'flow_gpd': flow_gpd
-                })
+        if square_footage > max_sqft:
+            # Add 60 GPD for each additional 750 sqft
+            additional_sqft = square_footage - max_sqft
+            additional_units = math.ceil(additional_sqft / 750)
+            additional_flow = additional_units * 60
+
+            return base_flow + additional_flow, None
+
+        # Should not reach here, but return base flow as fallback
+        return base_flow, None
 
     def calculate_flow(self, bedrooms, square_footage):
         """
@@ -58,32 +111,14 @@ class SewageFlowCalculator:
             Sewage flow in GPD
 
         Raises:
-            ValueError: If bedrooms count is not in data
+            ValueError: If bedrooms count is not in data, or square footage
+                        is negative or not finite
         """
         if bedrooms not in self.flow_data:
             raise ValueError(f"No data available for {bedrooms} bedrooms")
+        self._check_square_footage(square_footage)
 
-        # Find matching range
-        for range_data in self.flow_data[bedrooms]:
-            if range_data['sqft_min'] <= square_footage <= range_data['sqft_max']:
-                return range_data['flow_gpd']
-
-        # Handle overflow (building larger than max in table)
-        # Find the last (largest) range for this bedroom count
-        last_range = max(self.flow_data[bedrooms], key=lambda x: x['sqft_max'])
-        max_sqft = last_range['sqft_max']
-        base_flow = last_range['flow_gpd']
-
-        if square_footage > max_sqft:
-            # Add 60 GPD for each additional 750 sqft
-            additional_sqft = square_footage - max_sqft
-            additional_units = math.ceil(additional_sqft / 750)
-            additional_flow = additional_units * 60
-
-            return base_flow + additional_flow
-
-        # Should not reach here, but return base flow as fallback
-        return base_flow
+        return self._lookup(bedrooms, square_footage)[0]
 
     def get_flow_range(self, bedrooms, square_footage):
         """
@@ -96,20 +131,22 @@ class SewageFlowCalculator:
         Returns:
             Dictionary with range info and calculated flow
         """
-        flow_gpd = self.calculate_flow(bedrooms, square_footage)
-
-        # Find the range this falls into
-        for range_data in self.flow_data[bedrooms]:
-            if range_data['sqft_min'] <= square_footage <= range_data['sqft_max']:
-                return {
-                    'flow_gpd': flow_gpd,
-                    'sqft_min': range_data['sqft_min'],
-                    'sqft_max': range_data['sqft_max'],
-                    'is_overflow': False
-                }
+        if bedrooms not in self.flow_data:
+            raise ValueError(f"No data available for {bedrooms} bedrooms")
+        self._check_square_footage(square_footage)
+
+        flow_gpd, range_data = self._lookup(bedrooms, square_footage)
+
+        if range_data is not None:
+            return {
+                'flow_gpd': flow_gpd,
+                'sqft_min': range_data['sqft_min'],
+                'sqft_max': range_data['sqft_max'],
+                'is_overflow': False
+            }
 
         # It's an overflow calculation
-        last_range = max(self.flow_data[bedrooms], key=lambda x: x['sqft_max'])
+        last_range = self._tables[bedrooms][1]
         return {
             'flow_gpd': flow_gpd,
             'sqft_min': last_range['sqft_max'] + 1,
@@ -117,9 +154,54 @@ class SewageFlowCalculator:
             'is_overflow': True
         }
 
+    def calculate_flow_batch(self, bedrooms, square_footage):
+        """
+        Vectorized calculate_flow over arrays of buildings
+
+        Args:
+            bedrooms: Array-like of bedroom counts
+            square_footage: Array-like of building square footages (same shape)
+
+        Returns:
+            Integer array of flows in GPD, equal element-wise to calculate_flow
+
+        Raises:
+            ValueError: If any bedroom count is not in data, or any square
+                        footage is negative or not finite
+        """
+        bedrooms = np.asarray(bedrooms)
+        square_footage = np.asarray(square_footage)
+        bedrooms, square_footage = np.broadcast_arrays(bedrooms, square_footage)
+        self._check_square_footage(square_footage)
+        flows = np.empty(bedrooms.shape, dtype=np.int64)
+
+        for count in np.unique(bedrooms):
+            count = count.item()
+            if count not in self.flow_data:
+                raise ValueError(f"No data available for {count} bedrooms")
+
+            mask = bedrooms == count
+            sqft = square_footage[mask]
+            table, last_range = self._tables[count]
+            range_flows = np.asarray([r['flow_gpd'] for r in self.flow_data[count]],
+                                     dtype=np.int64)
+
+            rows = table.find_many(sqft)
+            result = np.full(sqft.shape, last_range['flow_gpd'], dtype=np.int64)
+            result[rows >= 0] = range_flows[rows[rows >= 0]]
+
+            # Add 60 GPD for each additional 750 sqft beyond the table
+            over = (rows < 0) & (sqft > last_range['sqft_max'])
+            additional_units = np.ceil((sqft[over] - last_range['sqft_max']) / 750)
+            result[over] += additional_units.astype(np.int64) * 60
+
+            flows[mask] = result
+
+        return flows
+
 
 # Convenience function for quick calculations
-def calculate_sewage_flow(bedrooms, square_footage, data_dir="data"):
+def calculate_sewage_flow(bedrooms, square_footage, data_dir=DATA_DIR):
     """
     Quick function to calculate sewage flow
 
@@ -3,38 +3,34 @@ Specifications Generator Module
 Generates formatted septic system specification text blocks for CAD drawings
 """
 
-import csv
 from pathlib import Path
 
+from tank_catalog import TankCatalog
+from data_store import DATA_DIR
+
 
 class SpecificationGenerator:
     """Generates formatted specification text blocks"""
 
-    def __init__(self, data_dir="data"):
-        """Initialize specification generator"""
+    def __init__(self, data_dir=DATA_DIR, tank_catalog=None):
+        """
+        Initialize specification generator
+
+        Args:
+            data_dir: Directory containing CSV data files
+            tank_catalog: Loaded TankCatalog to share (default: load one)
+        """
         self.data_dir = Path(data_dir)
+        self.tank_catalog = tank_catalog if tank_catalog is not None else TankCatalog(data_dir)
         self.available_tank_sizes = self._load_available_tank_sizes()
         self.available_dosing_tank_sizes = self._load_available_dosing_tank_sizes()
 
     def _load_available_tank_sizes(self):
-        """Load available septic tank sizes from fdep_tanks.csv"""
-        csv_path = self.data_dir / "fdep_tanks.csv"
-
-        if not csv_path.exists():
-            # Return common sizes as fallback
-            return [750, 900, 1000, 1050, 1200, 1250, 1500]
-
-        sizes = set()
-        with open(csv_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('tank_type') == 'septic' and row.get('effective_gallons'):
-                    try:
-                        sizes.add(int(row['effective_gallons']))
-                    except (ValueError, TypeError):
-                        pass
-
-        return sorted(sizes) if sizes else [750, 900, 1000, 1050, 1200, 1250, 1500]
+        """Available septic tank sizes from the tank catalog (fdep_tanks.csv)"""
+        sizes = self.tank_catalog.get_sizes('septic')
+
+        # Return common sizes as fallback
+        return sizes if sizes else [750, 900, 1000, 1050, 1200, 1250, 1500]
 
     def _load_available_dosing_tank_sizes(self):
         """Load available dosing tank sizes - limited to 300 and 500 gallon tanks only"""
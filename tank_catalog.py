@@ -0,0 +1,155 @@
+"""
+Tank Catalog Module
+Loads the FDEP approved tank list once and indexes it for lookups
+"""
+
+import threading
+from pathlib import Path
+
+from data_store import DATA_DIR, read_table
+
+
+# Resolved data directory -> TankCatalog, built on first use
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+class TankCatalog:
+    """Approved tanks from fdep_tanks.csv, indexed by effective gallons and type"""
+
+    def __init__(self, data_dir=DATA_DIR):
+        """
+        Load the tank and manufacturer tables
+
+        A missing tank table gives an empty catalog (callers fall back to
+        their defaults); a missing manufacturer table leaves names blank.
+
+        Args:
+            data_dir: Directory containing CSV data files
+        """
+        self.data_dir = Path(data_dir)
+        self.tanks = []
+        self.manufacturers = {}
+
+        # effective_gallons (as written in the CSV) -> tanks, in file order
+        self._by_gallons = {}
+        # tank_type -> tanks, in file order
+        self._by_type = {}
+        # effective_gallons -> (width_ft, length_ft) of the first tank with dimensions
+        self._dimensions = {}
+
+        self._load_manufacturers()
+        self._load_tanks()
+
+    def _load_manufacturers(self):
+        """Load manufacturer names from fdep_manufacturers.csv"""
+        for row in read_table(self.data_dir, "fdep_manufacturers.csv") or []:
+            self.manufacturers[row['id']] = row['name']
+
+    def _load_tanks(self):
+        """Load and index tanks from fdep_tanks.csv"""
+        for row in read_table(self.data_dir, "fdep_tanks.csv") or []:
+            tank = dict(row)
+            tank['manufacturer'] = self.manufacturers.get(row.get('manufacturer_id'))
+            self.tanks.append(tank)
+
+            gallons = row.get('effective_gallons')
+            self._by_gallons.setdefault(gallons, []).append(tank)
+            self._by_type.setdefault(row.get('tank_type'), []).append(tank)
+
+            if gallons not in self._dimensions:
+                dims = self._parse_dimensions(row)
+                if dims:
+                    self._dimensions[gallons] = dims
+
+    @staticmethod
+    def _parse_dimensions(row):
+        """(width_ft, length_ft) from a row's inch columns, or None"""
+        width_in = row.get('width')
+        length_in = row.get('length')
+
+        if width_in and length_in:
+            try:
+                # Convert inches to feet
+                return (float(width_in) / 12.0, float(length_in) / 12.0)
+            except (ValueError, TypeError):
+                pass
+
+        return None
+
+    def get_dimensions(self, tank_gallons):
+        """
+        Footprint of a tank size
+
+        Args:
+            tank_gallons: Tank capacity in gallons (matched against the
+                          effective_gallons column as written, e.g. 1050)
+
+        Returns:
+            Tuple of (width_ft, length_ft) from the first listed tank of that
+            size with usable dimensions, or None if not found
+        """
+        return self._dimensions.get(str(tank_gallons))
+
+    def get_tanks(self, tank_gallons=None, tank_type=None):
+        """
+        Tanks matching an effective size and/or type, in file order
+
+        Args:
+            tank_gallons: Effective capacity in gallons (None for any)
+            tank_type: 'septic', 'dosing', ... (None for any)
+
+        Returns:
+            List of tank row dictionaries with a 'manufacturer' name added
+        """
+        if tank_gallons is not None:
+            tanks = self._by_gallons.get(str(tank_gallons), [])
+            if tank_type is not None:
+                tanks = [tank for tank in tanks if tank.get('tank_type') == tank_type]
+            return list(tanks)
+
+        if tank_type is not None:
+            return list(self._by_type.get(tank_type, []))
+
+        return list(self.tanks)
+
+    def get_sizes(self, tank_type):
+        """
+        Distinct effective sizes listed for a tank type
+
+        Args:
+            tank_type: 'septic', 'dosing', ...
+
+        Returns:
+            Sorted list of sizes in gallons (empty if none)
+        """
+        sizes = set()
+        for tank in self._by_type.get(tank_type, []):
+            if tank.get('effective_gallons'):
+                try:
+                    sizes.add(int(tank['effective_gallons']))
+                except (ValueError, TypeError):
+                    pass
+
+        return sorted(sizes)
+
+
+def shared_catalog(data_dir=DATA_DIR):
+    """
+    Process-wide TankCatalog for a data directory, loaded once
+
+    For callers that are not handed a catalog. It is not hot reloaded;
+    DrainFieldPlacer passes its own catalog, which is.
+
+    Args:
+        data_dir: Directory containing CSV data files
+
+    Returns:
+        TankCatalog
+    """
+    key = Path(data_dir).resolve()
+    with _shared_lock:
+        catalog = _shared.get(key)
+        if catalog is None:
+            catalog = _shared[key] = TankCatalog(data_dir)
+        return catalog
@@ -3,42 +3,60 @@ Tank Sizing Module
 Determines septic tank and ATU requirements based on flow
 """
 
-import csv
 import math
 from pathlib import Path
 
+import numpy as np
+
+from tank_catalog import shared_catalog
+from interval_table import IntervalTable
+from data_store import DATA_DIR, read_table
+
 
 class TankSizer:
     """Handles tank sizing calculations based on FDEP regulations"""
 
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir=DATA_DIR, tank_catalog=None):
         """
         Initialize tank sizer with tank sizing data
 
         Args:
             data_dir: Directory containing CSV data files
+            tank_catalog: Loaded TankCatalog to share (default: the shared
+                          catalog, loaded on first use)
         """
         self.data_dir = Path(data_dir)
         self.tank_data = []
+        self._tank_catalog = tank_catalog
         self._load_data()
 
+        # Flow ranges in table order, compiled for lookup
+        self.flow_table = IntervalTable([r['min_flow_gpd'] for r in self.tank_data],
+                                        [r['max_flow_gpd'] for r in self.tank_data])
+
+    @property
+    def tank_catalog(self):
+        """TankCatalog for this data directory, loaded when first needed"""
+        if self._tank_catalog is None:
+            self._tank_catalog = shared_catalog(self.data_dir)
+        return self._tank_catalog
+
     def _load_data(self):
-        """Load tank sizing data from CSV"""
-        csv_path = self.data_dir / "fdep_tank_sizing.csv"
-
-        if not csv_path.exists():
-            raise FileNotFoundError(f"Tank sizing data not found at {csv_path}")
-
-        with open(csv_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                self.tank_data.append({
-                    'min_flow_gpd': int(row['min_flow_gpd']),
-                    'max_flow_gpd': int(row['max_flow_gpd']),
-                    'septic_tank_min_capacity': int(row['septic_tank_min_capacity']),
-                    'pump_tank_min_residential': int(row['pump_tank_min_residential']),
-                    'pump_tank_min_commercial': int(row['pump_tank_min_commercial'])
-                })
+        """Load tank sizing data from CSV (or the compiled data store)"""
+        rows = read_table(self.data_dir, "fdep_tank_sizing.csv")
+
+        if rows is None:
+            raise FileNotFoundError(
+                f"Tank sizing data not found at {self.data_dir / 'fdep_tank_sizing.csv'}")
+
+        for row in rows:
+            self.tank_data.append({
+                'min_flow_gpd': int(row['min_flow_gpd']),
+                'max_flow_gpd': int(row['max_flow_gpd']),
+                'septic_tank_min_capacity': int(row['septic_tank_min_capacity']),
+                'pump_tank_min_residential': int(row['pump_tank_min_residential']),
+                'pump_tank_min_commercial': int(row['pump_tank_min_commercial'])
+            })
 
     def get_septic_tank_size(self, flow_gpd, num_homes=1):
         """
@@ -52,16 +70,16 @@ class TankSizer:
             Required septic tank capacity in gallons
         """
         # Find matching flow range
-        for tank_range in self.tank_data:
-            if tank_range['min_flow_gpd'] <= flow_gpd <= tank_range['max_flow_gpd']:
-                base_capacity = tank_range['septic_tank_min_capacity']
+        row = self.flow_table.find(flow_gpd)
+        if row >= 0:
+            base_capacity = self.tank_data[row]['septic_tank_min_capacity']
 
-                # Add 75 gallons per additional dwelling unit
-                if num_homes > 1:
-                    additional_gallons = num_homes * 75
-                    return base_capacity + additional_gallons
+            # Add 75 gallons per additional dwelling unit
+            if num_homes > 1:
+                additional_gallons = num_homes * 75
+                return base_capacity + additional_gallons
 
-                return base_capacity
+            return base_capacity
 
         # If flow exceeds max in table, return highest capacity
         if flow_gpd > self.tank_data[-1]['max_flow_gpd']:
@@ -86,12 +104,12 @@ class TankSizer:
             Required pump tank capacity in gallons
         """
         # Find matching flow range
-        for tank_range in self.tank_data:
-            if tank_range['min_flow_gpd'] <= flow_gpd <= tank_range['max_flow_gpd']:
-                if is_residential:
-                    return tank_range['pump_tank_min_residential']
-                else:
-                    return tank_range['pump_tank_min_commercial']
+        row = self.flow_table.find(flow_gpd)
+        if row >= 0:
+            if is_residential:
+                return self.tank_data[row]['pump_tank_min_residential']
+            else:
+                return self.tank_data[row]['pump_tank_min_commercial']
 
         # If flow exceeds max in table, return highest capacity
         if flow_gpd > self.tank_data[-1]['max_flow_gpd']:
@@ -103,6 +121,54 @@ class TankSizer:
         # Default fallback
         return 150 if is_residential else 225
 
+    def _flow_rows(self, flow_gpd):
+        """Table rows for an array of flows, and where flow is past the last row"""
+        flow_gpd = np.asarray(flow_gpd, dtype=float)
+        rows = self.flow_table.find_many(flow_gpd)
+        past_table = (rows < 0) & (flow_gpd > self.tank_data[-1]['max_flow_gpd'])
+        rows = np.where(past_table, len(self.tank_data) - 1, rows)
+        return rows
+
+    def _column(self, rows, column, fallback):
+        """Column values for table rows, fallback where the row is -1"""
+        values = np.asarray([r[column] for r in self.tank_data], dtype=np.int64)
+        return np.where(rows >= 0, values[rows], fallback)
+
+    def get_septic_tank_size_batch(self, flow_gpd, num_homes=1):
+        """
+        Vectorized get_septic_tank_size
+
+        Args:
+            flow_gpd: Array-like of flows in gallons per day
+            num_homes: Dwelling units (scalar or array-like of the same shape)
+
+        Returns:
+            Integer array of required septic tank capacities
+        """
+        rows = self._flow_rows(flow_gpd)
+        capacity = self._column(rows, 'septic_tank_min_capacity', 900)
+
+        # Add 75 gallons per additional dwelling unit (not to the default)
+        num_homes = np.broadcast_to(np.asarray(num_homes), capacity.shape)
+        extra = (rows >= 0) & (num_homes > 1)
+        return np.where(extra, capacity + num_homes * 75, capacity)
+
+    def get_pump_tank_size_batch(self, flow_gpd, is_residential=True):
+        """
+        Vectorized get_pump_tank_size
+
+        Args:
+            flow_gpd: Array-like of flows in gallons per day
+            is_residential: Scalar or array-like of booleans
+
+        Returns:
+            Integer array of required pump tank capacities
+        """
+        rows = self._flow_rows(flow_gpd)
+        residential = self._column(rows, 'pump_tank_min_residential', 150)
+        commercial = self._column(rows, 'pump_tank_min_commercial', 225)
+        return np.where(is_residential, residential, commercial)
+
     def calculate_atu_size(self, bedrooms, square_footage, flow_gpd, is_residential=True):
         """
         Calculate required ATU (Aerobic Treatment Unit) size
@@ -162,9 +228,53 @@ class TankSizer:
                 # Flow exceeds supported range
                 return None
 
+    def calculate_atu_size_batch(self, bedrooms, square_footage, flow_gpd, is_residential=True):
+        """
+        Vectorized calculate_atu_size
+
+        Args:
+            bedrooms: Array-like of bedroom counts
+            square_footage: Array-like of building square footages
+            flow_gpd: Array-like of flows in gallons per day
+            is_residential: Scalar or array-like of booleans
+
+        Returns:
+            Float array of ATU capacities, NaN where calculate_atu_size
+            returns None (commercial flow beyond 1500 GPD)
+        """
+        bedrooms, square_footage, flow_gpd, is_residential = np.broadcast_arrays(
+            np.asarray(bedrooms, dtype=float), np.asarray(square_footage, dtype=float),
+            np.asarray(flow_gpd, dtype=float), np.asarray(is_residential, dtype=bool))
+
+        # Residential: fixed sizes for small homes, then the greater of the
+        # area-based and bedroom-based sizes
+        over_area = square_footage > 3300
+        area_units = np.ceil((np.where(over_area, square_footage, 3300) - 3300) / 750)
+        area_gallons = np.where(over_area, 500 + area_units * 60, 500)
+        bedroom_gallons = np.where(bedrooms > 4, 500 + (bedrooms - 4) * 60, 500)
+        residential = np.select(
+            [((bedrooms <= 2) & (square_footage <= 1200)) |
+             ((bedrooms == 3) & (square_footage <= 2250)),
+             (bedrooms == 4) & (square_footage <= 3300)],
+            [400, 500],
+            np.maximum(area_gallons, bedroom_gallons),
+        )
+
+        # Commercial: flow bands; NaN past 1500 GPD
+        bands = [(0, 400, 400), (401, 500, 500), (501, 600, 600), (601, 700, 700),
+                 (701, 750, 750), (751, 800, 800), (801, 1000, 1000),
+                 (1001, 1200, 1200), (1201, 1500, 1500)]
+        commercial = np.select(
+            [(low <= flow_gpd) & (flow_gpd <= high) for low, high, size in bands],
+            [size for low, high, size in bands],
+            np.nan,
+        )
+
+        return np.where(is_residential, residential, commercial).astype(float)
+
 
 # Convenience functions
-def get_tank_requirements(flow_gpd, num_homes=1, data_dir="data"):
+def get_tank_requirements(flow_gpd, num_homes=1, data_dir=DATA_DIR):
     """
     Quick function to get tank requirements
 